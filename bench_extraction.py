@@ -0,0 +1,134 @@
+"""
+Benchmark per-business field extraction latency: per-selector lookups vs one batched script
+
+Runs both extraction paths against a simulated driver that charges a
+WebDriver round-trip for every command and the driver's implicit wait for
+every find_element miss, using a virtual clock so the run finishes instantly.
+
+Usage:
+    python bench_extraction.py [--rtt-ms 15] [--implicit-wait 10]
+"""
+import argparse
+import time
+
+from selenium.common.exceptions import NoSuchElementException
+
+from extraction import FIELD_SELECTORS, extract_fields
+from scraper import extract_fields_individually
+
+# Selector -> (text, attributes) for the elements present on each detail pane
+PAGES = {
+    'complete listing': {
+        '.DUwDvf.fontHeadlineSmall': ("Java House Westlands", {}),
+        'h1.DUwDvf': ("Java House Westlands", {}),
+        '.MW4etd': ("4.3", {}),
+        '.UY7F9': ("(1,204)", {}),
+        '.Io6YTe': ("Sarit Centre, Karuna Rd, Nairobi", {}),
+        '[data-item-id*="address"]': ("Sarit Centre, Karuna Rd, Nairobi", {}),
+        '[data-item-id*="phone"]': ("+254 709 123456", {}),
+        'a[data-item-id*="authority"]': ("javahouseafrica.com", {'href': "https://javahouseafrica.com/"}),
+        'a[href*="http"]:not([href*="google"])': ("javahouseafrica.com", {'href': "https://javahouseafrica.com/"}),
+        '.DkEaL': ("Coffee shop", {}),
+        '.t39EBf': ("Open · Closes 10 pm", {}),
+        '.mgr77e': ("$$", {}),
+    },
+    'no phone / website / price': {
+        '.DUwDvf.fontHeadlineSmall': ("Mama Oliech Restaurant", {}),
+        'h1.DUwDvf': ("Mama Oliech Restaurant", {}),
+        '.MW4etd': ("4.1", {}),
+        '.UY7F9': ("(87)", {}),
+        '.Io6YTe': ("Marcus Garvey Rd, Nairobi", {}),
+        '.DkEaL': ("Restaurant", {}),
+    },
+}
+
+
+class SimulatedElement:
+    def __init__(self, driver, text, attributes):
+        self._driver = driver
+        self._text = text
+        self._attributes = attributes
+
+    @property
+    def text(self):
+        self._driver.charge_round_trip()
+        return self._text
+
+    def get_attribute(self, name):
+        self._driver.charge_round_trip()
+        return self._attributes.get(name)
+
+
+class SimulatedDriver:
+    """Minimal driver that accounts latency on a virtual clock"""
+
+    def __init__(self, page, rtt, implicit_wait):
+        self.page = page
+        self.rtt = rtt
+        self.implicit_wait = implicit_wait
+        self.elapsed = 0.0
+        self.round_trips = 0
+
+    def charge_round_trip(self):
+        self.round_trips += 1
+        self.elapsed += self.rtt
+
+    def find_element(self, by, selector):
+        self.charge_round_trip()
+        if selector not in self.page:
+            self.elapsed += self.implicit_wait
+            raise NoSuchElementException(selector)
+        text, attributes = self.page[selector]
+        return SimulatedElement(self, text, attributes)
+
+    def execute_script(self, script, table):
+        self.charge_round_trip()
+        out = {}
+        for field, spec in table.items():
+            values = []
+            for selector in spec['selectors']:
+                if selector not in self.page:
+                    values.append(None)
+                    continue
+                text, attributes = self.page[selector]
+                values.append(attributes.get(spec['attribute']) if spec['attribute'] else text)
+            out[field] = values
+        return out
+
+
+def run_benchmark(rtt, implicit_wait):
+    rows = []
+    for page_name, page in PAGES.items():
+        for method_name, method in (
+            ("per-selector", extract_fields_individually),
+            ("batched", extract_fields),
+        ):
+            driver = SimulatedDriver(page, rtt, implicit_wait)
+            cpu_start = time.perf_counter()
+            data = method(driver)
+            cpu = time.perf_counter() - cpu_start
+            rows.append((page_name, method_name, driver.round_trips, driver.elapsed, cpu, data))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rtt-ms', type=float, default=15.0, help="WebDriver round-trip time in ms")
+    parser.add_argument('--implicit-wait', type=float, default=10.0, help="Implicit wait in seconds")
+    args = parser.parse_args()
+
+    rows = run_benchmark(args.rtt_ms / 1000.0, args.implicit_wait)
+    selector_count = sum(len(selectors) for selectors in FIELD_SELECTORS.values())
+    print(f"{len(FIELD_SELECTORS)} fields, {selector_count} selectors, "
+          f"rtt={args.rtt_ms:.0f}ms, implicit wait={args.implicit_wait:.0f}s\n")
+    print(f"{'page':<28} {'method':<13} {'round-trips':>11} {'latency (s)':>12} {'cpu (ms)':>9}")
+    for page_name, method_name, round_trips, elapsed, cpu, _ in rows:
+        print(f"{page_name:<28} {method_name:<13} {round_trips:>11} {elapsed:>12.2f} {cpu * 1000:>9.2f}")
+
+    # Both paths must agree field by field
+    for i in range(0, len(rows), 2):
+        assert rows[i][5] == rows[i + 1][5], f"Extraction mismatch on {rows[i][0]}"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark the filter stage: scraper.filter_businesses loop vs filtering.filter_frame
+
+Generates synthetic businesses (a share of them branches of chains) and
+times the per-dict loop against the columnar masks on the same three
+filters it supports, then times the full columnar stage with every
+config.py filter, chain detection and sorting.
+
+Usage:
+    python bench_filtering.py [--records 1000000]
+"""
+import argparse
+import logging
+import time
+
+import numpy as np
+
+from config import MIN_RATING, REQUIRE_NO_WEBSITE, MIN_REVIEWS
+from filtering import filter_frame, to_frame
+from scraper import filter_businesses
+
+CATEGORIES = ["Restaurant", "Hotel", "Bar", "Coffee shop", "Barber shop", "Pharmacy", "Fast food restaurant"]
+CHAINS = ["Java House", "KFC", "Artcaffe", "Naivas Supermarket", "Chicken Inn"]
+
+
+def make_records(count, seed=0):
+    rng = np.random.default_rng(seed)
+    ratings = np.round(rng.uniform(1, 5, count), 1)
+    reviews = rng.integers(0, 2000, count)
+    prices = rng.integers(1, 5, count)
+    categories = rng.integers(0, len(CATEGORIES), count)
+    chain = rng.random(count) < 0.1
+    has_rating = rng.random(count) < 0.9
+    has_website = rng.random(count) < 0.4
+    records = []
+    for i in range(count):
+        name = f"{CHAINS[i % len(CHAINS)]} - Branch {i}" if chain[i] else f"Business {i}"
+        records.append({
+            'name': name,
+            'category': CATEGORIES[categories[i]],
+            'rating': float(ratings[i]) if has_rating[i] else None,
+            'reviews_count': int(reviews[i]),
+            'address': f"{i} Moi Avenue",
+            'phone': None,
+            'website': f"https://b{i}.example" if has_website[i] else None,
+            'location': None,
+            'price_level': int(prices[i]),
+            'hours': None,
+            'place_id': f"0x{i:x}:0x{i:x}",
+        })
+    return records
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--records', type=int, default=1_000_000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    records = make_records(args.records)
+    print(f"{args.records:,} records")
+
+    looped, loop_seconds = timed(lambda: filter_businesses(records, MIN_RATING, REQUIRE_NO_WEBSITE, MIN_REVIEWS))
+    print(f"  filter_businesses loop (3 filters):   {loop_seconds:8.3f}s  -> {len(looped):,}")
+
+    df, build_seconds = timed(lambda: to_frame(records))
+    print(f"  build typed frame from dicts:         {build_seconds:8.3f}s")
+
+    same, same_seconds = timed(lambda: filter_frame(
+        df, MIN_RATING, REQUIRE_NO_WEBSITE, MIN_REVIEWS,
+        business_types=None, max_price_level=None, exclude_chains=False, sort_by=None
+    ))
+    assert len(same) == len(looped)
+    print(f"  filter_frame (same 3 filters):        {same_seconds:8.3f}s  -> {len(same):,}")
+
+    full, full_seconds = timed(lambda: filter_frame(df))
+    print(f"  filter_frame (all filters + sort):    {full_seconds:8.3f}s  -> {len(full):,}")
+
+
+if __name__ == "__main__":
+    main()
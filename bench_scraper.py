@@ -0,0 +1,145 @@
+"""
+Benchmark scrape_google_maps end to end against FakeMapsDriver
+
+Runs the real scraper loop (card reads, dedup, clicks, MutationObserver
+waits, extraction, scrolling) against generated or recorded Maps pages
+with simulated WebDriver latency, and reports businesses/sec, latency
+percentiles per stage and WebDriver command counts. Nothing touches the
+network, so runs are repeatable and comparable across changes.
+
+Usage:
+    python bench_scraper.py [--places 150] [--max-results 100] [--mode detail|listing|snapshot]
+                            [--pushdown] [--recorded snapshots/] [--rtt-ms 5] [--pane-ms 120]
+                            [--json results.json]
+"""
+import argparse
+import json
+import logging
+import time
+
+import numpy as np
+
+from fake_maps import FakeMapsDriver, make_places, places_from_snapshots
+from instrumentation import reset_profile
+from listing import CardFilter
+from scraper import scrape_google_maps
+
+
+def percentiles(values):
+    if not values:
+        return {'count': 0, 'p50': 0.0, 'p90': 0.0, 'p99': 0.0}
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {'count': len(values), 'p50': float(p50), 'p90': float(p90), 'p99': float(p99)}
+
+
+def run_benchmark(places, mode='detail', max_results=100, pushdown=False, rtt=0.005, pane_delay=0.12,
+                  slow_pane_rate=0.05, slow_pane_delay=1.0, feed_delay=0.3, seed=0):
+    """
+    Scrape the places once and measure it
+
+    Returns:
+        Result dict: businesses, seconds, businesses_per_sec, stages
+        (stage -> span count and p50/p90/p99 seconds), per-business
+        latency percentiles, WebDriver command counts and the run
+        profile's timers
+    """
+    driver = FakeMapsDriver(
+        places, rtt=rtt, pane_delay=pane_delay, slow_pane_rate=slow_pane_rate,
+        slow_pane_delay=slow_pane_delay, feed_delay=feed_delay, seed=seed
+    )
+    parser_pool = None
+    if mode == 'snapshot':
+        from snapshots import SnapshotParserPool
+        parser_pool = SnapshotParserPool()
+
+    profile = reset_profile()
+    emitted = []
+    last = [time.perf_counter()]
+
+    def on_business(business):
+        now = time.perf_counter()
+        emitted.append(now - last[0])
+        last[0] = now
+
+    started = time.perf_counter()
+    try:
+        businesses = scrape_google_maps(
+            driver, "restaurants", "Nairobi", max_results=max_results, on_business=on_business,
+            parser_pool=parser_pool, mode='listing' if mode == 'listing' else 'detail',
+            card_filter=CardFilter.from_config() if pushdown else None
+        )
+    finally:
+        if parser_pool:
+            parser_pool.close()
+    elapsed = time.perf_counter() - started
+    driver.finish()
+
+    return {
+        'mode': mode + (' +pushdown' if pushdown else ''),
+        'businesses': len(businesses),
+        'seconds': elapsed,
+        'businesses_per_sec': len(businesses) / elapsed if elapsed else 0.0,
+        'business_latency': percentiles(emitted),
+        'stages': {stage: percentiles(spans) for stage, spans in sorted(driver.spans.items())},
+        'commands': dict(driver.calls.most_common()),
+        'command_total': driver.command_count,
+        'profile': profile.report()['timers'],
+    }
+
+
+def print_result(result):
+    print(f"\n{result['mode']}: {result['businesses']} businesses in {result['seconds']:.2f}s "
+          f"({result['businesses_per_sec']:.2f}/s), {result['command_total']} WebDriver commands")
+    print(f"  {'stage':<16} {'spans':>6} {'p50 (ms)':>9} {'p90 (ms)':>9} {'p99 (ms)':>9}")
+    rows = [('per business', result['business_latency'])] + list(result['stages'].items())
+    for stage, stats in rows:
+        print(f"  {stage:<16} {stats['count']:>6} {stats['p50'] * 1000:>9.1f} "
+              f"{stats['p90'] * 1000:>9.1f} {stats['p99'] * 1000:>9.1f}")
+    print("  commands: " + ", ".join(f"{name}={count}" for name, count in result['commands'].items()))
+    print("  run profile: " + ", ".join(
+        f"{timer['name']}={timer['total']:.2f}s/{timer['count']}" for timer in result['profile']
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--places', type=int, default=150, help="Synthetic places in the feed")
+    parser.add_argument('--missing-rate', type=float, default=0.2, help="Share of missing optional fields")
+    parser.add_argument('--recorded', default=None, help="Directory of saved snapshots to serve instead")
+    parser.add_argument('--max-results', type=int, default=100)
+    parser.add_argument('--mode', choices=['detail', 'listing', 'snapshot', 'all'], default='all')
+    parser.add_argument('--pushdown', action='store_true', help="Also run detail mode with filter pushdown")
+    parser.add_argument('--rtt-ms', type=float, default=5.0, help="WebDriver round-trip time")
+    parser.add_argument('--pane-ms', type=float, default=120.0, help="Detail pane render time")
+    parser.add_argument('--slow-pane-rate', type=float, default=0.05)
+    parser.add_argument('--slow-pane-ms', type=float, default=1000.0)
+    parser.add_argument('--feed-ms', type=float, default=300.0, help="Time for a scroll to load more cards")
+    parser.add_argument('--json', default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    places = places_from_snapshots(args.recorded) if args.recorded else make_places(
+        args.places, missing_rate=args.missing_rate
+    )
+    modes = ['detail', 'listing', 'snapshot'] if args.mode == 'all' else [args.mode]
+    runs = [(mode, False) for mode in modes] + ([('detail', True)] if args.pushdown else [])
+
+    print(f"{len(places)} places, max_results={args.max_results}, rtt={args.rtt_ms:.0f}ms, "
+          f"pane={args.pane_ms:.0f}ms ({args.slow_pane_rate:.0%} at {args.slow_pane_ms:.0f}ms), "
+          f"feed={args.feed_ms:.0f}ms")
+    results = []
+    for mode, pushdown in runs:
+        result = run_benchmark(
+            places, mode, args.max_results, pushdown, args.rtt_ms / 1000.0, args.pane_ms / 1000.0,
+            args.slow_pane_rate, args.slow_pane_ms / 1000.0, args.feed_ms / 1000.0
+        )
+        print_result(result)
+        results.append(result)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
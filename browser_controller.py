@@ -1,14 +1,213 @@
 from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.options import Options
+from config import (
+    BROWSER_PROFILE, LEAN_BLOCKED_URLS, CHROMEDRIVER_CACHE_FILE, CHROMEDRIVER_VERSION, CHROME_USER_DATA_DIR
+)
+from instrumentation import get_profile, instrument_driver
+from pathlib import Path
+import json
 import logging
+import os
+import time
 
-def create_driver():
+try:
+    import fcntl
+except ImportError:  # Windows: no profile locking, so no persistent profiles
+    fcntl = None
+
+# Chrome subsystems the scraper never uses; disabled in the lean profile
+LEAN_DISABLED_FEATURES = [
+    'VizDisplayCompositor', 'Translate', 'MediaRouter', 'OptimizationHints',
+    'InterestFeedContentSuggestions', 'CalculateNativeWinOcclusion', 'AutofillServerCommunication',
+]
+LEAN_ARGUMENTS = [
+    '--headless=new',
+    '--blink-settings=imagesEnabled=false',
+    '--disable-background-networking',
+    '--disable-background-timer-throttling',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--disable-notifications',
+    '--metrics-recording-only',
+    '--mute-audio',
+    '--no-first-run',
+    '--window-size=1280,900',
+]
+# Content settings: 2 = block
+LEAN_PREFS = {
+    'profile.managed_default_content_settings.images': 2,
+    'profile.managed_default_content_settings.media_stream': 2,
+    'profile.managed_default_content_settings.notifications': 2,
+    'profile.managed_default_content_settings.geolocation': 2,
+}
+
+
+class PageStats:
+    """
+    Bytes transferred and page-ready time per page, read from Chrome's
+    performance log
+
+    record() is called once a page (search results or detail pane) is
+    ready; it sums the encoded size of every response finished since the
+    previous call.
+    """
+
+    def __init__(self):
+        self.pages = 0
+        self.total_bytes = 0
+        self.total_ready = 0.0
+        self.by_kind = {}
+
+    def _drain_bytes(self, driver):
+        total = 0
+        try:
+            entries = driver.get_log('performance')
+        except Exception:
+            return 0
+        for entry in entries:
+            message = entry.get('message', '')
+            # Cheap substring test first; the log holds every network event
+            if 'Network.loadingFinished' not in message:
+                continue
+            try:
+                total += json.loads(message)['message']['params'].get('encodedDataLength', 0)
+            except (ValueError, KeyError):
+                continue
+        return int(total)
+
+    def record(self, driver, kind, ready_time):
+        transferred = self._drain_bytes(driver)
+        self.pages += 1
+        self.total_bytes += transferred
+        self.total_ready += ready_time
+        pages, transferred_total, ready_total = self.by_kind.get(kind, (0, 0, 0.0))
+        self.by_kind[kind] = (pages + 1, transferred_total + transferred, ready_total + ready_time)
+        logging.debug(f"Page ready ({kind}): {ready_time:.2f}s, {transferred / 1024:.1f} KiB transferred")
+
+    def summary(self):
+        lines = []
+        for kind, (pages, transferred, ready) in sorted(self.by_kind.items()):
+            lines.append(
+                f"{kind}: {pages} pages, avg {ready / pages:.2f}s ready, "
+                f"avg {transferred / pages / 1024:.1f} KiB"
+            )
+        return lines
+
+
+def record_page_load(driver, kind, ready_time):
+    """Record a ready page on drivers created by create_driver; no-op elsewhere"""
+    stats = getattr(driver, 'page_stats', None)
+    if stats is not None:
+        stats.record(driver, kind, ready_time)
+
+
+def log_page_stats(driver):
+    stats = getattr(driver, 'page_stats', None)
+    if stats is None or not stats.pages:
+        return
+    logging.info(
+        f"Browser transferred {stats.total_bytes / 1024 / 1024:.1f} MiB over {stats.pages} pages "
+        f"(avg {stats.total_ready / stats.pages:.2f}s to ready)"
+    )
+    for line in stats.summary():
+        logging.info(f"  {line}")
+
+
+def resolve_driver_path(version=CHROMEDRIVER_VERSION, cache_file=CHROMEDRIVER_CACHE_FILE, refresh=False):
+    """
+    Path of the chromedriver binary
+
+    ChromeDriverManager().install() looks up the matching release over the
+    network on every call (and fails offline), so the path it resolves is
+    cached in cache_file together with the version pin it was resolved
+    for. The cached path is reused while the binary exists and the pin is
+    unchanged; refresh forces a new lookup, e.g. after Chrome updated and
+    the cached driver no longer starts it.
+    """
+    if not refresh:
+        try:
+            with open(cache_file, encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('version') == version and os.access(cached['path'], os.X_OK):
+                return cached['path']
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+    # Imported here so runs with a cached driver never load webdriver-manager
+    from webdriver_manager.chrome import ChromeDriverManager
+    path = ChromeDriverManager(driver_version=version).install()
+    try:
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'path': path, 'version': version, 'resolved_at': time.time()}, f)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logging.warning(f"Could not cache the chromedriver path: {str(e)}")
+    logging.info(f"Resolved chromedriver {version or 'latest'} at {path}")
+    return path
+
+
+def claim_user_data_dir(root=CHROME_USER_DATA_DIR):
+    """
+    A persistent Chrome profile directory no other browser is using
+
+    Chrome refuses to share a profile between running browsers, so root
+    holds one slot-N directory per concurrent browser. The first slot whose
+    lock file can be locked is taken; the lock lives as long as the
+    returned file object is open. Returns (directory, lock file), or
+    (None, None) when persistent profiles are off or unsupported.
+    """
+    if not root or fcntl is None:
+        return None, None
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    slot = 1
+    while True:
+        lock = open(root / f"slot-{slot}.lock", 'w')
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            slot += 1
+            continue
+        return str((root / f"slot-{slot}").resolve()), lock
+
+
+def _release_profile_on_quit(driver, lock):
+    quit = driver.quit
+
+    def quit_and_release():
+        try:
+            quit()
+        finally:
+            lock.close()
+
+    driver.quit = quit_and_release
+
+
+def create_driver(profile=BROWSER_PROFILE, user_data_root=CHROME_USER_DATA_DIR):
+    """
+    Create a Chrome driver
+    
+    Args:
+        profile: "lean" (headless, images/fonts/media/map tiles blocked,
+            unneeded subsystems off) or "full" (loads every resource)
+        user_data_root: Directory holding the persistent Chrome profiles
+            (see claim_user_data_dir); None starts from a throwaway profile
+    """
+    lean = profile == 'lean'
     chrome_options = Options()
     
+    # Headless, no images and no background services; only text is read
+    if lean:
+        for argument in LEAN_ARGUMENTS:
+            chrome_options.add_argument(argument)
+        chrome_options.add_experimental_option('prefs', LEAN_PREFS)
+    
     # Disable GPU and graphics acceleration completely
-   # chrome_options.add_argument('--headless=new')
     chrome_options.add_argument('--disable-gpu')
     chrome_options.add_argument('--use-gl=angle')
     chrome_options.add_argument('--use-angle=default')
@@ -17,7 +216,8 @@ def create_driver():
     # Stability improvements
     chrome_options.add_argument('--no-sandbox')
     chrome_options.add_argument('--disable-dev-shm-usage')
-    chrome_options.add_argument('--disable-features=VizDisplayCompositor')
+    disabled_features = LEAN_DISABLED_FEATURES if lean else ['VizDisplayCompositor']
+    chrome_options.add_argument(f"--disable-features={','.join(disabled_features)}")
     chrome_options.add_argument('--disable-breakpad')
     
     # Memory and performance settings
@@ -29,19 +229,51 @@ def create_driver():
     # Add user agent to avoid detection
     chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36')
     
+    # Network events in the performance log feed the per-page byte counts
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    
+    # Reused profile: Maps scripts and styles come from the disk cache
+    user_data_dir, profile_lock = claim_user_data_dir(user_data_root)
+    if user_data_dir:
+        chrome_options.add_argument(f'--user-data-dir={user_data_dir}')
+    
+    started = time.perf_counter()
     try:
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(
-            service=service,
-            options=chrome_options
+        driver_path = resolve_driver_path()
+        resolved = time.perf_counter()
+        try:
+            driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+        except SessionNotCreatedException as e:
+            # Usually a Chrome update the cached driver does not support
+            logging.warning(f"Cached chromedriver could not start Chrome, resolving it again: {str(e)}")
+            driver_path = resolve_driver_path(refresh=True)
+            resolved = time.perf_counter()
+            driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+        launched = time.perf_counter()
+        get_profile().observe('startup.driver_path', resolved - started)
+        get_profile().observe('startup.browser', launched - resolved)
+        logging.info(
+            f"Browser started in {launched - started:.2f}s "
+            f"(driver lookup {resolved - started:.2f}s, launch {launched - resolved:.2f}s)"
         )
+        if profile_lock:
+            _release_profile_on_quit(driver, profile_lock)
         
         # Set timeouts
         driver.set_page_load_timeout(30)
         driver.set_script_timeout(30)
         driver.implicitly_wait(10)
         
+        if lean:
+            # Blocked requests fail before they hit the network
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': LEAN_BLOCKED_URLS})
+        driver.page_stats = PageStats()
+        instrument_driver(driver)
+        
         return driver
     except Exception as e:
+        if profile_lock:
+            profile_lock.close()
         logging.error(f"Failed to create Chrome driver: {str(e)}")
         raise
\ No newline at end of file
@@ -0,0 +1,130 @@
+import logging
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    location TEXT NOT NULL,
+    term TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'running',
+    scroll_depth INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (location, term)
+);
+CREATE TABLE IF NOT EXISTS places (
+    location TEXT NOT NULL,
+    term TEXT NOT NULL,
+    place_id TEXT NOT NULL,
+    PRIMARY KEY (location, term, place_id)
+);
+"""
+
+
+class Checkpoint:
+    """
+    SQLite record of scrape progress used by --resume
+
+    Tracks finished (location, term) jobs, the feed scroll depth reached by
+    unfinished ones and the place IDs already extracted. Place IDs are
+    buffered and only committed by flush(), which the caller runs right after
+    the output sink has flushed, so the checkpoint never claims a place the
+    output file does not have.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._conn = sqlite3.connect(self.path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._pending_places = []
+
+    def reset(self):
+        """Forget all progress (used when a run starts without --resume)"""
+        with self._conn:
+            self._conn.execute("DELETE FROM jobs")
+            self._conn.execute("DELETE FROM places")
+        self._pending_places = []
+
+    def completed_jobs(self):
+        rows = self._conn.execute("SELECT location, term FROM jobs WHERE status = 'done'")
+        return {(location, term) for location, term in rows}
+
+    def place_counts(self):
+        """Number of places recorded per (location, term) job"""
+        rows = self._conn.execute("SELECT location, term, COUNT(*) FROM places GROUP BY location, term")
+        return {(location, term): count for location, term, count in rows}
+
+    def _touch(self, job, **fields):
+        location, term = job
+        self._conn.execute(
+            "INSERT INTO jobs (location, term, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (location, term) DO NOTHING",
+            (location, term, time.time())
+        )
+        for column, value in fields.items():
+            self._conn.execute(
+                f"UPDATE jobs SET {column} = ?, updated_at = ? WHERE location = ? AND term = ?",
+                (value, time.time(), location, term)
+            )
+
+    def set_scroll_depth(self, job, depth):
+        with self._conn:
+            self._touch(job, scroll_depth=depth)
+
+    def add_place(self, job, place_id):
+        if place_id:
+            self._pending_places.append((job[0], job[1], place_id))
+
+    def flush(self):
+        """Commit buffered place IDs"""
+        if not self._pending_places:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO places (location, term, place_id) VALUES (?, ?, ?)",
+                self._pending_places
+            )
+        self._pending_places = []
+
+    def discard_pending(self):
+        """Forget buffered place IDs the output sink failed to store"""
+        if self._pending_places:
+            logger.warning(f"Dropping {len(self._pending_places)} places the output did not store")
+        self._pending_places = []
+
+    def mark_done(self, job):
+        self.flush()
+        with self._conn:
+            self._touch(job, status='done')
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+
+def load_job_state(path, job):
+    """
+    Read the resume state of one job without taking a writer connection
+
+    Returns:
+        (set of place IDs already extracted, scroll depth reached)
+    """
+    location, term = job
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+    try:
+        seen = {
+            place_id for (place_id,) in conn.execute(
+                "SELECT place_id FROM places WHERE location = ? AND term = ?", (location, term)
+            )
+        }
+        row = conn.execute(
+            "SELECT scroll_depth FROM jobs WHERE location = ? AND term = ?", (location, term)
+        ).fetchone()
+        return seen, (row[0] if row else 0)
+    except sqlite3.Error as e:
+        logger.warning(f"Could not read checkpoint {path}: {str(e)}")
+        return set(), 0
+    finally:
+        conn.close()
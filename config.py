@@ -42,15 +42,131 @@ ERROR_LOG = "error_log.txt"          # New separate error log file
 RADIUS_KM = 30
 MAX_PRICE_LEVEL = 4   # New parameter for price level filter (1-4)
 SORT_BY = "rating"    # New parameter: "rating" or "reviews"
+CHAIN_MIN_LOCATIONS = 3  # Normalized names found at this many places count as a chain (EXCLUDE_CHAINS)
+
+# Geo-grid sharding (--grid): locations are split into tiles covering RADIUS_KM
+# around their centre, and tiles returning GRID_SPLIT_THRESHOLD results (Maps
+# caps a query near 120) are split in four, down to GRID_MIN_TILE_KM
+LOCATION_CENTERS = {
+    "Nairobi, Kenya": (-1.28638, 36.81724),
+    "Mombasa, Kenya": (-4.04348, 39.66818),
+    "Kisumu, Kenya": (-0.09170, 34.76800),
+}
+GRID_TILE_KM = 15
+GRID_MIN_TILE_KM = 1
+GRID_SPLIT_THRESHOLD = 100  # Needs MAX_RESULTS >= this to ever split
 
 # Advanced settings
 ENABLE_PROXY = False  # New parameter for proxy support
 VERIFY_SSL = True     # New parameter for SSL verification
 DEBUG_MODE = False    # New parameter for debugging
-SAVE_HTML = False     # New parameter to save raw HTML responses
+SAVE_HTML = False     # Save detail-pane snapshots (--snapshots mode) to SNAPSHOT_DIR for offline re-parsing
 # ...existing code...
 
 # Elasticsearch settings
 ELASTICSEARCH_HOSTS = ["http://localhost:9200"]  # Default Elasticsearch port
 ELASTICSEARCH_USERNAME = ""  # If authentication is needed
-ELASTICSEARCH_PASSWORD = ""  # If authentication is needed
\ No newline at end of file
+ELASTICSEARCH_PASSWORD = ""  # If authentication is needed
+
+# Selector statistics
+SELECTOR_STATS_FILE = "selector_stats.json"  # Hit/miss counts used to order fallback selectors
+DEAD_SELECTOR_MIN_ATTEMPTS = 50               # Misses without a hit before a selector is reported dead
+
+# Wait settings in seconds (waits return as soon as the DOM is ready)
+RESULTS_TIMEOUT = 20      # Search results panel after navigation
+DETAIL_PANE_TIMEOUT = 10  # Detail pane showing the clicked business
+FEED_GROWTH_TIMEOUT = 8   # New cards appearing after a feed scroll
+
+# Randomized politeness delays (min, max) in seconds, separate from load waiting
+POLITENESS_DELAYS = {
+    'business': (0.0, 0.0),  # Between opening two businesses (paced by the RATE_* controller)
+    'scroll': (0.0, 0.0),    # After each feed scroll (paced by the RATE_* controller)
+}
+
+# Streaming output
+SINK_FLUSH_EVERY = 25  # Rows written between flushes to disk
+
+# Checkpointing
+CHECKPOINT_FILE = "scrape_checkpoint.db"  # Progress record used by --resume
+
+# Snapshot mode (--snapshots): browser captures HTML, a process pool parses it
+SNAPSHOT_DIR = "snapshots"  # Where snapshots are saved when SAVE_HTML is True
+PARSER_WORKERS = 2          # lxml parser processes per browser
+
+# Scrapy engine (scrapers.py, --engine scrapy)
+SCRAPY_CONCURRENT_REQUESTS = 32             # Requests in flight per process
+SCRAPY_CONCURRENT_REQUESTS_PER_DOMAIN = 8   # Per-domain concurrency limit
+SCRAPY_DOWNLOAD_DELAY = 0.25                # Seconds between requests to the same domain
+SCRAPY_HTTPCACHE_ENABLED = True
+SCRAPY_HTTPCACHE_DIR = "httpcache"
+SCRAPY_HTTPCACHE_EXPIRATION_SECS = 24 * 3600
+
+# Adaptive rate control (AIMD token bucket shared by all jobs and workers)
+RATE_INITIAL = 0.5              # Requests per second at start-up
+RATE_MIN = 1 / MAX_DELAY        # Never slower than the old worst-case delay
+RATE_MAX = 4.0                  # Upper bound however healthy the site looks
+RATE_INCREASE = 0.05            # Added to the rate after each healthy response
+RATE_DECREASE_FACTOR = 0.5      # Rate multiplier on timeouts, errors and slow responses
+RATE_LATENCY_TARGET = 5.0       # Seconds; slower responses count as congestion
+RATE_BURST = 2                  # Tokens that can accumulate while idle
+RATE_BLOCK_COOLDOWN = 60.0      # Seconds everyone pauses after a CAPTCHA/block page
+
+# Browser profile: "lean" runs headless and blocks images, fonts, media and map
+# tiles (only text is read); "full" loads everything, e.g. for debugging
+BROWSER_PROFILE = "lean"
+LEAN_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.mp3",
+    "*googleusercontent.com/*",   # Place photos and avatars
+    "*gstatic.com/*/vt/*",        # Vector map tiles
+    "*google.com/maps/vt*",       # Raster map tiles
+    "*fonts.googleapis.com/*", "*fonts.gstatic.com/*",
+]
+
+# Driver lifecycle: browsers are replaced when their session dies and
+# recycled between jobs once they have served this many pages or grown past
+# this resident memory (browser + driver process tree, MB; None disables)
+DRIVER_MAX_PAGES = 500
+DRIVER_MAX_RSS_MB = 1500
+
+# Place detail cache: skip the detail pane for places extracted recently.
+# Each field group expires on its own (seconds); hours and reviews change
+# more often than a place's identity
+PLACE_CACHE_FILE = "place_cache.db"
+PLACE_CACHE_TTLS = {
+    'identity': 30 * 24 * 3600,  # name, address, phone, website, category
+    'hours': 7 * 24 * 3600,
+    'reviews': 2 * 24 * 3600,    # rating, review count, price level
+}
+PLACE_CACHE_MAX_ENTRIES = 100000  # Least recently used places are evicted beyond this
+
+# Elasticsearch bulk indexing (--output es:<index>)
+ELASTICSEARCH_INDEX = "businesses"
+ES_BULK_MAX_DOCS = 500                # Documents per _bulk request
+ES_BULK_MAX_BYTES = 5 * 1024 * 1024   # Request body size per _bulk request
+ES_BULK_MAX_IN_FLIGHT = 2             # Queued requests before write() blocks
+ES_BULK_MAX_RETRIES = 3               # Retries for rejected (429/5xx) documents and failed requests
+ES_BULK_TIMEOUT = 30                  # Seconds per _bulk request
+
+# Run profile (stage timers, WebDriver command counts) written at the end of
+# every run, as JSON and as HTML next to it
+PROFILE_REPORT_FILE = "run_profile.json"
+METRICS_FILE = None  # Prometheus text file, e.g. for node_exporter's textfile collector
+
+# Shared job queue (--queue queue.db or --queue http://host:8765): a node
+# renews its leases every third of QUEUE_LEASE_SECONDS, a lease not renewed
+# for that long goes back to the queue, and a job is given up after
+# QUEUE_MAX_ATTEMPTS claims. Idle nodes poll while other nodes hold leases
+QUEUE_LEASE_SECONDS = 300
+QUEUE_MAX_ATTEMPTS = 3
+QUEUE_POLL_SECONDS = 30
+
+# Cold start: the chromedriver path is looked up once and cached with the
+# version pin it was resolved for (None: latest release, reused until it can
+# no longer start Chrome). Chrome profiles persist in CHROME_USER_DATA_DIR,
+# one slot per concurrent browser, so Maps scripts and styles are served
+# from the disk cache; None starts every browser with a fresh profile
+CHROMEDRIVER_CACHE_FILE = "chromedriver_path.json"
+CHROMEDRIVER_VERSION = None
+CHROME_USER_DATA_DIR = "chrome_profiles"
@@ -0,0 +1,169 @@
+import logging
+import os
+from collections import Counter
+
+from config import DRIVER_MAX_PAGES, DRIVER_MAX_RSS_MB
+
+logger = logging.getLogger(__name__)
+
+
+def _children_by_parent():
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name may contain spaces; fields resume after ')'
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def _proc_rss(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def process_tree_rss(pid):
+    """
+    Resident memory in bytes of a process and all its descendants
+
+    Uses psutil when installed, /proc otherwise; None when neither works.
+    """
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            processes = [process] + process.children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for proc in processes:
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+
+    if not os.path.isdir('/proc'):
+        return None
+    children = _children_by_parent()
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        total += _proc_rss(current)
+        stack.extend(children.get(current, []))
+    return total
+
+
+class DriverManager:
+    """
+    Owns one browser session and keeps it usable across jobs
+
+    The manager stands in for the driver: attribute access is forwarded to
+    the current session, so scrape functions take it wherever they take a
+    driver. check() runs before each job and replaces a dead session or
+    recycles a healthy one that has served max_pages pages or grown past
+    max_rss_mb; recover() runs after a WebDriverException so a retry never
+    runs against a crashed browser.
+    """
+
+    def __init__(self, factory=None, max_pages=DRIVER_MAX_PAGES, max_rss_mb=DRIVER_MAX_RSS_MB):
+        if factory is None:
+            from browser_controller import create_driver
+            factory = create_driver
+        self.factory = factory
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.driver = None
+        self.restarts = Counter()
+
+    def __getattr__(self, name):
+        # Only reached for attributes the manager itself does not define
+        driver = self.__dict__.get('driver')
+        if driver is None:
+            raise AttributeError(name)
+        return getattr(driver, name)
+
+    def start(self):
+        if self.driver is None:
+            self.driver = self.factory()
+        return self.driver
+
+    def is_alive(self):
+        if self.driver is None:
+            return False
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except Exception as e:
+            logger.warning(f"Browser session is unresponsive: {str(e)}")
+            return False
+
+    def pages_served(self):
+        """Pages recorded by the driver's PageStats, or None if it has none"""
+        stats = getattr(self.driver, 'page_stats', None)
+        return stats.pages if stats is not None else None
+
+    def rss_mb(self):
+        service = getattr(self.driver, 'service', None)
+        process = getattr(service, 'process', None)
+        if process is None:
+            return None
+        rss = process_tree_rss(process.pid)
+        return rss / 1024 / 1024 if rss is not None else None
+
+    def restart(self, reason):
+        logger.info(f"Restarting browser ({reason})")
+        self.quit()
+        self.restarts[reason] += 1
+        return self.start()
+
+    def check(self):
+        """Make sure a healthy, not-yet-worn-out session is ready for the next job"""
+        if self.driver is None:
+            return self.start()
+        if not self.is_alive():
+            return self.restart('dead')
+        if self.max_pages and (self.pages_served() or 0) >= self.max_pages:
+            return self.restart('pages')
+        if self.max_rss_mb:
+            rss = self.rss_mb()
+            if rss is not None and rss > self.max_rss_mb:
+                logger.info(f"Browser RSS {rss:.0f} MB exceeds {self.max_rss_mb} MB")
+                return self.restart('rss')
+        return self.driver
+
+    def recover(self):
+        """Replace the session if a failure left it dead"""
+        if not self.is_alive():
+            self.restart('dead')
+
+    def quit(self):
+        if self.driver is None:
+            return
+        from browser_controller import log_page_stats
+        driver, self.driver = self.driver, None
+        log_page_stats(driver)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.error(f"Error closing browser: {str(e)}")
+
+    def report(self):
+        if self.restarts:
+            details = ', '.join(f"{reason}: {count}" for reason, count in sorted(self.restarts.items()))
+            logger.info(f"Browser restarts: {sum(self.restarts.values())} ({details})")
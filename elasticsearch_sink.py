@@ -0,0 +1,181 @@
+import base64
+import json
+import logging
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from config import (
+    ELASTICSEARCH_HOSTS, ELASTICSEARCH_USERNAME, ELASTICSEARCH_PASSWORD, ELASTICSEARCH_INDEX,
+    ES_BULK_MAX_DOCS, ES_BULK_MAX_BYTES, ES_BULK_MAX_IN_FLIGHT, ES_BULK_MAX_RETRIES, ES_BULK_TIMEOUT
+)
+from storage import BatchedStore
+
+logger = logging.getLogger(__name__)
+
+# Item statuses worth retrying: rejected under load or a shard hiccup
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class BulkRequestError(Exception):
+    """A _bulk request failed as a whole"""
+
+
+class ElasticsearchSink(BatchedStore):
+    """
+    Stream records into an Elasticsearch index through the _bulk API
+
+    Documents are batched up to max_docs documents or max_bytes of request
+    body and sent by a background thread, so scraping continues while a
+    batch is indexed. At most max_in_flight batches wait to be sent;
+    beyond that write() blocks. Documents use the place ID as _id, so a
+    re-run overwrites them instead of adding duplicates. Rejected documents
+    (429/5xx) are retried with backoff; requests that fail as a whole are
+    retried against the next host.
+
+    flush() waits until every queued batch has been indexed before on_flush
+    runs, so a checkpoint never claims places Elasticsearch does not have.
+    If any document since the previous flush was not indexed, flush() raises
+    BulkRequestError instead and on_flush does not run.
+    """
+
+    def __init__(self, index=ELASTICSEARCH_INDEX, hosts=None, username=ELASTICSEARCH_USERNAME,
+                 password=ELASTICSEARCH_PASSWORD, max_docs=ES_BULK_MAX_DOCS, max_bytes=ES_BULK_MAX_BYTES,
+                 max_in_flight=ES_BULK_MAX_IN_FLIGHT, max_retries=ES_BULK_MAX_RETRIES,
+                 timeout=ES_BULK_TIMEOUT, on_flush=None):
+        super().__init__(index, max_docs, on_flush)
+        self.index = index
+        self.hosts = [host.rstrip('/') for host in (hosts or ELASTICSEARCH_HOSTS)]
+        self.max_bytes = max_bytes
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.docs_indexed = 0
+        self.docs_failed = 0
+        self._failed_at_flush = 0
+        self.requests_sent = 0
+        self.index_seconds = 0.0
+        self._headers = {'Content-Type': 'application/x-ndjson'}
+        if username:
+            token = base64.b64encode(f"{username}:{password}".encode('utf-8')).decode('ascii')
+            self._headers['Authorization'] = f"Basic {token}"
+        self._host = 0
+        self._batch_bytes = 0
+        self._in_flight = queue.Queue(maxsize=max(1, max_in_flight))
+        self._sender = threading.Thread(target=self._send_loop, name="es-bulk-sender", daemon=True)
+        self._sender.start()
+
+    def _encode(self, row):
+        action = {'index': {'_index': self.index, '_id': row['place_id']}}
+        return (json.dumps(action) + '\n' + json.dumps(row, ensure_ascii=False) + '\n').encode('utf-8')
+
+    def _queue(self, row):
+        document = self._encode(row)
+        if self._batch and self._batch_bytes + len(document) > self.max_bytes:
+            self._send()
+        self._batch.append(document)
+        self._batch_bytes += len(document)
+        if len(self._batch) >= self.flush_every:
+            self._send()
+
+    def _batch_full(self):
+        # _queue sends full batches itself without waiting for them
+        return False
+
+    def _send(self):
+        if not self._batch:
+            return
+        batch, self._batch, self._batch_bytes = self._batch, [], 0
+        self._in_flight.put(batch)  # Blocks while max_in_flight batches are pending
+
+    def flush(self):
+        self._send()
+        self._in_flight.join()
+        failed, self._failed_at_flush = self.docs_failed - self._failed_at_flush, self.docs_failed
+        if failed:
+            raise BulkRequestError(f"{failed} documents were not indexed into {self.index}")
+        if self.on_flush:
+            self.on_flush()
+
+    def _send_loop(self):
+        while True:
+            batch = self._in_flight.get()
+            try:
+                if batch is None:
+                    return
+                self._index_batch(batch)
+            except Exception as e:
+                logger.error(f"Bulk indexing into {self.index} failed: {str(e)}")
+                self.docs_failed += len(batch)
+            finally:
+                self._in_flight.task_done()
+
+    def _post(self, body):
+        """POST one _bulk body, trying each host in turn"""
+        last_error = None
+        for _ in range(len(self.hosts)):
+            host = self.hosts[self._host % len(self.hosts)]
+            request = urllib.request.Request(f"{host}/_bulk", data=body, headers=self._headers, method='POST')
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    self.requests_sent += 1
+                    return json.loads(response.read())
+            except urllib.error.HTTPError as e:
+                last_error = BulkRequestError(f"{host} answered HTTP {e.code}")
+                if e.code not in RETRY_STATUSES:
+                    raise last_error
+            except (urllib.error.URLError, OSError) as e:
+                last_error = BulkRequestError(f"{host} unreachable: {str(e)}")
+            self._host += 1
+        raise last_error
+
+    def _index_batch(self, documents):
+        started = time.time()
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(min(30, 0.5 * 2 ** attempt))
+            try:
+                result = self._post(b''.join(documents))
+            except BulkRequestError as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"Bulk request failed, retrying: {str(e)}")
+                continue
+
+            retry = []
+            for document, item in zip(documents, result.get('items', [])):
+                outcome = next(iter(item.values()))
+                status = outcome.get('status', 500)
+                if status < 300:
+                    self.docs_indexed += 1
+                elif status in RETRY_STATUSES:
+                    retry.append(document)
+                else:
+                    self.docs_failed += 1
+                    logger.warning(f"Document {outcome.get('_id')} rejected: {outcome.get('error')}")
+            documents = retry
+            if not documents:
+                break
+            if attempt < self.max_retries:
+                logger.info(f"Retrying {len(documents)} rejected documents")
+        else:
+            self.docs_failed += len(documents)
+            logger.error(f"Gave up on {len(documents)} documents after {self.max_retries} retries")
+        self.index_seconds += time.time() - started
+
+    def _stop(self):
+        if self._sender.is_alive():
+            self._in_flight.put(None)
+            self._sender.join()
+
+    def _close(self):
+        self._stop()
+        logger.info(
+            f"Elasticsearch: {self.docs_indexed} documents indexed into {self.index} "
+            f"in {self.requests_sent} bulk requests ({self.index_seconds:.1f}s), {self.docs_failed} failed"
+        )
+
+    def discard(self):
+        self._batch, self._batch_bytes = [], 0
+        super().discard()
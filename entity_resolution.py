@@ -0,0 +1,293 @@
+"""
+Entity resolution: merge records of the same business found by different searches
+
+The same place is often scraped under several search terms, and the rows
+never match exactly because location is the URL of each click. Records are
+normalized (name, phone, address), grouped into blocks by cheap keys (phone
+number, geohash + name prefix, address + name prefix) and only compared
+within a block. Pairs scoring above the thresholds are joined with
+union-find, and every cluster is merged into one canonical record.
+
+Blocks larger than BLOCK_WINDOW are compared with a sorted-neighbourhood
+window instead of all pairs, which keeps the stage near O(n log n):
+
+    python entity_resolution.py kenya_businesses.csv --output kenya_resolved.csv
+"""
+import argparse
+import logging
+import re
+import time
+import unicodedata
+from pathlib import Path
+from urllib.parse import unquote
+
+logger = logging.getLogger(__name__)
+
+# Blocks above this size are compared with a sliding window over the sorted names
+BLOCK_WINDOW = 20
+# Name similarity needed to merge when the block key is a shared phone number
+PHONE_NAME_THRESHOLD = 0.5
+# Name similarity needed to merge on location or address alone
+NAME_THRESHOLD = 0.8
+GEOHASH_PRECISION = 7  # ~150 m cells
+
+# "!3d<lat>!4d<lng>" is the place itself; "/@<lat>,<lng>" is the map viewport
+_PLACE_COORDS_RE = re.compile(r'!3d(-?\d+\.\d+)!4d(-?\d+\.\d+)')
+_VIEWPORT_COORDS_RE = re.compile(r'/@(-?\d+\.\d+),(-?\d+\.\d+)')
+# Start of a branch suffix such as "Java House - Sarit Centre" or "KFC (Moi Avenue)";
+# the patterns are shared with filtering.normalize_names
+BRANCH_SUFFIX_PATTERN = r'[-|–,:(@]|\bat\b'
+NON_ALNUM_PATTERN = r'[^a-z0-9]+'
+_BRANCH_SUFFIX_RE = re.compile(BRANCH_SUFFIX_PATTERN)
+_BRANCH_SUFFIX_CHARS = frozenset('-|–,:(@')
+_NON_ALNUM_RE = re.compile(NON_ALNUM_PATTERN)
+_ADDRESS_ABBREVIATIONS = {
+    'rd': 'road', 'ave': 'avenue', 'av': 'avenue', 'st': 'street', 'hwy': 'highway',
+    'dr': 'drive', 'ln': 'lane', 'bldg': 'building', 'fl': 'floor', 'opp': 'opposite',
+}
+_GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def _ascii_lower(text):
+    text = str(text or '')
+    if not text.isascii():
+        # Accent folding is the slow step, so only run it where needed
+        text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return text.lower()
+
+
+def normalize_name(name):
+    """Lowercase, strip accents, branch suffixes and punctuation"""
+    text = _ascii_lower(name)
+    # Most names are plain words; the cheap tests skip both regexes for them
+    if 'at' in text or not _BRANCH_SUFFIX_CHARS.isdisjoint(text):
+        branch = _BRANCH_SUFFIX_RE.search(text)
+        if branch:
+            text = text[:branch.start()]
+    if '  ' in text or not text.replace(' ', '').isalnum():
+        text = _NON_ALNUM_RE.sub(' ', text)
+    return text.strip()
+
+
+def normalize_phone(phone, default_country='254'):
+    """Digits in international form without "+", e.g. "0712 345678" -> "254712345678" """
+    digits = re.sub(r'\D', '', str(phone or ''))
+    if len(digits) < 7:
+        return ''
+    if digits.startswith('00'):
+        return digits[2:]
+    if digits.startswith('0'):
+        return default_country + digits[1:]
+    return digits
+
+
+def normalize_address(address):
+    tokens = _NON_ALNUM_RE.sub(' ', _ascii_lower(address)).split()
+    return ' '.join(_ADDRESS_ABBREVIATIONS.get(token, token) for token in tokens)
+
+
+def coordinates(url):
+    """(lat, lng) of the place in a Maps URL, or None"""
+    if not url:
+        return None
+    url = unquote(str(url))
+    match = _PLACE_COORDS_RE.search(url) or _VIEWPORT_COORDS_RE.search(url)
+    return (float(match.group(1)), float(match.group(2))) if match else None
+
+
+def _spread_bits(value):
+    """Interleave zeros between the bits of a 32-bit integer"""
+    value &= 0xFFFFFFFF
+    value = (value | value << 16) & 0x0000FFFF0000FFFF
+    value = (value | value << 8) & 0x00FF00FF00FF00FF
+    value = (value | value << 4) & 0x0F0F0F0F0F0F0F0F
+    value = (value | value << 2) & 0x3333333333333333
+    value = (value | value << 1) & 0x5555555555555555
+    return value
+
+
+def geohash(lat, lng, precision=GEOHASH_PRECISION):
+    """Standard base32 geohash, computed by bit interleaving (precision <= 12)"""
+    lat_bits = min(int((lat + 90.0) / 180.0 * 2 ** 32), 2 ** 32 - 1)
+    lng_bits = min(int((lng + 180.0) / 360.0 * 2 ** 32), 2 ** 32 - 1)
+    code = (_spread_bits(lng_bits) << 1 | _spread_bits(lat_bits)) >> (64 - precision * 5)
+    return ''.join(
+        _GEOHASH_ALPHABET[(code >> shift) & 31] for shift in range((precision - 1) * 5, -1, -5)
+    )
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def name_similarity(a, b):
+    """Jaccard similarity of character trigram sets (precomputed frozensets)"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class _Entity:
+    __slots__ = ('index', 'name', 'grams', 'phone', 'address', 'geo', 'place_id', 'keys')
+
+    def __init__(self, index, record):
+        self.index = index
+        self.name = normalize_name(record.get('name'))
+        self.grams = _trigrams(self.name)
+        self.phone = normalize_phone(record.get('phone'))
+        self.address = normalize_address(record.get('address'))
+        self.place_id = record.get('place_id')
+        prefix = self.name[:4]
+        self.keys = []
+        if self.place_id:
+            self.keys.append(('id', self.place_id))
+        if self.phone:
+            self.keys.append(('phone', self.phone))
+        coords = coordinates(record.get('location'))
+        self.geo = geohash(*coords) if coords else None
+        if self.geo and prefix:
+            self.keys.append(('geo', f"{self.geo}:{prefix}"))
+        if self.address and prefix:
+            self.keys.append(('address', f"{self.address}:{prefix}"))
+
+
+def _is_match(kind, a, b):
+    if kind == 'id':
+        if not a.place_id.startswith('label:'):
+            return True
+        # A label key is only the card's name, shared by same-named branches
+        return bool(
+            (a.phone and a.phone == b.phone) or (a.geo and a.geo == b.geo)
+            or (a.address and a.address == b.address)
+        )
+    if a.phone and b.phone and a.phone != b.phone:
+        return False  # Two different numbers: different businesses sharing a building
+    similarity = name_similarity(a.grams, b.grams)
+    if kind == 'phone':
+        return similarity >= PHONE_NAME_THRESHOLD
+    return similarity >= NAME_THRESHOLD
+
+
+class _UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, item):
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+            return True
+        return False
+
+
+def cluster(records, window=BLOCK_WINDOW):
+    """
+    Group records that describe the same business
+
+    Returns:
+        (clusters, stats) where clusters is a list of record-index lists in
+        input order and stats counts blocks, comparisons and merges
+    """
+    entities = [_Entity(index, record) for index, record in enumerate(records)]
+    blocks = {}
+    for entity in entities:
+        for key in entity.keys:
+            blocks.setdefault(key, []).append(entity)
+
+    union_find = _UnionFind(len(entities))
+    stats = {'records': len(entities), 'blocks': 0, 'comparisons': 0, 'merges': 0}
+    for (kind, _), members in blocks.items():
+        if len(members) < 2:
+            continue
+        stats['blocks'] += 1
+        if len(members) > window:
+            # Sorted neighbourhood: only compare names that sort close together
+            members = sorted(members, key=lambda entity: entity.name)
+        for i, a in enumerate(members):
+            for b in members[i + 1:i + 1 + window]:
+                if union_find.find(a.index) == union_find.find(b.index):
+                    continue
+                stats['comparisons'] += 1
+                if _is_match(kind, a, b) and union_find.union(a.index, b.index):
+                    stats['merges'] += 1
+
+    groups = {}
+    for index in range(len(entities)):
+        groups.setdefault(union_find.find(index), []).append(index)
+    return list(groups.values()), stats
+
+
+def _completeness(record):
+    return sum(1 for value in record.values() if value not in (None, ''))
+
+
+def merge_cluster(records):
+    """
+    Canonical record for one cluster: the most complete record, with gaps
+    filled from the others; rating and review count come from the record
+    with the most reviews
+    """
+    if len(records) == 1:
+        return dict(records[0])
+    ordered = sorted(records, key=_completeness, reverse=True)
+    canonical = dict(ordered[0])
+    for record in ordered[1:]:
+        for field, value in record.items():
+            if canonical.get(field) in (None, '') and value not in (None, ''):
+                canonical[field] = value
+    most_reviewed = max(records, key=lambda record: record.get('reviews_count') or 0)
+    if most_reviewed.get('rating') is not None:
+        canonical['rating'] = most_reviewed['rating']
+        canonical['reviews_count'] = most_reviewed.get('reviews_count')
+    terms = sorted({record.get('search_term') for record in records if record.get('search_term')})
+    if terms:
+        canonical['search_term'] = '|'.join(terms)
+    canonical['duplicates'] = len(records) - 1
+    return canonical
+
+
+def resolve(records, window=BLOCK_WINDOW):
+    """Merge duplicate businesses; returns one canonical record per cluster"""
+    records = list(records)
+    started = time.time()
+    clusters, stats = cluster(records, window)
+    resolved = [merge_cluster([records[index] for index in group]) for group in clusters]
+    logger.info(
+        f"Entity resolution: {stats['records']} records -> {len(resolved)} businesses "
+        f"({stats['comparisons']} comparisons in {stats['blocks']} blocks, {time.time() - started:.1f}s)"
+    )
+    return resolved
+
+
+def resolve_output(input_file, output_file):
+    """Resolve an output file (any sink format) into a CSV"""
+    from filtering import read_output
+    from sinks import OUTPUT_COLUMNS
+
+    df = read_output(input_file)
+    records = df.astype(object).where(df.notna(), None).to_dict('records')
+    resolved = resolve(records)
+
+    import pandas as pd
+    columns = OUTPUT_COLUMNS + ['duplicates']
+    pd.DataFrame(resolved).reindex(columns=columns).to_csv(output_file, index=False, encoding='utf-8')
+    logger.info(f"Wrote {len(resolved)} resolved businesses to {output_file}")
+    return resolved
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Merge duplicate businesses in scraped output")
+    parser.add_argument('input')
+    parser.add_argument('--output', default=None, help="Default: <input>_resolved.csv")
+    args = parser.parse_args()
+    resolve_output(args.input, args.output or str(Path(args.input).with_suffix('')) + "_resolved.csv")
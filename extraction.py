@@ -0,0 +1,245 @@
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Fallback selectors per field, tried in order (first valid value wins)
+FIELD_SELECTORS = {
+    'name': [
+        'h1[data-attrid="title"]',
+        '.DUwDvf.fontHeadlineSmall',
+        '.qrShPb .fontHeadlineSmall',
+        'h1.DUwDvf',
+        '.x3AX1-LfntMc-header-title-title'
+    ],
+    'rating': [
+        '.MW4etd',
+        '.ceNzKf',
+        '[data-value]',
+        '.gm2-body-2'
+    ],
+    'reviews_count': [
+        '.UY7F9',
+        '.ceNzKf',
+        '[data-value] + span',
+        '.gm2-body-2'
+    ],
+    'address': [
+        '.Io6YTe',
+        '[data-item-id*="address"]',
+        '.rogA2c .Io6YTe',
+        '.LrzXr'
+    ],
+    'phone': [
+        '[data-item-id*="phone"]',
+        '.rogA2c .Io6YTe',
+        'span[data-dtype="d3ph"]'
+    ],
+    'website': [
+        'a[data-item-id*="authority"]',
+        'a[href*="http"]:not([href*="google"])',
+        '.CsEnBe a[href*="http"]'
+    ],
+    'category': [
+        '.DkEaL',
+        '.mgr77e .DkEaL',
+        '.LBgpqf .DkEaL'
+    ],
+    'hours': [
+        '.t39EBf',
+        '.OqCZI .t39EBf',
+        '[data-dtype="d3oh"]'
+    ],
+    'price_level': [
+        '.mgr77e',
+        '.priceRange',
+        '[data-dtype="d3pr"]'
+    ],
+}
+
+# Fields read from an attribute instead of the element text
+FIELD_ATTRIBUTES = {
+    'website': 'href',
+}
+
+# Value returned when no selector produces a valid value
+FIELD_DEFAULTS = {
+    'name': "Unknown",
+    'reviews_count': 0,
+}
+
+
+def _parse_text(raw):
+    text = raw.strip()
+    return text or None
+
+
+def _parse_rating(raw):
+    rating_match = re.search(r'(\d+\.?\d*)', raw.strip())
+    return float(rating_match.group(1)) if rating_match else None
+
+
+def _parse_reviews_count(raw):
+    # Numbers like "(123)" or "1,234 reviews"
+    reviews_match = re.search(r'(\d+)', raw.strip().replace(',', ''))
+    return int(reviews_match.group(1)) if reviews_match else None
+
+
+def _parse_address(raw):
+    address = raw.strip()
+    return address if address and len(address) > 5 else None
+
+
+def _parse_phone(raw):
+    phone = raw.strip()
+    if phone and ('+' in phone or len(re.findall(r'\d', phone)) >= 7):
+        return phone
+    return None
+
+
+def _parse_website(raw):
+    return raw if raw and 'google' not in raw.lower() else None
+
+
+def _parse_price_level(raw):
+    price_text = raw.strip()
+    return price_text.count('$') if '$' in price_text else None
+
+
+# Turn the raw text/attribute of a matched element into a field value,
+# or None if the match is not acceptable and the next selector should be tried
+FIELD_PARSERS = {
+    'name': _parse_text,
+    'rating': _parse_rating,
+    'reviews_count': _parse_reviews_count,
+    'address': _parse_address,
+    'phone': _parse_phone,
+    'website': _parse_website,
+    'category': _parse_text,
+    'hours': _parse_text,
+    'price_level': _parse_price_level,
+}
+
+# Evaluates the whole selector table in the page and returns, for every field,
+# the raw value of the first element matching each selector (null on a miss)
+EXTRACT_FIELDS_JS = """
+var table = arguments[0];
+var out = {};
+Object.keys(table).forEach(function (field) {
+    var spec = table[field];
+    out[field] = spec.selectors.map(function (selector) {
+        var el;
+        try {
+            el = document.querySelector(selector);
+        } catch (e) {
+            return null;
+        }
+        if (!el) {
+            return null;
+        }
+        if (spec.attribute) {
+            var value = el[spec.attribute];
+            if (value === undefined || value === null) {
+                value = el.getAttribute(spec.attribute);
+            }
+            return value === null ? null : String(value);
+        }
+        return el.innerText || el.textContent || '';
+    });
+});
+return out;
+"""
+
+
+def parse_field(field, raw):
+    """Apply the field parser to a raw value, returning None if it is rejected"""
+    if raw is None:
+        return None
+    try:
+        return FIELD_PARSERS[field](raw)
+    except ValueError:
+        return None
+
+
+def pick_field_value(field, selectors, raw_values):
+    """
+    Pick the first valid value following the selector fallback order
+
+    Args:
+        field: Field name (key of FIELD_SELECTORS)
+        selectors: Selectors in the order they should be tried
+        raw_values: Mapping of selector -> raw value (None on a miss)
+
+    Returns:
+        Parsed value, or the field default if no selector matched
+    """
+    for selector in selectors:
+        value = parse_field(field, raw_values.get(selector))
+        if value is not None:
+            return value
+    return FIELD_DEFAULTS.get(field)
+
+
+def selector_hits(field, selectors, raw_values):
+    """
+    List the (field, selector, hit) outcomes of picking a value in order
+
+    Only the selectors pick_field_value actually tried are reported: misses
+    up to the one that produced the value and a hit for that one. Selectors
+    after it were never needed, so a generic fallback that also happens to
+    match cannot outscore the specific selector in front of it.
+    """
+    hits = []
+    for selector in selectors:
+        hit = parse_field(field, raw_values.get(selector)) is not None
+        hits.append((field, selector, hit))
+        if hit:
+            break
+    return hits
+
+
+def build_selector_table(fields=None, registry=None):
+    """Build the argument passed to EXTRACT_FIELDS_JS, ordered by the registry if given"""
+    fields = fields or FIELD_SELECTORS.keys()
+    return {
+        field: {
+            'selectors': (
+                registry.ordered(field, FIELD_SELECTORS[field]) if registry
+                else FIELD_SELECTORS[field]
+            ),
+            'attribute': FIELD_ATTRIBUTES.get(field),
+        }
+        for field in fields
+    }
+
+
+def extract_fields(driver, fields=None, registry=None):
+    """
+    Extract every business field in a single WebDriver round-trip
+
+    Uses the same selectors, validation and defaults as the per-field
+    extract_* helpers in scraper.py, but evaluates them all in the page
+    through one execute_script call, so selector misses never hit the
+    driver's implicit wait.
+
+    Args:
+        driver: Selenium WebDriver instance with the detail pane open
+        fields: Optional subset of field names (defaults to all)
+        registry: Optional SelectorRegistry that orders the fallbacks and
+            records the selectors tried for each field (see selector_hits)
+
+    Returns:
+        Dictionary of field -> value
+    """
+    table = build_selector_table(fields, registry)
+    raw = driver.execute_script(EXTRACT_FIELDS_JS, table) or {}
+
+    business_data = {}
+    for field, spec in table.items():
+        selectors = spec['selectors']
+        raw_values = dict(zip(selectors, raw.get(field) or []))
+        if registry:
+            for _, selector, hit in selector_hits(field, selectors, raw_values):
+                registry.record(field, selector, hit)
+        business_data[field] = pick_field_value(field, selectors, raw_values)
+    return business_data
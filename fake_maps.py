@@ -0,0 +1,478 @@
+"""
+Offline stand-in for Chrome on Google Maps, for benchmarks and tests
+
+FakeMapsDriver implements the part of the WebDriver API that
+scrape_google_maps uses and answers the scraper's scripts (card reads,
+batched extraction, the MutationObserver waits, snapshots) by evaluating
+the same selectors with lxml against generated Maps-like pages: a results
+feed that loads PAGE_SIZE cards per scroll and a detail pane per business.
+Places can be synthetic (make_places, with a share of missing fields) or
+built from saved detail-pane snapshots (places_from_snapshots).
+
+Latency is real wall-clock time: every command costs rtt seconds, the
+detail pane renders pane_delay after a click (slow_pane_delay for a
+slow_pane_rate share of places) and new cards appear feed_delay after a
+scroll. The driver counts every WebDriver command and groups consecutive
+commands into stage spans (navigate, cards, open, extract, scroll).
+"""
+import html
+import random
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import quote_plus
+
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+
+from browser_controller import PageStats
+from extraction import EXTRACT_FIELDS_JS
+from listing import (
+    READ_CARDS_JS, CARD_LINK_SELECTOR, CARD_SELECTORS,
+    CARD_LINK_ATTRIBUTES, CARD_INFO_SELECTOR
+)
+from place_identity import CARD_KEYS_JS
+from rate_control import DETECT_BLOCK_JS
+from snapshots import SNAPSHOT_JS, load_snapshot, parse_snapshot
+from waits import DETAIL_PANE_READY_JS, FEED_GROWTH_JS, DISMISS_CONSENT_JS
+
+PAGE_SIZE = 20  # Cards the feed shows initially and adds per scroll
+END_OF_LIST_TEXT = "You've reached the end of the list."
+
+CATEGORIES = ["Restaurant", "Coffee shop", "Hotel", "Bar", "Pharmacy", "Barber shop", "Supermarket"]
+STREETS = ["Kenyatta Avenue", "Moi Avenue", "Waiyaki Way", "Ngong Road", "Kimathi Street", "Biashara Street"]
+
+# Command -> stage it is accounted to
+STAGES = {
+    'get': 'navigate', 'dismiss_consent': 'navigate', 'find_main': 'navigate', 'detect_block': 'navigate',
+    'find_elements': 'cards', 'card_keys': 'cards', 'read_cards': 'cards',
+    'scroll_into_view': 'open', 'click': 'open', 'js_click': 'open', 'detail_pane_wait': 'open',
+    'extract_fields': 'extract', 'snapshot': 'extract', 'current_url': 'extract',
+    'find_element': 'extract', 'get_attribute': 'extract', 'text': 'extract',
+    'scroll': 'scroll', 'feed_growth_wait': 'scroll',
+}
+
+_compiled = {}
+
+
+def _select(css, root):
+    from lxml.cssselect import CSSSelector
+    if css not in _compiled:
+        _compiled[css] = CSSSelector(css)
+    return _compiled[css](root)
+
+
+def _text(element):
+    return ' '.join(element.text_content().split())
+
+
+def make_places(count, seed=0, missing_rate=0.2):
+    """Synthetic businesses; each optional field is missing with probability missing_rate"""
+    rng = random.Random(seed)
+
+    def maybe(value):
+        return None if rng.random() < missing_rate else value
+
+    places = []
+    for i in range(count):
+        places.append({
+            'name': f"{rng.choice(['Mama', 'Java', 'Savanna', 'Tamu', 'Jiko', 'Baraka'])} "
+                    f"{rng.choice(CATEGORIES)} {i}",
+            'rating': maybe(round(rng.uniform(2.5, 5.0), 1)),
+            'reviews_count': maybe(rng.randint(1, 3000)),
+            'category': maybe(rng.choice(CATEGORIES)),
+            'price_level': maybe(rng.randint(1, 4)),
+            'address': maybe(f"{rng.randint(1, 400)} {rng.choice(STREETS)}, Nairobi"),
+            'phone': maybe(f"+254 7{rng.randint(10, 99)} {rng.randint(100000, 999999)}"),
+            'website': maybe(f"https://business{i}.co.ke/"),
+            'hours': maybe("Open · Closes 10 pm"),
+            'feature_id': f"0x{rng.getrandbits(60):x}:0x{i + 1:x}",
+            'lat': round(-1.28 + rng.uniform(-0.05, 0.05), 6),
+            'lng': round(36.82 + rng.uniform(-0.05, 0.05), 6),
+        })
+    return places
+
+
+def places_from_snapshots(directory):
+    """Places replaying saved detail-pane snapshots (see snapshots.save_snapshot)"""
+    places = []
+    for i, path in enumerate(sorted(Path(directory).glob('*.html'))):
+        snapshot = load_snapshot(path)
+        record, _ = parse_snapshot(snapshot['html'], snapshot.get('url'))
+        place = {field: record.get(field) for field in (
+            'name', 'rating', 'reviews_count', 'category', 'price_level', 'address', 'phone', 'website', 'hours'
+        )}
+        place.update(feature_id=f"0x{i + 1:x}:0x{i + 1:x}", lat=-1.28, lng=36.82,
+                     detail_html=snapshot['html'], url=snapshot.get('url'))
+        places.append(place)
+    return places
+
+
+def place_url(place):
+    if place.get('url'):
+        return place['url']
+    return (f"https://www.google.com/maps/place/{quote_plus(place['name'])}/"
+            f"data=!4m7!3m6!1s{place['feature_id']}!8m2!3d{place['lat']}!4d{place['lng']}")
+
+
+def card_html(place, index):
+    e = html.escape
+    parts = [
+        f'<div class="Nv2PK"><a class="hfpxzc" data-result-index="{index}" '
+        f'aria-label="{e(place["name"])}" href="{e(place_url(place))}"></a>',
+        f'<div class="qBF1Pd fontHeadlineSmall">{e(place["name"])}</div>',
+    ]
+    if place.get('rating') is not None:
+        parts.append(f'<span class="MW4etd">{place["rating"]}</span>')
+    if place.get('reviews_count') is not None:
+        parts.append(f'<span class="UY7F9">({place["reviews_count"]:,})</span>')
+    info = [value for value in (
+        place.get('category'), '$' * (place.get('price_level') or 0), place.get('address')
+    ) if value]
+    parts.append(f'<div class="W4Efsd"><div class="W4Efsd">{e(" · ".join(info))}</div>')
+    if place.get('hours'):
+        parts.append(f'<div class="W4Efsd">{e(place["hours"])}</div>')
+    parts.append('</div>')
+    if place.get('website'):
+        parts.append(f'<a data-value="Website" href="{e(place["website"])}"></a>')
+    parts.append('</div>')
+    return ''.join(parts)
+
+
+def detail_html(place):
+    if place.get('detail_html'):
+        return place['detail_html']
+    e = html.escape
+    parts = [f'<html><body><div role="main" aria-label="{e(place["name"])}">',
+             f'<h1 class="DUwDvf fontHeadlineSmall">{e(place["name"])}</h1>']
+    if place.get('rating') is not None:
+        parts.append(f'<div class="F7nice"><span class="MW4etd">{place["rating"]}</span>')
+        if place.get('reviews_count') is not None:
+            parts.append(f'<span class="UY7F9">({place["reviews_count"]:,})</span>')
+        parts.append('</div>')
+    if place.get('category'):
+        parts.append(f'<button class="DkEaL">{e(place["category"])}</button>')
+    if place.get('price_level'):
+        parts.append(f'<span class="mgr77e">{"$" * place["price_level"]}</span>')
+    if place.get('address'):
+        parts.append(f'<button data-item-id="address"><div class="Io6YTe">{e(place["address"])}</div></button>')
+    if place.get('website'):
+        parts.append(f'<a data-item-id="authority" href="{e(place["website"])}">{e(place["website"])}</a>')
+    if place.get('phone'):
+        phone_id = 'phone:tel:' + ''.join(c for c in place['phone'] if c.isdigit())
+        parts.append(f'<button data-item-id="{phone_id}"><div class="Io6YTe">{e(place["phone"])}</div></button>')
+    if place.get('hours'):
+        parts.append(f'<div class="t39EBf">{e(place["hours"])}</div>')
+    parts.append('</div></body></html>')
+    return ''.join(parts)
+
+
+class FakeElement:
+    """A feed card link, the results panel or an element of the detail pane"""
+
+    def __init__(self, driver, index=None, node=None, tag_name='a'):
+        self._driver = driver
+        self.index = index
+        self.node = node
+        self.tag_name = tag_name
+
+    def click(self):
+        self._driver._command('click')
+        self._driver._open(self.index)
+
+    def get_attribute(self, name):
+        self._driver._command('get_attribute')
+        if self.node is not None:
+            return self.node.get(name)
+        return self._driver._card_attribute(self.index, name)
+
+    @property
+    def text(self):
+        self._driver._command('text')
+        return _text(self.node) if self.node is not None else ''
+
+
+class FakeMapsDriver:
+    """
+    WebDriver double serving a Maps search over the given places
+
+    Args:
+        places: Place dicts (make_places / places_from_snapshots)
+        rtt: Seconds charged for every WebDriver command
+        pane_delay: Seconds from a click until the detail pane renders
+        slow_pane_rate: Share of places whose pane takes slow_pane_delay
+        feed_delay: Seconds from a scroll until the next cards appear
+        page_size: Cards loaded initially and per scroll
+        implicit_wait: Seconds a find_element miss costs
+    """
+
+    def __init__(self, places, rtt=0.0, pane_delay=0.0, slow_pane_rate=0.0, slow_pane_delay=0.0,
+                 feed_delay=0.0, page_size=PAGE_SIZE, implicit_wait=0.0, seed=0):
+        self.places = list(places)
+        self.rtt = rtt
+        self.pane_delay = pane_delay
+        self.feed_delay = feed_delay
+        self.page_size = page_size
+        self.implicit_wait = implicit_wait
+        rng = random.Random(seed)
+        self._slow = {i for i in range(len(self.places)) if rng.random() < slow_pane_rate}
+        self._slow_pane_delay = slow_pane_delay
+        self.calls = Counter()
+        self.spans = {}
+        self.page_stats = PageStats()
+        self.current_url = 'about:blank'
+        self._loaded = 0
+        self._feed_ready_at = None
+        self._open_index = None
+        self._previous_index = None
+        self._pane_ready_at = 0.0
+        self._pane_trees = {}
+        self._cards = {}
+        self._panel = FakeElement(self, tag_name='div')
+        self._stage = None
+        self._span_start = self._span_end = None
+
+    # Accounting
+
+    def _command(self, name):
+        now = time.perf_counter()
+        stage = STAGES[name]
+        if stage != self._stage:
+            self._close_span()
+            self._stage, self._span_start = stage, now
+        self.calls[name] += 1
+        self._sleep(self.rtt)
+
+    def _sleep(self, seconds):
+        """Simulated latency, charged to the stage span in progress"""
+        if seconds > 0:
+            time.sleep(seconds)
+        self._span_end = time.perf_counter()
+
+    def _close_span(self):
+        if self._stage is not None:
+            self.spans.setdefault(self._stage, []).append(self._span_end - self._span_start)
+            self._stage = None
+
+    def finish(self):
+        """Close the stage span in progress; call before reading spans"""
+        self._close_span()
+
+    @property
+    def command_count(self):
+        return sum(self.calls.values())
+
+    # Page state
+
+    def _open(self, index):
+        self._previous_index = self._shown_index()
+        self._open_index = index
+        delay = self._slow_pane_delay if index in self._slow else self.pane_delay
+        self._pane_ready_at = time.perf_counter() + delay
+        self.current_url = place_url(self.places[index])
+
+    def _shown_index(self):
+        """Place on screen: the previous pane stays up until the clicked one renders"""
+        if self._open_index is None or time.perf_counter() < self._pane_ready_at:
+            return self._previous_index
+        return self._open_index
+
+    def _pane(self):
+        index = self._shown_index()
+        if index is None:
+            return None
+        if index not in self._pane_trees:
+            import lxml.html
+            self._pane_trees[index] = lxml.html.fromstring(detail_html(self.places[index]))
+        return self._pane_trees[index]
+
+    def _pane_ready(self, expected, previous, selectors):
+        """Same check DETAIL_PANE_READY_JS runs on the heading currently shown"""
+        pane = self._pane()
+        name = None
+        for css in selectors:
+            match = _select(css, pane) if pane is not None else []
+            if match and _text(match[0]):
+                name = _text(match[0])
+                break
+        if not name:
+            return False
+        if expected:
+            return ' '.join(name.split()).lower() == ' '.join(expected.split()).lower()
+        return name != previous
+
+    def _card(self, index):
+        if index not in self._cards:
+            import lxml.html
+            container = lxml.html.fragment_fromstring(card_html(self.places[index], index))
+            self._cards[index] = container
+        return self._cards[index]
+
+    def _card_attribute(self, index, name):
+        link = _select(CARD_LINK_SELECTOR, self._card(index))[0]
+        return link.get(name)
+
+    def _read_card(self, index, with_fields=True):
+        """Same fields READ_CARDS_JS reads from one card container"""
+        container = self._card(index)
+        link = _select(CARD_LINK_SELECTOR, container)[0]
+        card = {'el': FakeElement(self, index), 'index': index,
+                'href': link.get('href'), 'label': link.get('aria-label')}
+        if not with_fields:
+            return card
+        for field, selectors in CARD_SELECTORS.items():
+            card[field] = None
+            for css in selectors:
+                match = _select(css, container)
+                if match:
+                    card[field] = _text(match[0])
+                    break
+        for field, (css, attribute) in CARD_LINK_ATTRIBUTES.items():
+            match = _select(css, container)
+            card[field] = match[0].get(attribute) if match else None
+        card['info'] = [
+            _text(info) for info in _select(CARD_INFO_SELECTOR, container)
+            if not _select(CARD_INFO_SELECTOR, info)
+        ]
+        return card
+
+    @property
+    def end_of_list(self):
+        return self._loaded >= len(self.places)
+
+    def feed_html(self):
+        """The results feed as currently loaded, with the end-of-list marker once complete"""
+        cards = ''.join(card_html(self.places[i], i) for i in range(self._loaded))
+        end = f'<div class="HlvSq">{END_OF_LIST_TEXT}</div>' if self.end_of_list else ''
+        return f'<div role="feed">{cards}{end}</div>'
+
+    def _grow_feed(self):
+        if self._feed_ready_at is not None and time.perf_counter() >= self._feed_ready_at:
+            self._loaded = min(len(self.places), self._loaded + self.page_size)
+            self._feed_ready_at = None
+
+    def _wait_until(self, ready_at, timeout):
+        """Sleep until ready_at or for timeout seconds; True if ready_at was reached"""
+        remaining = ready_at - time.perf_counter()
+        if remaining > timeout:
+            self._sleep(timeout)
+            return False
+        self._sleep(remaining)
+        return True
+
+    # WebDriver API
+
+    def get(self, url):
+        self._command('get')
+        self.current_url = url
+        self._loaded = min(len(self.places), self.page_size)
+        self._feed_ready_at = None
+        self._open_index = None
+
+    def find_element(self, by, selector):
+        if selector == '[role="main"]':
+            self._command('find_main')
+            return self._panel
+        self._command('find_element')
+        pane = self._pane()
+        matches = _select(selector, pane) if pane is not None else []
+        if not matches:
+            self._sleep(self.implicit_wait)
+            raise NoSuchElementException(selector)
+        return FakeElement(self, node=matches[0], tag_name=matches[0].tag)
+
+    def find_elements(self, by, selector):
+        self._command('find_elements')
+        self._grow_feed()
+        return [FakeElement(self, i) for i in range(self._loaded)]
+
+    def execute_script(self, script, *args):
+        if script == EXTRACT_FIELDS_JS:
+            self._command('extract_fields')
+            return self._extract(args[0])
+        if script == READ_CARDS_JS:
+            self._command('read_cards')
+            self._grow_feed()
+            watermark, with_fields = args[5], args[6]
+            return {
+                'cards': [self._read_card(i, with_fields) for i in range(max(0, watermark + 1), self._loaded)],
+                'count': self._loaded,
+                'end': self.end_of_list,
+            }
+        if script == CARD_KEYS_JS:
+            self._command('card_keys')
+            return [[self._card_attribute(el.index, 'href'), self._card_attribute(el.index, 'aria-label')]
+                    for el in args[0]]
+        if script == SNAPSHOT_JS:
+            self._command('snapshot')
+            index = self._shown_index()
+            if index is None:
+                return [self.current_url, '<html><body></body></html>']
+            return [self.current_url, detail_html(self.places[index])]
+        if script == DISMISS_CONSENT_JS:
+            self._command('dismiss_consent')
+            return False
+        if script == DETECT_BLOCK_JS:
+            self._command('detect_block')
+            return None
+        if 'scrollIntoView' in script:
+            self._command('scroll_into_view')
+            return self._card_attribute(args[0].index, 'aria-label')
+        if 'scrollTop' in script:
+            self._command('scroll')
+            self._grow_feed()
+            if self._feed_ready_at is None and self._loaded < len(self.places):
+                self._feed_ready_at = time.perf_counter() + self.feed_delay
+            return None
+        if '.click()' in script:
+            self._command('js_click')
+            self._open(args[0].index)
+            return None
+        raise WebDriverException(f"FakeMapsDriver cannot run script: {script[:60]!r}")
+
+    def execute_async_script(self, script, *args):
+        timeout = args[-1] / 1000.0
+        if script == DETAIL_PANE_READY_JS:
+            self._command('detail_pane_wait')
+            expected, previous, selectors = args[0], args[1], args[2]
+            deadline = time.perf_counter() + timeout
+            if self._pane_ready(expected, previous, selectors):
+                return True
+            if self._open_index is not None and self._wait_until(self._pane_ready_at, timeout):
+                if self._pane_ready(expected, previous, selectors):
+                    return True
+            # Nothing else changes the pane: the observer runs into its timeout
+            self._sleep(deadline - time.perf_counter())
+            return False
+        if script == FEED_GROWTH_JS:
+            self._command('feed_growth_wait')
+            previous = args[1]
+            self._grow_feed()
+            if self._loaded <= previous and not self.end_of_list:
+                if self._feed_ready_at is None:
+                    self._sleep(timeout)  # Nobody scrolled: the observer runs into its timeout
+                elif self._wait_until(self._feed_ready_at, timeout):
+                    self._grow_feed()
+            return self._loaded
+        raise WebDriverException(f"FakeMapsDriver cannot run async script: {script[:60]!r}")
+
+    def _extract(self, table):
+        pane = self._pane()
+        out = {}
+        for field, spec in table.items():
+            values = []
+            for css in spec['selectors']:
+                matches = _select(css, pane) if pane is not None else []
+                if not matches:
+                    values.append(None)
+                elif spec['attribute']:
+                    values.append(matches[0].get(spec['attribute']))
+                else:
+                    values.append(matches[0].text_content())
+            out[field] = values
+        return out
+
+    def get_log(self, log_type):
+        return []
+
+    def quit(self):
+        pass
@@ -0,0 +1,157 @@
+"""
+Geo-grid sharding of search jobs
+
+Maps stops returning results after roughly 120 per query, so one
+"restaurants in Nairobi, Kenya" search under-covers a large city. With
+--grid, every location with a centre in LOCATION_CENTERS is split into
+square tiles covering RADIUS_KM around it, and each (tile, term) is
+searched as its own job through a "/maps/search/<term>/@lat,lng,zoomz"
+URL whose viewport matches the tile. A tile that returns
+GRID_SPLIT_THRESHOLD or more results is probably capped and is split into
+four child tiles, which are queued as new jobs, down to GRID_MIN_TILE_KM.
+Sparse outskirts stay one coarse tile each.
+
+Tile jobs are ordinary (location, term) jobs whose location string
+carries the tile ("Nairobi, Kenya [-1.28640,36.81720 8km]"), so the
+checkpoint, worker pool and sinks handle them unchanged. Overlapping
+tiles return some of the same places; the sinks drop repeated place IDs
+and the place cache saves the repeated clicks.
+"""
+import logging
+import math
+import re
+from urllib.parse import quote
+
+from config import (
+    RADIUS_KM, MAX_RESULTS, LOCATION_CENTERS, GRID_TILE_KM, GRID_MIN_TILE_KM, GRID_SPLIT_THRESHOLD
+)
+
+logger = logging.getLogger(__name__)
+
+# Width of the map next to the results panel in the 1280 px browser window
+MAP_WIDTH_PX = 880
+KM_PER_DEGREE_LAT = 110.574
+KM_PER_DEGREE_LNG = 111.320  # At the equator; scaled by cos(latitude)
+
+_TILE_RE = re.compile(r'^(.*) \[(-?\d+\.\d+),(-?\d+\.\d+) (\d+(?:\.\d+)?)km\]$')
+
+
+class Tile:
+    """Square search area: centre and side length"""
+    __slots__ = ('location', 'lat', 'lng', 'size_km')
+
+    def __init__(self, location, lat, lng, size_km):
+        self.location = location
+        self.lat = lat
+        self.lng = lng
+        self.size_km = size_km
+
+    def __str__(self):
+        return f"{self.location} [{self.lat:.5f},{self.lng:.5f} {self.size_km:g}km]"
+
+    @property
+    def zoom(self):
+        """Largest integer zoom whose viewport still spans the whole tile"""
+        meters_per_px = self.size_km * 1000 / MAP_WIDTH_PX
+        zoom = math.log2(156543.03392 * math.cos(math.radians(self.lat)) / meters_per_px)
+        return max(3, min(21, int(math.floor(zoom))))
+
+    def search_url(self, search_term):
+        return f"https://www.google.com/maps/search/{quote(search_term)}/@{self.lat:.5f},{self.lng:.5f},{self.zoom}z"
+
+    def offset(self, north_km, east_km, size_km):
+        lat = self.lat + north_km / KM_PER_DEGREE_LAT
+        lng = self.lng + east_km / (KM_PER_DEGREE_LNG * math.cos(math.radians(self.lat)))
+        return Tile(self.location, lat, lng, size_km)
+
+    def children(self):
+        quarter = self.size_km / 4
+        return [
+            self.offset(north, east, self.size_km / 2)
+            for north in (quarter, -quarter) for east in (-quarter, quarter)
+        ]
+
+
+def parse_tile(location):
+    """The Tile a job location string describes, or None for a plain location"""
+    match = _TILE_RE.match(location or '')
+    if not match:
+        return None
+    name, lat, lng, size_km = match.groups()
+    return Tile(name, float(lat), float(lng), float(size_km))
+
+
+def cover(location, lat, lng, radius_km=RADIUS_KM, tile_km=GRID_TILE_KM):
+    """Tiles of tile_km covering the circle of radius_km around (lat, lng)"""
+    centre = Tile(location, lat, lng, tile_km)
+    per_side = max(1, math.ceil(2 * radius_km / tile_km))
+    half = per_side * tile_km / 2
+    tiles = []
+    for row in range(per_side):
+        for column in range(per_side):
+            north = half - (row + 0.5) * tile_km
+            east = -half + (column + 0.5) * tile_km
+            # Distance from the circle's centre to the nearest point of the tile
+            dy = max(abs(north) - tile_km / 2, 0)
+            dx = max(abs(east) - tile_km / 2, 0)
+            if math.hypot(dx, dy) <= radius_km:
+                tiles.append(centre.offset(north, east, tile_km))
+    return tiles
+
+
+class GridPlanner:
+    """
+    Turns (location, term) jobs into tile jobs and splits dense tiles
+
+    split() is the expand callback of run_serial / run_worker_pool: it is
+    called with every finished job and its result count and returns the
+    jobs to queue next.
+    """
+
+    def __init__(self, centers=None, radius_km=RADIUS_KM, tile_km=GRID_TILE_KM,
+                 min_tile_km=GRID_MIN_TILE_KM, split_threshold=GRID_SPLIT_THRESHOLD):
+        self.centers = LOCATION_CENTERS if centers is None else centers
+        self.radius_km = radius_km
+        self.tile_km = tile_km
+        self.min_tile_km = min_tile_km
+        # A tile can never return more than MAX_RESULTS
+        self.split_threshold = min(split_threshold, MAX_RESULTS)
+        self.tiles_split = 0
+
+    def plan(self, jobs):
+        planned = []
+        for location, term in jobs:
+            center = self.centers.get(location)
+            if center is None:
+                logger.warning(f"No centre for {location} in LOCATION_CENTERS; searching it as one query")
+                planned.append((location, term))
+                continue
+            tiles = cover(location, *center, self.radius_km, self.tile_km)
+            planned.extend((str(tile), term) for tile in tiles)
+        logger.info(f"Geo grid: {len(jobs)} searches planned as {len(planned)} tile jobs")
+        return planned
+
+    def split(self, job, count):
+        """Child tile jobs for a tile whose search returned count result cards (empty if not dense)"""
+        location, term = job
+        tile = parse_tile(location)
+        if tile is None or count < self.split_threshold or tile.size_km / 2 < self.min_tile_km:
+            return []
+        self.tiles_split += 1
+        logger.info(f"Tile {location} returned {count} results for {term}; splitting it in four")
+        return [(str(child), term) for child in tile.children()]
+
+    def resume(self, jobs, done, counts):
+        """
+        Jobs still to run after an interrupted run: finished tiles are
+        replaced by the children their recorded place counts call for
+        """
+        pending = []
+        frontier = list(jobs)
+        while frontier:
+            job = frontier.pop(0)
+            if job in done:
+                frontier.extend(self.split(job, counts.get(job, 0)))
+            else:
+                pending.append(job)
+        return pending
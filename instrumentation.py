@@ -0,0 +1,266 @@
+"""
+Run profile: stage timers, event counters and WebDriver command counts
+
+Every process keeps one Profile (get_profile). The scraper times its
+stages into it (navigation, card reads, clicks, extraction per field,
+selector misses, scroll waits, deliberate sleeps) and create_driver wraps
+the driver's command dispatch so every WebDriver command is counted and
+timed. A timer is a count, a sum, a max and fixed histogram buckets, so
+recording costs a perf_counter call and a few additions and the profile
+stays on in production. Workers send their profile to the parent when
+they finish.
+
+At the end of a run main.py writes the profile as JSON and HTML, and as a
+Prometheus text file when --metrics-file is given:
+
+    python instrumentation.py run_profile.json    # print a saved profile
+"""
+import bisect
+import html
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds (the last bucket is +Inf)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+class _Span:
+    __slots__ = ('profile', 'name', 'started')
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profile.observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class Profile:
+    """Timers and counters of one process, mergeable across processes"""
+
+    def __init__(self):
+        self.timers = {}  # name -> [count, total, max, bucket counts]
+        self.counters = Counter()
+        self.started = time.time()
+
+    def observe(self, name, seconds):
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = [0, 0.0, 0.0, [0] * (len(BUCKETS) + 1)]
+        timer[0] += 1
+        timer[1] += seconds
+        if seconds > timer[2]:
+            timer[2] = seconds
+        timer[3][bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    def timer(self, name):
+        """Context manager timing its block into the named timer"""
+        return _Span(self, name)
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def snapshot(self):
+        """Picklable copy of the recorded values, for merge() in another process"""
+        return {
+            'timers': {name: [t[0], t[1], t[2], list(t[3])] for name, t in self.timers.items()},
+            'counters': dict(self.counters),
+        }
+
+    def merge(self, snapshot):
+        for name, (count, total, longest, buckets) in snapshot['timers'].items():
+            timer = self.timers.setdefault(name, [0, 0.0, 0.0, [0] * (len(BUCKETS) + 1)])
+            timer[0] += count
+            timer[1] += total
+            timer[2] = max(timer[2], longest)
+            timer[3] = [a + b for a, b in zip(timer[3], buckets)]
+        self.counters.update(snapshot['counters'])
+
+    def percentile(self, name, q):
+        """Upper bound of the bucket holding the q-th percentile (capped at the max seen)"""
+        count, _, longest, buckets = self.timers[name]
+        rank = q / 100.0 * count
+        seen = 0
+        for bound, bucket in zip(BUCKETS + (longest,), buckets):
+            seen += bucket
+            if seen >= rank and bucket:
+                return min(bound, longest)
+        return longest
+
+    def report(self):
+        """Timers sorted by total time, with their share of the run's wall time"""
+        wall = max(time.time() - self.started, 1e-9)
+        timers = []
+        for name, (count, total, longest, _) in sorted(self.timers.items(), key=lambda item: -item[1][1]):
+            timers.append({
+                'name': name,
+                'count': count,
+                'total': round(total, 4),
+                'mean': round(total / count, 6) if count else 0.0,
+                'p50': round(self.percentile(name, 50), 6),
+                'p90': round(self.percentile(name, 90), 6),
+                'p99': round(self.percentile(name, 99), 6),
+                'max': round(longest, 6),
+                'share': round(total / wall, 4),
+            })
+        return {
+            'started': self.started,
+            'wall_seconds': round(wall, 3),
+            'timers': timers,
+            'counters': dict(sorted(self.counters.items())),
+        }
+
+    def write_json(self, path):
+        _write_atomic(path, json.dumps(self.report(), indent=2))
+
+    def write_html(self, path):
+        report = self.report()
+        rows = []
+        for timer in report['timers']:
+            rows.append(
+                f"<tr><td>{html.escape(timer['name'])}</td><td>{timer['count']}</td>"
+                f"<td>{timer['total']:.2f}</td><td>{timer['mean'] * 1000:.1f}</td>"
+                f"<td>{timer['p50'] * 1000:.1f}</td><td>{timer['p90'] * 1000:.1f}</td>"
+                f"<td>{timer['p99'] * 1000:.1f}</td><td>{timer['max'] * 1000:.1f}</td>"
+                f"<td><div style=\"background:#4a90d9;height:10px;width:{min(timer['share'], 1) * 300:.0f}px\">"
+                f"</div> {timer['share']:.1%}</td></tr>"
+            )
+        counters = ''.join(
+            f"<tr><td>{html.escape(name)}</td><td>{value}</td></tr>" for name, value in report['counters'].items()
+        )
+        _write_atomic(path, f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Scraper run profile</title>
+<style>body{{font-family:sans-serif}} td,th{{padding:2px 8px;text-align:right}} td:first-child{{text-align:left}}</style>
+</head><body>
+<h1>Scraper run profile</h1>
+<p>Wall time {report['wall_seconds']:.1f}s. Stage timers overlap (a business includes its clicks and
+extraction); shares are of the wall time of this process, summed over workers.</p>
+<table><tr><th>timer</th><th>count</th><th>total (s)</th><th>mean (ms)</th><th>p50 (ms)</th>
+<th>p90 (ms)</th><th>p99 (ms)</th><th>max (ms)</th><th>share</th></tr>
+{''.join(rows)}
+</table>
+<h2>Counters</h2>
+<table>{counters}</table>
+</body></html>
+""")
+
+    def write_prometheus(self, path):
+        """Prometheus text exposition format, e.g. for node_exporter's textfile collector"""
+        lines = [
+            "# HELP scraper_stage_seconds Time spent per scraper stage or WebDriver command",
+            "# TYPE scraper_stage_seconds histogram",
+        ]
+        for name, (count, total, _, buckets) in sorted(self.timers.items()):
+            cumulative = 0
+            for bound, bucket in zip(BUCKETS, buckets):
+                cumulative += bucket
+                lines.append(f'scraper_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'scraper_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {count}')
+            lines.append(f'scraper_stage_seconds_sum{{stage="{name}"}} {total:.6f}')
+            lines.append(f'scraper_stage_seconds_count{{stage="{name}"}} {count}')
+        lines += [
+            "# HELP scraper_events_total Scraper events",
+            "# TYPE scraper_events_total counter",
+        ]
+        for name, value in sorted(self.counters.items()):
+            lines.append(f'scraper_events_total{{event="{name}"}} {value}')
+        _write_atomic(path, '\n'.join(lines) + '\n')
+
+
+def _write_atomic(path, text):
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def instrument_driver(driver, profile=None):
+    """
+    Count and time every WebDriver command sent by this driver
+
+    All commands, including element clicks and script calls, go through
+    WebDriver.execute, so one wrapper covers them. Timers are named
+    "webdriver.<command>".
+    """
+    execute = driver.execute
+    profile = profile or get_profile()
+    timers = {}
+
+    def timed_execute(driver_command, params=None):
+        name = timers.get(driver_command)
+        if name is None:
+            name = timers[driver_command] = f"webdriver.{driver_command}"
+        started = time.perf_counter()
+        try:
+            return execute(driver_command, params)
+        finally:
+            profile.observe(name, time.perf_counter() - started)
+
+    driver.execute = timed_execute
+    return driver
+
+
+_profile = None
+
+
+def get_profile():
+    """Process-wide profile"""
+    global _profile
+    if _profile is None:
+        _profile = Profile()
+    return _profile
+
+
+def reset_profile():
+    """Start a fresh process-wide profile, e.g. between benchmark runs"""
+    global _profile
+    _profile = Profile()
+    return _profile
+
+
+def write_run_profile(json_path, metrics_file=None):
+    """Write the process profile as JSON, as HTML next to it and optionally in Prometheus format"""
+    profile = get_profile()
+    if not profile.timers and not profile.counters:
+        return
+    try:
+        profile.write_json(json_path)
+        html_path = Path(json_path).with_suffix('.html')
+        profile.write_html(html_path)
+        if metrics_file:
+            profile.write_prometheus(metrics_file)
+        logger.info(f"Run profile written to {json_path} and {html_path}")
+    except OSError as e:
+        logger.warning(f"Could not write run profile: {str(e)}")
+
+    for timer in profile.report()['timers'][:8]:
+        logger.info(
+            f"Profile: {timer['name']}: {timer['count']} x, {timer['total']:.1f}s total, "
+            f"p50 {timer['p50'] * 1000:.0f}ms, p99 {timer['p99'] * 1000:.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    with open(sys.argv[1], encoding='utf-8') as f:
+        report = json.load(f)
+    print(f"Wall time {report['wall_seconds']:.1f}s\n")
+    print(f"{'timer':<36} {'count':>7} {'total (s)':>10} {'p50 (ms)':>9} {'p99 (ms)':>9} {'share':>7}")
+    for timer in report['timers']:
+        print(f"{timer['name']:<36} {timer['count']:>7} {timer['total']:>10.2f} "
+              f"{timer['p50'] * 1000:>9.1f} {timer['p99'] * 1000:>9.1f} {timer['share']:>7.1%}")
+    print()
+    for name, value in report['counters'].items():
+        print(f"{name:<36} {value:>7}")
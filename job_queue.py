@@ -0,0 +1,364 @@
+"""
+Shared work queue of (location, term) jobs for scraping on several machines
+
+Producers enqueue jobs once (main.py --queue SPEC --enqueue); every node
+then runs main.py --queue SPEC and claims jobs until none are left. A claim
+is a lease: the node renews it with heartbeats while the job runs, and a
+lease that expires (the node crashed or lost its network) is handed to the
+next node that claims. Adding a node adds throughput without splitting
+LOCATIONS by hand. Geo-grid tile jobs are ordinary jobs, so dense tiles
+split by one node are picked up by all of them.
+
+Two interchangeable backends, picked by make_queue:
+
+    SqliteJobQueue  a SQLite file; nodes on one host (or on a shared
+                    filesystem with working locks) share it directly
+    HttpJobQueue    client of a JobQueueServer that exposes any backend
+                    over HTTP/JSON; run one with
+                    python job_queue.py serve queue.db --port 8765
+
+    python job_queue.py stats queue.db    # or http://host:8765
+"""
+import argparse
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import QUEUE_LEASE_SECONDS, QUEUE_MAX_ATTEMPTS
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue (
+    location TEXT NOT NULL,
+    term TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result_count INTEGER,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (location, term)
+);
+CREATE INDEX IF NOT EXISTS queue_status ON queue (status, lease_expires);
+"""
+
+
+def node_id():
+    """Lease owner name of this process"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class SqliteJobQueue:
+    """
+    Job queue in a SQLite file
+
+    Every state change runs in a BEGIN IMMEDIATE transaction, so claims by
+    several processes never hand out the same job. Expired leases are
+    returned to the queue by the next claim.
+    """
+
+    def __init__(self, path, lease_seconds=QUEUE_LEASE_SECONDS, max_attempts=QUEUE_MAX_ATTEMPTS):
+        self.path = str(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _transaction(self, work):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self._conn, time.time())
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def enqueue(self, jobs):
+        """Add jobs not already in the queue; returns how many were added"""
+        def work(conn, now):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO queue (location, term, updated_at) VALUES (?, ?, ?)",
+                [(location, term, now) for location, term in jobs]
+            )
+            return conn.total_changes - before
+        return self._transaction(work)
+
+    def _requeue_expired(self, conn, now):
+        expired = conn.execute(
+            "UPDATE queue SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "owner = NULL, lease_expires = NULL, error = 'lease expired', updated_at = ? "
+            "WHERE status = 'leased' AND lease_expires < ?",
+            (self.max_attempts, now, now)
+        ).rowcount
+        if expired:
+            logger.warning(f"Re-queued {expired} jobs whose lease expired")
+
+    def claim(self, owner, limit=1):
+        """Lease up to limit pending jobs to owner"""
+        def work(conn, now):
+            self._requeue_expired(conn, now)
+            rows = conn.execute(
+                "SELECT location, term FROM queue WHERE status = 'pending' ORDER BY rowid LIMIT ?", (limit,)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE queue SET status = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE location = ? AND term = ?",
+                [(owner, now + self.lease_seconds, now, location, term) for location, term in rows]
+            )
+            return [(location, term) for location, term in rows]
+        return self._transaction(work)
+
+    def heartbeat(self, owner, jobs):
+        """Extend owner's leases on jobs; returns the jobs it still holds"""
+        def work(conn, now):
+            held = []
+            for location, term in jobs:
+                if conn.execute(
+                    "UPDATE queue SET lease_expires = ?, updated_at = ? "
+                    "WHERE location = ? AND term = ? AND owner = ? AND status = 'leased'",
+                    (now + self.lease_seconds, now, location, term, owner)
+                ).rowcount:
+                    held.append((location, term))
+            return held
+        return self._transaction(work)
+
+    def complete(self, owner, job, count=None):
+        """Mark a job done if owner still holds its lease; returns False otherwise"""
+        location, term = job
+        def work(conn, now):
+            return conn.execute(
+                "UPDATE queue SET status = 'done', lease_expires = NULL, result_count = ?, error = NULL, "
+                "updated_at = ? WHERE location = ? AND term = ? AND owner = ? AND status = 'leased'",
+                (count, now, location, term, owner)
+            ).rowcount > 0
+        completed = self._transaction(work)
+        if not completed:
+            logger.warning(f"{owner} finished {term} in {location} after losing its lease; not marked done")
+        return completed
+
+    def fail(self, owner, job, error=None):
+        """Return a failed job to the queue, or mark it failed after max_attempts"""
+        location, term = job
+        def work(conn, now):
+            conn.execute(
+                "UPDATE queue SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "owner = NULL, lease_expires = NULL, error = ?, updated_at = ? "
+                "WHERE location = ? AND term = ? AND owner = ? AND status = 'leased'",
+                (self.max_attempts, str(error)[:500] if error else None, now, location, term, owner)
+            )
+        self._transaction(work)
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM queue GROUP BY status").fetchall())
+        return {status: counts.get(status, 0) for status in (PENDING, LEASED, DONE, FAILED)}
+
+    def close(self):
+        self._conn.close()
+
+
+class HttpJobQueue:
+    """Client of a JobQueueServer with the same methods as SqliteJobQueue"""
+
+    def __init__(self, url, timeout=30):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def _call(self, method, **payload):
+        request = urllib.request.Request(
+            f"{self.url}/{method}", data=json.dumps(payload).encode('utf-8'),
+            headers={'Content-Type': 'application/json'}, method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())['result']
+
+    def enqueue(self, jobs):
+        return self._call('enqueue', jobs=[list(job) for job in jobs])
+
+    def claim(self, owner, limit=1):
+        return [tuple(job) for job in self._call('claim', owner=owner, limit=limit)]
+
+    def heartbeat(self, owner, jobs):
+        return [tuple(job) for job in self._call('heartbeat', owner=owner, jobs=[list(job) for job in jobs])]
+
+    def complete(self, owner, job, count=None):
+        return self._call('complete', owner=owner, job=list(job), count=count)
+
+    def fail(self, owner, job, error=None):
+        self._call('fail', owner=owner, job=list(job), error=error)
+
+    def stats(self):
+        return self._call('stats')
+
+    def close(self):
+        pass
+
+
+class JobQueueServer(ThreadingHTTPServer):
+    """
+    Serve a queue backend over HTTP/JSON for HttpJobQueue clients
+
+    Each method is a POST to /<method> with the keyword arguments as a
+    JSON object; the answer is {"result": ...}.
+    """
+    daemon_threads = True
+
+    def __init__(self, backend, host='0.0.0.0', port=8765):
+        self.backend = backend
+        super().__init__((host, port), _QueueRequestHandler)
+
+
+class _QueueRequestHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        backend = self.server.backend
+        method = self.path.strip('/')
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            if method == 'enqueue':
+                result = backend.enqueue([tuple(job) for job in payload['jobs']])
+            elif method == 'claim':
+                result = backend.claim(payload['owner'], payload.get('limit', 1))
+            elif method == 'heartbeat':
+                result = backend.heartbeat(payload['owner'], [tuple(job) for job in payload['jobs']])
+            elif method == 'complete':
+                result = backend.complete(payload['owner'], tuple(payload['job']), payload.get('count'))
+            elif method == 'fail':
+                result = backend.fail(payload['owner'], tuple(payload['job']), payload.get('error'))
+            elif method == 'stats':
+                result = backend.stats()
+            else:
+                self.send_error(404, f"Unknown queue method {method}")
+                return
+        except (KeyError, ValueError) as e:
+            self.send_error(400, str(e))
+            return
+        body = json.dumps({'result': result}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Queue server: {format % args}")
+
+
+def make_queue(spec):
+    """HttpJobQueue for an http(s):// URL, SqliteJobQueue for a file path"""
+    if spec.startswith(('http://', 'https://')):
+        return HttpJobQueue(spec)
+    return SqliteJobQueue(spec)
+
+
+class QueueFeeder:
+    """
+    This node's side of the queue: claims jobs, renews their leases from a
+    background thread and reports results
+
+    finished() and failed() return the next job to run, so they plug into
+    the expand/on_error callbacks of run_serial and run_worker_pool and
+    keep every worker busy until the queue is empty.
+    """
+
+    def __init__(self, queue, owner=None, planner=None, heartbeat_every=None):
+        self.queue = queue
+        self.owner = owner or node_id()
+        self.planner = planner
+        self.heartbeat_every = heartbeat_every or QUEUE_LEASE_SECONDS / 3
+        self.held = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._heartbeat_loop, name="queue-heartbeat", daemon=True)
+        self._thread.start()
+
+    def claim(self, limit=1):
+        jobs = self.queue.claim(self.owner, limit)
+        with self._lock:
+            self.held.update(jobs)
+        return jobs
+
+    def finished(self, job, count):
+        if self.planner:
+            children = self.planner.split(job, count)
+            if children:
+                self.queue.enqueue(children)
+        self.queue.complete(self.owner, job, count)
+        with self._lock:
+            self.held.discard(job)
+        return self.claim(1)
+
+    def failed(self, job, error):
+        self.queue.fail(self.owner, job, error)
+        with self._lock:
+            self.held.discard(job)
+        return self.claim(1)
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(self.heartbeat_every):
+            with self._lock:
+                jobs = list(self.held)
+            if not jobs:
+                continue
+            try:
+                kept = set(self.queue.heartbeat(self.owner, jobs))
+            except (OSError, sqlite3.Error, urllib.error.URLError) as e:
+                logger.warning(f"Queue heartbeat failed: {str(e)}")
+                continue
+            for job in set(jobs) - kept:
+                logger.warning(f"Lost the lease on {job[1]} in {job[0]}; another node may run it")
+
+    def release(self):
+        """Hand the jobs this node still holds back to the queue"""
+        with self._lock:
+            jobs = list(self.held)
+            self.held.clear()
+        for job in jobs:
+            try:
+                self.queue.fail(self.owner, job, "node stopped")
+            except (OSError, sqlite3.Error, urllib.error.URLError) as e:
+                logger.warning(f"Could not release {job[1]} in {job[0]}: {str(e)}")
+
+    def close(self):
+        """Stop heartbeats and hand unfinished jobs back to the queue"""
+        self._stop.set()
+        self._thread.join()
+        self.release()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Shared scrape job queue")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serve = subparsers.add_parser('serve', help="Serve a SQLite queue to HttpJobQueue clients")
+    serve.add_argument('path')
+    serve.add_argument('--host', default='0.0.0.0')
+    serve.add_argument('--port', type=int, default=8765)
+    stats = subparsers.add_parser('stats', help="Print job counts per status")
+    stats.add_argument('spec')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        server = JobQueueServer(SqliteJobQueue(args.path), args.host, args.port)
+        logger.info(f"Serving {args.path} on http://{args.host}:{args.port}")
+        server.serve_forever()
+    else:
+        print(json.dumps(make_queue(args.spec).stats(), indent=2))
@@ -0,0 +1,239 @@
+import logging
+import re
+
+from extraction import parse_field
+from place_identity import card_key, place_id_from_href
+from waits import FEED_END_SELECTOR
+
+logger = logging.getLogger(__name__)
+
+# Result-feed card layout: every card is a container holding an a.hfpxzc link
+CARD_CONTAINER_SELECTOR = '.Nv2PK'
+CARD_LINK_SELECTOR = 'a.hfpxzc, a[data-result-index]'
+
+# Card fields, relative to the card container; first match wins
+CARD_SELECTORS = {
+    'name': ['.qBF1Pd', '.fontHeadlineSmall'],
+    'rating': ['.MW4etd'],
+    'reviews_count': ['.UY7F9'],
+    'phone': ['.UsdlK'],
+}
+# Link fields read from an attribute
+CARD_LINK_ATTRIBUTES = {
+    'website': ('a[data-value="Website"]', 'href'),
+}
+# Innermost "Category · $$ · Address" / "Open · Closes 10 pm" lines
+CARD_INFO_SELECTOR = '.W4Efsd'
+
+# Reads the feed cards whose result index is above a watermark in one
+# round-trip. Each entry holds the link element (for an optional click), its
+# result index (data-result-index, else its position in the feed), its
+# href/aria-label and, if asked for, the raw text of the card fields. Also
+# returns the number of cards in the feed and whether the end-of-list marker
+# is shown.
+READ_CARDS_JS = """
+var table = arguments[0], links = arguments[1], attributes = arguments[2];
+var containerSelector = arguments[3], infoSelector = arguments[4];
+var watermark = arguments[5], withFields = arguments[6], endSelector = arguments[7];
+var seen = new Set();
+var cards = [];
+var position = -1;
+document.querySelectorAll(links).forEach(function (link) {
+    if (seen.has(link)) {
+        return;
+    }
+    seen.add(link);
+    position++;
+    var index = parseInt(link.getAttribute('data-result-index'), 10);
+    if (isNaN(index)) {
+        index = position;
+    }
+    if (index <= watermark) {
+        return;
+    }
+    var card = {el: link, index: index, href: link.getAttribute('href'), label: link.getAttribute('aria-label')};
+    cards.push(card);
+    if (!withFields) {
+        return;
+    }
+    var container = link.closest(containerSelector) || link.parentElement || link;
+    Object.keys(table).forEach(function (field) {
+        card[field] = null;
+        for (var i = 0; i < table[field].length; i++) {
+            var el = container.querySelector(table[field][i]);
+            if (el) {
+                card[field] = el.innerText || el.textContent || '';
+                break;
+            }
+        }
+    });
+    Object.keys(attributes).forEach(function (field) {
+        var el = container.querySelector(attributes[field][0]);
+        card[field] = el ? el.getAttribute(attributes[field][1]) : null;
+    });
+    card.info = [];
+    container.querySelectorAll(infoSelector).forEach(function (el) {
+        if (!el.querySelector(infoSelector)) {
+            card.info.push(el.innerText || el.textContent || '');
+        }
+    });
+});
+return {cards: cards, count: position + 1, end: document.querySelector(endSelector) !== null};
+"""
+
+_HOURS_RE = re.compile(r'\b(open|closed|closes|opens)\b', re.IGNORECASE)
+
+
+def harvest_cards(driver, watermark=-1, with_fields=True):
+    """
+    Read the feed cards added since the last harvest
+
+    Args:
+        driver: Selenium WebDriver instance on a results page
+        watermark: Highest result index already read; only cards above it
+            are returned
+        with_fields: Also read the raw card fields (otherwise only the link
+            element, index, href and label)
+
+    Returns:
+        (cards, feed_count, end_of_list): the new cards in feed order, the
+        number of cards in the feed and whether the feed shows its
+        end-of-list marker
+    """
+    result = driver.execute_script(
+        READ_CARDS_JS, CARD_SELECTORS, CARD_LINK_SELECTOR, CARD_LINK_ATTRIBUTES,
+        CARD_CONTAINER_SELECTOR, CARD_INFO_SELECTOR, watermark, with_fields, FEED_END_SELECTOR
+    ) or {}
+    return result.get('cards') or [], result.get('count') or 0, bool(result.get('end'))
+
+
+def read_cards(driver):
+    """Return the raw fields of every card currently in the feed"""
+    return harvest_cards(driver)[0]
+
+
+def parse_card_info(lines):
+    """
+    Split card info lines into category, price level, address and hours
+
+    The first line reads like "Restaurant · $$ · Kenyatta Avenue"; an
+    opening-hours line reads like "Open · Closes 10 pm".
+    """
+    info = {'category': None, 'price_level': None, 'address': None, 'hours': None}
+    for line in lines:
+        text = ' '.join((line or '').split())
+        if not text:
+            continue
+        if _HOURS_RE.search(text):
+            info['hours'] = info['hours'] or text
+            continue
+        parts = [part.strip() for part in re.split(r'[·⋅]', text) if part.strip()]
+        if not parts or info['category']:
+            continue
+        info['category'] = parts[0]
+        rest = []
+        for part in parts[1:]:
+            price_level = parse_field('price_level', part)
+            if price_level is not None:
+                info['price_level'] = price_level
+            else:
+                rest.append(part)
+        if rest:
+            info['address'] = parse_field('address', rest[-1])
+    return info
+
+
+def parse_card(card):
+    """
+    Turn the raw fields of a feed card into a business record
+
+    Uses the same value parsers as the detail extraction, so records from
+    listing mode share the schema of scrape_google_maps output. Fields a
+    card does not show are None.
+    """
+    href = card.get('href')
+    record = {
+        'name': parse_field('name', card.get('name') or '') or (card.get('label') or '').strip() or None,
+        'rating': parse_field('rating', card.get('rating')),
+        'reviews_count': parse_field('reviews_count', card.get('reviews_count')) or 0,
+        'phone': parse_field('phone', card.get('phone')),
+        'website': parse_field('website', card.get('website')),
+    }
+    record.update(parse_card_info(card.get('info') or []))
+    record['location'] = href
+    record['place_id'] = place_id_from_href(href) or card_key(href, card.get('label'))
+    return record
+
+
+def passes_card_filters(record, min_rating=None, min_reviews=0):
+    """Card-level check used to decide which cards are worth enriching"""
+    if min_rating and record.get('rating') is not None and record['rating'] < min_rating:
+        return False
+    return (record.get('reviews_count') or 0) >= min_reviews
+
+
+def business_type_pattern(business_types):
+    """Whole-word, case-insensitive category match for BUSINESS_TYPES ("bar" is not "Barber shop")"""
+    return r'\b(?:' + '|'.join(re.escape(t.lower()) for t in business_types) + r')s?\b'
+
+
+class CardFilter:
+    """
+    Search filters compiled into checks on partially known records
+
+    A check only fails when a field that is present proves the business
+    cannot pass, so a card that does not show its rating is still opened.
+    The scraper applies it to feed cards before clicking and to the
+    detail pane before extracting or capturing the rest, and keeps the
+    counters below up to date.
+    """
+
+    def __init__(self, min_rating=None, min_reviews=0, require_no_website=False,
+                 business_types=None, max_price_level=None):
+        self.checks = []
+        if min_rating:
+            self.checks.append(('rating', lambda rating: rating >= min_rating))
+        if min_reviews:
+            self.checks.append(('reviews_count', lambda count: count >= min_reviews))
+        if require_no_website:
+            self.checks.append(('website', lambda website: not website))
+        if business_types:
+            pattern = re.compile(business_type_pattern(business_types))
+            self.checks.append(('category', lambda category: bool(pattern.search(category.lower()))))
+        if max_price_level:
+            self.checks.append(('price_level', lambda level: level <= max_price_level))
+        self.cards_rejected = 0
+        self.clicks_saved = 0
+        self.details_rejected = 0
+
+    @classmethod
+    def from_config(cls):
+        from config import MIN_RATING, MIN_REVIEWS, REQUIRE_NO_WEBSITE, BUSINESS_TYPES, MAX_PRICE_LEVEL
+        return cls(MIN_RATING, MIN_REVIEWS, REQUIRE_NO_WEBSITE, BUSINESS_TYPES, MAX_PRICE_LEVEL)
+
+    @property
+    def fields(self):
+        return [field for field, _ in self.checks]
+
+    def check(self, record):
+        """False only if a known field value fails its filter"""
+        for field, test in self.checks:
+            value = record.get(field)
+            if value is not None and not test(value):
+                return False
+        return True
+
+    def check_card(self, card):
+        """Check the raw fields of a feed card (as returned by read_cards)"""
+        record = parse_card(card)
+        if not card.get('reviews_count'):
+            # parse_card defaults a missing count to 0; unknown is not zero here
+            record['reviews_count'] = None
+        return self.check(record)
+
+    def metrics(self):
+        return {
+            'cards_rejected': self.cards_rejected,
+            'clicks_saved': self.clicks_saved,
+            'details_rejected': self.details_rejected,
+        }
@@ -1,13 +1,26 @@
-from selenium.common.exceptions import WebDriverException
-from browser_controller import create_driver
-from scraper import scrape_google_maps
+import time
+STARTED = time.perf_counter()  # Before the imports below, so startup time includes them
+
+from driver_manager import DriverManager
+from worker_pool import run_worker_pool
+from sinks import make_sink
+from checkpoint import Checkpoint, load_job_state
+from place_identity import PlaceIndex
+from snapshots import get_parser_pool
+from place_cache import get_place_cache
+from entity_resolution import resolve_output
+from selector_stats import SelectorRegistry, get_registry
+from rate_control import RateController, ERROR
+from instrumentation import get_profile, write_run_profile
+from geo_grid import GridPlanner, parse_tile
+from job_queue import QueueFeeder, make_queue, LEASED
 from config import (
-    MIN_RATING, REQUIRE_NO_WEBSITE, SEARCH_TERMS, 
+    SEARCH_TERMS, 
     LOCATIONS, MAX_RESULTS, OUTPUT_FILE, 
-    MIN_DELAY, MAX_DELAY, MAX_RETRIES
+    MIN_DELAY, MAX_DELAY, MAX_RETRIES, SELECTOR_STATS_FILE, CHECKPOINT_FILE, PLACE_CACHE_FILE,
+    PROFILE_REPORT_FILE, METRICS_FILE, QUEUE_POLL_SECONDS
 )
-import pandas as pd
-import time
+import argparse
 import logging
 import random
 import sys
@@ -30,98 +43,371 @@ def setup_logging():
         ]
     )
 
-def save_results(businesses, output_file):
-    """Save scraped data to CSV file and backup"""
-    try:
-        df = pd.DataFrame(businesses)
-        
-        # Additional data cleaning and validation
-        df = df.drop_duplicates()
-        df = df.dropna(subset=['name', 'address'])  # Remove entries without crucial info
-        
-        # Reorder and select columns
-        column_order = [
-            'name', 'category', 'rating', 'reviews_count',
-            'address', 'phone', 'website', 'location',
-            'price_level', 'hours'
-        ]
-        df = df.reindex(columns=[col for col in column_order if col in df.columns])
-        
-        # Create backup before saving
-        backup_file = f"{output_file}.backup"
-        if Path(output_file).exists():
-            Path(output_file).rename(backup_file)
-        
-        df.to_csv(output_file, index=False, encoding='utf-8')
-        logging.info(f"Successfully saved {len(df)} records to {output_file}")
-    except Exception as e:
-        logging.error(f"Failed to save results: {str(e)}")
-        raise
+def scrape_with_retry(driver, term, location, max_retries=MAX_RETRIES, on_business=None,
+                      on_scroll=None, checkpoint_file=None, snapshots=False, mode='detail', enrich=False,
+                      rate_controller=None, use_cache=False, pushdown=False):
+    """
+    Implement retry logic for scraping
+    
+    Places extracted by a failed attempt are skipped by the next one, and
+    when driver is a DriverManager a crashed browser is replaced before the
+    retry.
+    
+    Args:
+        driver: WebDriver or DriverManager used for every attempt
+        term: Search term
+        location: Search location (a tile location for grid jobs)
+        max_retries: Attempts before the last WebDriverException is raised
+        on_business: Optional, called with each business as it is extracted
+        on_scroll: Optional, called with each feed scroll depth reached
+        checkpoint_file: Optional checkpoint database; places and scroll
+            depth recorded by an interrupted run are skipped
+        snapshots: Capture detail panes as HTML and parse them in this
+            process's snapshot parser pool
+        mode: "detail" or "listing", passed to scrape_google_maps
+        enrich: Passed to scrape_google_maps (listing mode only)
+        rate_controller: Optional RateController passed to scrape_google_maps;
+            a failed attempt is reported to it and its backoff paces the retry
+        use_cache: Skip places with a fresh record in this process's place cache
+        pushdown: Check the config.py search filters on result cards and
+            detail panes, skipping failing businesses as early as possible
+    
+    Returns:
+        List of extracted businesses
+    """
+    # Imported here so main.py starts without loading Selenium; workers
+    # and the serial runner import it once, before their first job
+    from selenium.common.exceptions import WebDriverException
+    from scraper import scrape_google_maps
+    from listing import CardFilter
 
-def scrape_with_retry(driver, term, location, max_retries=MAX_RETRIES):
-    """Implement retry logic for scraping"""
+    seen, depth = load_job_state(checkpoint_file, (location, term)) if checkpoint_file else (set(), 0)
+    place_index = PlaceIndex(seen)
+    card_filter = CardFilter.from_config() if pushdown else None
+    progress = {'depth': depth}
+    
+    def track_scroll(scroll_depth):
+        progress['depth'] = scroll_depth
+        if on_scroll:
+            on_scroll(scroll_depth)
+    
     for attempt in range(max_retries):
         try:
-            businesses = scrape_google_maps(driver, term, location, MAX_RESULTS)
+            businesses = scrape_google_maps(
+                driver, term, location, MAX_RESULTS, place_index=place_index,
+                on_business=on_business, resume_depth=progress['depth'], on_scroll=track_scroll,
+                parser_pool=get_parser_pool() if snapshots else None, mode=mode, enrich=enrich,
+                rate_controller=rate_controller, place_cache=get_place_cache() if use_cache else None,
+                card_filter=card_filter
+            )
+            get_registry().save()
             return businesses
         except WebDriverException as e:
             if attempt < max_retries - 1:
                 logging.warning(f"Attempt {attempt + 1} failed, retrying... Error: {str(e)}")
-                time.sleep(random.uniform(MIN_DELAY * 2, MAX_DELAY * 2))
+                if isinstance(driver, DriverManager):
+                    driver.recover()
+                if rate_controller:
+                    rate_controller.record(ERROR)
+                else:
+                    delay = random.uniform(MIN_DELAY * 2, MAX_DELAY * 2)
+                    time.sleep(delay)
+                    get_profile().observe('sleep.retry_backoff', delay)
                 continue
             raise
     return []
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Google Maps business scraper")
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help="Number of parallel browser processes (default: 1, serial)"
+    )
+    parser.add_argument(
+        '--output', default=OUTPUT_FILE,
+        help="Output file; rows are streamed as CSV, as JSON lines for .jsonl, upserted into SQLite "
+             "for .db/.sqlite, appended to a partitioned Parquet dataset for .parquet, or bulk-indexed into "
+             "Elasticsearch for es:<index> (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--engine', choices=['selenium', 'scrapy'], default='selenium',
+        help="selenium: drive Chrome; scrapy: browserless concurrent crawl of pages served without JS (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--mode', choices=['detail', 'listing'], default='detail',
+        help="detail: open every business; listing: read result cards only, never click (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--enrich', action='store_true',
+        help="With --mode listing, open the detail pane for cards that pass the rating/review filters"
+    )
+    parser.add_argument(
+        '--snapshots', action='store_true',
+        help="Only capture detail-pane HTML in the browser and parse it in a process pool"
+    )
+    parser.add_argument(
+        '--no-cache', action='store_true',
+        help=f"Open every business again instead of reusing fresh records from {PLACE_CACHE_FILE}"
+    )
+    parser.add_argument(
+        '--pushdown', action='store_true',
+        help="Only open businesses whose result card can still pass MIN_RATING, MIN_REVIEWS, "
+             "REQUIRE_NO_WEBSITE, BUSINESS_TYPES and MAX_PRICE_LEVEL, and drop those whose detail pane fails them"
+    )
+    parser.add_argument(
+        '--resolve', action='store_true',
+        help="After the run, merge the same business found by several searches into <output>_resolved.csv"
+    )
+    parser.add_argument(
+        '--filter', action='store_true',
+        help="After the run, write businesses passing the config.py filters, sorted by SORT_BY, to <output>_filtered.csv"
+    )
+    parser.add_argument(
+        '--metrics-file', default=METRICS_FILE,
+        help=f"Also write the run profile in Prometheus text format to this file "
+             f"(the JSON/HTML profile always goes to {PROFILE_REPORT_FILE})"
+    )
+    parser.add_argument(
+        '--grid', action='store_true',
+        help="Split each location into map tiles covering RADIUS_KM and search every tile, "
+             "splitting tiles that hit the result cap"
+    )
+    parser.add_argument(
+        '--queue', default=None,
+        help="Claim jobs from a shared queue instead of running the whole LOCATIONS x SEARCH_TERMS list: "
+             "a SQLite file for nodes on one host or the http:// URL of a job_queue.py server"
+    )
+    parser.add_argument(
+        '--enqueue', action='store_true',
+        help="With --queue, add this run's jobs (tile jobs with --grid) to the queue and exit"
+    )
+    parser.add_argument(
+        '--resume', action='store_true',
+        help=f"Continue an interrupted run from {CHECKPOINT_FILE}, skipping finished jobs and seen businesses"
+    )
+    return parser.parse_args(argv)
+
+def build_jobs(locations=LOCATIONS, search_terms=SEARCH_TERMS):
+    """Expand the location x search-term matrix into (location, term) jobs"""
+    return [(location, term) for location in locations for term in search_terms]
+
+def run_serial(jobs, on_business, on_result, on_progress=None, job_kwargs=None, expand=None, on_error=None):
+    """
+    Run all jobs one after another on a single managed driver
+    
+    expand(job, cards), if given, is called after every successful job with
+    the number of result cards it saw, and the jobs it returns are run as
+    well; so are the jobs returned by on_error(job, message) after a failed one.
+    """
+    driver = DriverManager()
+    jobs = list(jobs)
+    try:
+        driver.start()
+        
+        for job in jobs:
+            location, term = job
+            try:
+                driver.check()
+                logging.info(f"Scraping: {term} in {location}")
+                businesses = scrape_with_retry(
+                    driver, term, location,
+                    on_business=lambda business: on_business(job, business),
+                    on_scroll=(lambda depth: on_progress(job, depth)) if on_progress else None,
+                    **(job_kwargs or {})
+                )
+                on_result(job, len(businesses))
+                if expand:
+                    jobs.extend(expand(job, getattr(businesses, 'cards_seen', len(businesses))))
+                
+            except Exception as e:
+                logging.error(f"Error processing {term} in {location}: {str(e)}")
+                if on_error:
+                    jobs.extend(on_error(job, str(e)) or [])
+                continue
+    finally:
+        driver.quit()
+        driver.report()
+        logging.info("Browser closed")
+
+def write_resolved(output_file):
+    """Run entity resolution over the finished output; returns the file to read next"""
+    if str(output_file).startswith('es:'):
+        logging.warning("--resolve needs a file output; skipped for Elasticsearch")
+        return output_file
+    resolved_file = str(Path(output_file).with_suffix('')) + "_resolved.csv"
+    resolve_output(output_file, resolved_file)
+    return resolved_file
+
+def write_filtered(output_file):
+    """Run the columnar filter/sort stage over the finished output"""
+    if str(output_file).startswith('es:'):
+        logging.warning("--filter needs a file output; skipped for Elasticsearch")
+        return
+    from filtering import filter_output
+    filter_output(output_file, str(Path(output_file).with_suffix('')) + "_filtered.csv")
+
+def report_dead_selectors():
+    """Log selectors that keep missing so they can be removed from the tables"""
+    for field, selector, attempts in SelectorRegistry.load(SELECTOR_STATS_FILE).dead_selectors():
+        logging.warning(f"Dead selector for {field}: {selector} ({attempts} misses, no hits)")
+
+def main(argv=None):
+    imported = time.perf_counter()
+    args = parse_args(argv)
     setup_logging()
-    logging.info(f"Starting scraper version 1.1")
+    logging.info("Starting scraper version 1.1")
     
-    driver = None
-    all_businesses = []
+    sink = None
+    checkpoint = None
     start_time = time.time()
+    first_business = []
+    
+    def store(action):
+        # A sink that could not store its rows raises (the Elasticsearch sink
+        # on unacknowledged batches); keep those places out of the checkpoint
+        try:
+            action()
+        except Exception:
+            if checkpoint:
+                checkpoint.discard_pending()
+            raise
+    
+    def write_business(job, business):
+        if not first_business:
+            first_business.append(time.perf_counter() - STARTED)
+            get_profile().observe('startup.first_business', first_business[0])
+            logging.info(f"First business {first_business[0]:.2f}s after start")
+        location, term = job
+        tile = parse_tile(location)
+        business.setdefault('search_term', term)
+        business.setdefault('search_location', tile.location if tile else location)
+        # Rows the sink dropped were never written, so a resume must not skip them
+        if sink.write(business):
+            checkpoint.add_place(job, business.get('place_id'))
+    
+    def job_done(job, count):
+        location, term = job
+        if count:
+            logging.info(f"Found {count} results for {term} in {location}")
+        else:
+            logging.warning(f"No results found for {term} in {location}")
+        store(sink.flush)
+        checkpoint.mark_done(job)
     
     try:
-        driver = create_driver()
+        if args.engine == 'scrapy':
+            # Imported here so Selenium runs never load Scrapy/Twisted
+            from scrapers import run_spider
+            run_spider(args.output)
+            return
         
-        for location in LOCATIONS:
-            for term in SEARCH_TERMS:
-                try:
-                    logging.info(f"Scraping: {term} in {location}")
-                    businesses = scrape_with_retry(driver, term, location)
-                    
-                    if businesses:
-                        all_businesses.extend(businesses)
-                        logging.info(f"Found {len(businesses)} results")
-                    else:
-                        logging.warning(f"No results found for {term} in {location}")
-                    
-                    delay = random.uniform(MIN_DELAY, MAX_DELAY)
-                    logging.debug(f"Waiting {delay:.2f} seconds before next search")
-                    time.sleep(delay)
-                    
-                except Exception as e:
-                    logging.error(f"Error processing {term} in {location}: {str(e)}")
-                    continue
+        jobs = build_jobs()
+        planner = GridPlanner() if args.grid else None
+        if planner:
+            jobs = planner.plan(jobs)
+        job_queue = make_queue(args.queue) if args.queue else None
+        if job_queue and args.enqueue:
+            added = job_queue.enqueue(jobs)
+            logging.info(f"Queued {added} new jobs ({len(jobs) - added} already queued): {job_queue.stats()}")
+            return
+        checkpoint = Checkpoint(CHECKPOINT_FILE)
+        if args.resume:
+            done = checkpoint.completed_jobs()
+            if planner:
+                jobs = planner.resume(jobs, done, checkpoint.place_counts())
+            else:
+                jobs = [job for job in jobs if job not in done]
+            logging.info(f"Resuming: {len(done)} jobs already finished, {len(jobs)} to go")
+        else:
+            checkpoint.reset()
+        job_kwargs = {'checkpoint_file': CHECKPOINT_FILE} if args.resume else {}
+        if args.snapshots:
+            job_kwargs['snapshots'] = True
+        if args.mode != 'detail':
+            job_kwargs.update(mode=args.mode, enrich=args.enrich)
+        if not args.no_cache:
+            job_kwargs['use_cache'] = True
+        if args.pushdown:
+            job_kwargs['pushdown'] = True
+        # One request budget shared by every job and worker process
+        job_kwargs['rate_controller'] = RateController()
+        
+        # Places are committed to the checkpoint only once the sink has them on disk
+        # With --resolve, a place found by several searches is kept once per
+        # search so the resolver can merge their search terms
+        sink = make_sink(args.output, resume=args.resume, on_flush=checkpoint.flush, per_search=args.resolve)
+        ready = time.perf_counter()
+        get_profile().observe('startup.imports', imported - STARTED)
+        get_profile().observe('startup.setup', ready - imported)
+        logging.info(
+            f"Ready to start browsers {ready - STARTED:.2f}s after start "
+            f"(imports {imported - STARTED:.2f}s, setup {ready - imported:.2f}s)"
+        )
         
-        if all_businesses:
-            save_results(all_businesses, OUTPUT_FILE)
+        def run_jobs(jobs, expand=None, on_error=None):
+            if args.workers > 1:
+                failures = run_worker_pool(
+                    jobs, args.workers, scrape_with_retry, write_business, job_done,
+                    on_progress=checkpoint.set_scroll_depth, job_kwargs=job_kwargs,
+                    expand=expand, on_error=on_error
+                )
+                if failures:
+                    logging.warning(f"{len(failures)} of {len(jobs)} jobs failed")
+            else:
+                run_serial(
+                    jobs, write_business, job_done, checkpoint.set_scroll_depth, job_kwargs,
+                    expand=expand, on_error=on_error
+                )
+        
+        if job_queue:
+            # Each finished job claims the next one, so every worker stays
+            # busy until the queue is empty; dense tiles are split into it
+            feeder = QueueFeeder(job_queue, planner=planner)
+            try:
+                while True:
+                    claimed = feeder.claim(args.workers)
+                    if not claimed:
+                        leased = job_queue.stats()[LEASED]
+                        if not leased:
+                            break
+                        logging.info(f"Queue empty; waiting for {leased} jobs leased by other nodes")
+                        time.sleep(QUEUE_POLL_SECONDS)
+                        continue
+                    run_jobs(claimed, expand=feeder.finished, on_error=feeder.failed)
+                    # Jobs lost with a crashed worker go back to the queue
+                    feeder.release()
+            finally:
+                feeder.close()
+            logging.info(f"Queue drained: {job_queue.stats()}")
         else:
+            run_jobs(jobs, expand=planner.split if planner else None)
+        
+        if sink.rows_written:
+            store(sink.close)
+            final_output = args.output
+            if args.resolve:
+                final_output = write_resolved(args.output)
+            if args.filter:
+                write_filtered(final_output)
+        else:
+            sink.discard()
             logging.warning("No data was collected during the scraping process")
+        
+        report_dead_selectors()
             
-    except Exception as e:
-        logging.error(f"Fatal error in main process: {str(e)}")
+    except BaseException as e:
+        if sink:
+            store(sink.abort)
+        if isinstance(e, Exception):
+            logging.error(f"Fatal error in main process: {str(e)}")
         raise
     
     finally:
-        if driver:
-            try:
-                driver.quit()
-                logging.info("Browser closed successfully")
-            except Exception as e:
-                logging.error(f"Error closing browser: {str(e)}")
-        
+        if checkpoint:
+            checkpoint.close()
         elapsed_time = time.time() - start_time
         logging.info(f"Scraping completed in {elapsed_time:.2f} seconds")
+        write_run_profile(PROFILE_REPORT_FILE, args.metrics_file)
 
 if __name__ == "__main__":
     try:
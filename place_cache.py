@@ -0,0 +1,151 @@
+import json
+import logging
+import sqlite3
+import time
+
+from config import PLACE_CACHE_FILE, PLACE_CACHE_TTLS, PLACE_CACHE_MAX_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+# Record fields by cache group; every group has its own TTL in PLACE_CACHE_TTLS
+FIELD_GROUPS = {
+    'identity': ['name', 'address', 'phone', 'website', 'category', 'location'],
+    'hours': ['hours'],
+    'reviews': ['rating', 'reviews_count', 'price_level'],
+}
+
+# Groups a feed card refreshes on its own (listing mode reads them without a click)
+CARD_GROUPS = ('reviews',)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS places (
+    place_id TEXT PRIMARY KEY,
+    record TEXT NOT NULL,
+    fetched TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS places_last_used ON places (last_used);
+"""
+
+
+def cacheable(key):
+    """Only stable place IDs are cached; label fallbacks are not unique enough"""
+    return bool(key) and not key.startswith('label:')
+
+
+class PlaceCache:
+    """
+    SQLite cache of extracted place records keyed by place ID
+
+    Every field group carries its own fetch timestamp, so a record can be
+    served while, say, its reviews are stale but refreshed from the card.
+    Beyond max_entries the least recently used places are evicted.
+    """
+
+    def __init__(self, path=PLACE_CACHE_FILE, ttls=None, max_entries=PLACE_CACHE_MAX_ENTRIES):
+        self.path = str(path)
+        self.ttls = dict(PLACE_CACHE_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self._puts = 0
+        self._conn = sqlite3.connect(self.path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _row(self, place_id):
+        row = self._conn.execute(
+            "SELECT record, fetched FROM places WHERE place_id = ?", (place_id,)
+        ).fetchone()
+        return (json.loads(row[0]), json.loads(row[1])) if row else (None, {})
+
+    def lookup(self, place_id, refreshed=()):
+        """
+        Return the cached record if every group not in refreshed is fresh
+
+        Args:
+            refreshed: Groups the caller has just read itself, so their age
+                does not matter
+        """
+        if not cacheable(place_id):
+            return None
+        record, fetched = self._row(place_id)
+        if record is None:
+            self.misses += 1
+            return None
+        now = time.time()
+        for group, ttl in self.ttls.items():
+            if group not in refreshed and now - fetched.get(group, 0) > ttl:
+                self.stale += 1
+                return None
+        with self._conn:
+            self._conn.execute("UPDATE places SET last_used = ? WHERE place_id = ?", (now, place_id))
+        self.hits += 1
+        return record
+
+    def put(self, place_id, record, groups=None):
+        """
+        Store freshly extracted fields
+
+        Args:
+            groups: Field groups present in record (default: all of them);
+                other groups keep their cached values and timestamps
+        """
+        if not cacheable(place_id):
+            return
+        groups = list(FIELD_GROUPS) if groups is None else groups
+        cached, fetched = self._row(place_id)
+        cached = cached or {}
+        now = time.time()
+        if groups == list(FIELD_GROUPS):
+            cached.update(record)
+        for group in groups:
+            for field in FIELD_GROUPS[group]:
+                if field in record:
+                    cached[field] = record[field]
+            fetched[group] = now
+        cached['place_id'] = place_id
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO places (place_id, record, fetched, last_used) VALUES (?, ?, ?, ?)",
+                (place_id, json.dumps(cached), json.dumps(fetched), now)
+            )
+        self._puts += 1
+        if self._puts % 100 == 0:
+            self.evict()
+
+    def evict(self):
+        """Drop the least recently used places beyond max_entries"""
+        if not self.max_entries:
+            return 0
+        with self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM places WHERE place_id IN ("
+                "SELECT place_id FROM places ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+        if cursor.rowcount:
+            logger.info(f"Evicted {cursor.rowcount} places from the cache")
+        return cursor.rowcount
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM places").fetchone()[0]
+
+    def metrics(self):
+        return {'hits': self.hits, 'misses': self.misses, 'stale': self.stale}
+
+    def close(self):
+        self.evict()
+        self._conn.close()
+
+
+_cache = None
+
+
+def get_place_cache():
+    """Process-wide place cache, opened on first use"""
+    global _cache
+    if _cache is None:
+        _cache = PlaceCache()
+    return _cache
@@ -0,0 +1,103 @@
+import logging
+import re
+from urllib.parse import unquote, urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Feature ID embedded in Maps place URLs, e.g. "!1s0x182f10d5b0b5d7b5:0x3c5b6b0e6d1b2c0f"
+_FEATURE_ID_RE = re.compile(r'!1s(0x[0-9a-fA-F]+:0x[0-9a-fA-F]+)')
+# Place ID, e.g. "!19sChIJ..." or "place_id:ChIJ..."
+_PLACE_ID_RE = re.compile(r'(?:!19s|place_id[:=])(ChIJ[\w-]+)')
+# "/maps/place/<name>/@<lat>,<lng>" as a last resort
+_NAME_COORDS_RE = re.compile(r'/maps/place/([^/]+)/@(-?\d+\.\d+),(-?\d+\.\d+)')
+
+# Returns [href, aria-label] for every card element passed in, in one round-trip
+CARD_KEYS_JS = """
+return arguments[0].map(function (el) {
+    var anchor = el.tagName === 'A' ? el : el.querySelector('a[href]');
+    return [anchor ? anchor.getAttribute('href') : null, el.getAttribute('aria-label')];
+});
+"""
+
+
+def place_id_from_href(href):
+    """
+    Derive a stable place identifier from a Maps card or place URL
+
+    Returns:
+        The feature ID ("0x...:0x..."), the place ID ("ChIJ..."), a
+        "name@lat,lng" key, or None if the URL carries no place identity
+    """
+    if not href:
+        return None
+    href = unquote(href)
+
+    match = _FEATURE_ID_RE.search(href)
+    if match:
+        return match.group(1).lower()
+
+    match = _PLACE_ID_RE.search(href)
+    if match:
+        return match.group(1)
+
+    match = _NAME_COORDS_RE.search(urlsplit(href).path)
+    if match:
+        name, lat, lng = match.groups()
+        return f"{name.replace('+', ' ').lower()}@{float(lat):.5f},{float(lng):.5f}"
+
+    return None
+
+
+def card_key(href, label):
+    """Key for a feed card: its place identifier, or its label when the href has none"""
+    return place_id_from_href(href) or (f"label:{label.strip().lower()}" if label else None)
+
+
+class PlaceIndex:
+    """
+    Hash-set of place keys already handled in a scrape, with dedup metrics
+
+    A card is marked as seen before it is clicked, so a failed extraction is
+    never retried by position and a card that reappears after a scroll is
+    skipped without a click.
+    """
+
+    def __init__(self, seen=None):
+        self.seen = set(seen or ())
+        self.cards_seen = 0
+        self.duplicates_skipped = 0
+        self.without_key = 0
+
+    def __contains__(self, key):
+        return key in self.seen
+
+    def __len__(self):
+        return len(self.seen)
+
+    def check(self, key):
+        """
+        Register a card key, returning True if it has not been seen before
+
+        Cards without a key cannot be deduplicated and always count as new.
+        """
+        self.cards_seen += 1
+        if key is None:
+            self.without_key += 1
+            return True
+        if key in self.seen:
+            self.duplicates_skipped += 1
+            return False
+        self.seen.add(key)
+        return True
+
+    def add(self, key):
+        if key is not None:
+            self.seen.add(key)
+
+    def metrics(self):
+        return {
+            'cards_seen': self.cards_seen,
+            'unique_places': len(self.seen),
+            'duplicates_skipped': self.duplicates_skipped,
+            'cards_without_id': self.without_key,
+        }
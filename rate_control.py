@@ -0,0 +1,127 @@
+import logging
+import multiprocessing as mp
+import time
+
+from config import (
+    RATE_INITIAL, RATE_MIN, RATE_MAX, RATE_INCREASE, RATE_DECREASE_FACTOR,
+    RATE_LATENCY_TARGET, RATE_BURST, RATE_BLOCK_COOLDOWN
+)
+from instrumentation import get_profile
+
+logger = logging.getLogger(__name__)
+
+# Outcomes passed to RateController.record
+OK = 'ok'
+SLOW = 'slow'
+TIMEOUT = 'timeout'
+ERROR = 'error'
+BLOCKED = 'blocked'
+
+# Returns 'captcha', 'consent' or null for the current page
+DETECT_BLOCK_JS = """
+var url = location.href;
+if (url.indexOf('/sorry/') !== -1 || document.querySelector('iframe[src*="recaptcha"], #captcha-form')) {
+    return 'captcha';
+}
+var text = document.body ? document.body.innerText.slice(0, 2000) : '';
+if (/unusual traffic|not a robot/i.test(text)) {
+    return 'captcha';
+}
+if (url.indexOf('consent.google.') !== -1) {
+    return 'consent';
+}
+return null;
+"""
+
+# Slots of the shared state array
+_RATE, _TOKENS, _LAST_REFILL, _BLOCKED_UNTIL = range(4)
+
+
+def detect_block(driver):
+    """Return 'captcha' or 'consent' if the site is blocking us, else None"""
+    try:
+        return driver.execute_script(DETECT_BLOCK_JS)
+    except Exception:
+        return None
+
+
+class RateController:
+    """
+    Adaptive AIMD request pacing shared by every job and worker process
+
+    Requests draw from a token bucket refilled at the current rate
+    (requests per second). Healthy responses raise the rate additively;
+    timeouts, errors, slow responses and block pages cut it multiplicatively,
+    and a block also pauses everyone for RATE_BLOCK_COOLDOWN seconds.
+
+    The state lives in a shared-memory array, so passing the controller to
+    worker processes at start-up makes them all draw from one bucket.
+    """
+
+    def __init__(self, initial_rate=RATE_INITIAL, min_rate=RATE_MIN, max_rate=RATE_MAX,
+                 increase=RATE_INCREASE, decrease_factor=RATE_DECREASE_FACTOR,
+                 latency_target=RATE_LATENCY_TARGET, burst=RATE_BURST,
+                 block_cooldown=RATE_BLOCK_COOLDOWN):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self.burst = burst
+        self.block_cooldown = block_cooldown
+        self.stats = {OK: 0, SLOW: 0, TIMEOUT: 0, ERROR: 0, BLOCKED: 0}
+        self._state = mp.get_context('spawn').Array('d', [initial_rate, burst, time.time(), 0.0])
+
+    @property
+    def rate(self):
+        return self._state[_RATE]
+
+    def acquire(self):
+        """
+        Block until a request may be sent
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._state.get_lock():
+                state = self._state
+                now = time.time()
+                state[_TOKENS] = min(self.burst, state[_TOKENS] + (now - state[_LAST_REFILL]) * state[_RATE])
+                state[_LAST_REFILL] = now
+                if now >= state[_BLOCKED_UNTIL] and state[_TOKENS] >= 1:
+                    state[_TOKENS] -= 1
+                    break
+                delay = max(state[_BLOCKED_UNTIL] - now, (1 - state[_TOKENS]) / state[_RATE])
+            time.sleep(delay)
+            waited += delay
+        get_profile().observe('sleep.rate_limit', waited)
+        return waited
+
+    def record(self, outcome, latency=None):
+        """Adjust the rate from the outcome of one request"""
+        if outcome == OK and latency is not None and latency > self.latency_target:
+            outcome = SLOW
+        self.stats[outcome] += 1
+        get_profile().count(f'requests.{outcome}')
+
+        with self._state.get_lock():
+            state = self._state
+            old_rate = state[_RATE]
+            if outcome == OK:
+                state[_RATE] = min(self.max_rate, old_rate + self.increase)
+            else:
+                state[_RATE] = max(self.min_rate, old_rate * self.decrease_factor)
+            if outcome == BLOCKED:
+                state[_TOKENS] = 0
+                state[_BLOCKED_UNTIL] = time.time() + self.block_cooldown
+            new_rate = state[_RATE]
+
+        if outcome != OK:
+            logger.info(f"Rate controller: {outcome}, rate {old_rate:.2f} -> {new_rate:.2f} req/s")
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['stats'] = {outcome: 0 for outcome in self.stats}
+        return state
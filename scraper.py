@@ -1,59 +1,128 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
+from selenium.common.exceptions import (
+    NoSuchElementException, ElementClickInterceptedException, WebDriverException
+)
+from extraction import (
+    FIELD_SELECTORS, FIELD_ATTRIBUTES, FIELD_DEFAULTS, parse_field, extract_fields
+)
+from selector_stats import get_registry
+from waits import (
+    dismiss_consent, wait_for_results, wait_for_detail_pane, wait_for_feed_growth, politeness_delay
+)
+from place_identity import PlaceIndex, card_key, place_id_from_href
+from snapshots import SNAPSHOT_JS
+from rate_control import OK, TIMEOUT, BLOCKED, detect_block
+from browser_controller import record_page_load
+from place_cache import CARD_GROUPS
+from listing import harvest_cards, parse_card, passes_card_filters
+from instrumentation import get_profile
+from geo_grid import parse_tile
+from config import RESULTS_TIMEOUT, DETAIL_PANE_TIMEOUT, FEED_GROWTH_TIMEOUT, MIN_RATING, MIN_REVIEWS
 import time
 import logging
-import random
 from urllib.parse import quote
-import re
 
 logger = logging.getLogger(__name__)
 
-def scrape_google_maps(driver, search_term, location, max_results=100):
+class SearchResults(list):
+    """Businesses extracted by one search, with the number of result cards it went through"""
+    cards_seen = 0
+
+def scrape_google_maps(driver, search_term, location, max_results=100, place_index=None, on_business=None,
+                       resume_depth=0, on_scroll=None, parser_pool=None, mode='detail', enrich=False,
+                       rate_controller=None, place_cache=None, card_filter=None):
     """
     Scrape Google Maps for business listings using Selenium
     
     Args:
         driver: Selenium WebDriver instance
         search_term: What to search for (e.g., "restaurants")
-        location: Where to search (e.g., "Nairobi, Kenya")
+        location: Where to search (e.g., "Nairobi, Kenya"), or a geo_grid
+            tile job location, which searches the tile's map viewport
         max_results: Maximum number of results to scrape
+        place_index: Optional PlaceIndex of places to skip (e.g. seen by an
+            earlier job); a fresh index is used if omitted
+        on_business: Optional callback invoked with each business as soon as
+            it is extracted
+        resume_depth: Number of feed scrolls to replay before extracting,
+            to get back to where an interrupted run stopped
+        on_scroll: Optional callback invoked with the scroll depth reached
+            after each scroll
+        parser_pool: Optional SnapshotParserPool; if given the browser only
+            captures each detail pane's HTML and the pool parses it
+        mode: 'detail' opens every business; 'listing' reads the result cards
+            in bulk and never clicks
+        enrich: In listing mode, open the detail pane for cards that pass the
+            MIN_RATING/MIN_REVIEWS filters and merge in their fields
+        rate_controller: Optional RateController paced before every
+            navigation, click and scroll, and fed their outcomes
+        place_cache: Optional PlaceCache; places with a fresh cached record
+            are emitted from it without opening the detail pane
+        card_filter: Optional listing.CardFilter; cards whose visible fields
+            already fail it are never opened, and detail panes that fail it
+            are dropped before the remaining fields are read
     
     Returns:
-        List of business dictionaries
+        SearchResults: list of business dictionaries whose cards_seen counts
+        every result card read, including duplicates and filtered cards
     """
-    businesses = []
+    businesses = SearchResults()
+    place_index = place_index if place_index is not None else PlaceIndex()
+    cards_before = place_index.cards_seen
+    profile = get_profile()
+    search_started = time.perf_counter()
+    
+    def emit(business_data):
+        businesses.append(business_data)
+        profile.count('businesses.extracted')
+        if on_business:
+            on_business(business_data)
+        logger.debug(f"Extracted business {len(businesses)}: {business_data.get('name', 'Unknown')}")
+    
+    def emit_parsed(wait=False):
+        if not parser_pool:
+            return
+        registry = get_registry()
+        for business_data, selector_hits in parser_pool.drain(wait):
+            for field, selector, hit in selector_hits:
+                registry.record(field, selector, hit)
+            if business_data.get('name'):
+                if place_cache is not None:
+                    place_cache.put(business_data.get('place_id'), business_data)
+                emit(business_data)
+    
+    def collected():
+        return len(businesses) + (parser_pool.pending if parser_pool else 0)
     
     try:
         # Construct search URL
-        query = f"{search_term} in {location}"
-        encoded_query = quote(query)
-        url = f"https://www.google.com/maps/search/{encoded_query}"
+        tile = parse_tile(location)
+        if tile:
+            url = tile.search_url(search_term)
+        else:
+            query = f"{search_term} in {location}"
+            encoded_query = quote(query)
+            url = f"https://www.google.com/maps/search/{encoded_query}"
         
         logger.info(f"Navigating to: {url}")
+        if rate_controller:
+            rate_controller.acquire()
+        started = time.time()
         driver.get(url)
         
-        # Wait for page to load
-        wait = WebDriverWait(driver, 20)
-        time.sleep(5)  # Give page time to fully load
-        
-        # Accept cookies if present
-        try:
-            accept_button = driver.find_element(By.XPATH, "//button[contains(text(), 'Accept') or contains(text(), 'I agree')]")
-            accept_button.click()
-            time.sleep(2)
-        except NoSuchElementException:
-            pass
-        
-        # Wait for search results to appear
-        try:
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, '[role="main"]')))
-            logger.info("Search results loaded")
-        except TimeoutException:
+        # Accept cookies if present, then wait for search results to appear
+        dismiss_consent(driver, RESULTS_TIMEOUT)
+        if not wait_for_results(driver, RESULTS_TIMEOUT):
             logger.warning("Timeout waiting for search results")
+            if rate_controller:
+                rate_controller.record(BLOCKED if detect_block(driver) else TIMEOUT)
             return businesses
+        ready_time = time.time() - started
+        profile.observe('scrape.navigate', ready_time)
+        record_page_load(driver, 'search', ready_time)
+        if rate_controller:
+            rate_controller.record(BLOCKED if detect_block(driver) else OK, ready_time)
+        logger.info("Search results loaded")
         
         # Find the scrollable results panel
         try:
@@ -63,309 +132,403 @@ def scrape_google_maps(driver, search_term, location, max_results=100):
             return businesses
         
         # Scroll and collect results
-        last_height = 0
+        previous_name = None
+        scroll_depth = 0
         scroll_attempts = 0
         max_scroll_attempts = 15
+        watermark = -1  # Highest result index already harvested
+        feed_count = 0
         
-        while len(businesses) < max_results and scroll_attempts < max_scroll_attempts:
-            # Find all business listings
-            business_links = driver.find_elements(By.CSS_SELECTOR, 'a[data-result-index]')
+        # Replay the scrolls of an interrupted run without clicking anything
+        if resume_depth:
+            card_count = 0
+            while scroll_depth < resume_depth:
+                driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", results_panel)
+                new_count = wait_for_feed_growth(driver, results_panel, card_count, FEED_GROWTH_TIMEOUT)
+                scroll_depth += 1
+                if new_count <= card_count:
+                    break
+                card_count = new_count
+            logger.info(f"Resumed at scroll depth {scroll_depth} with {len(place_index)} places already done")
+        
+        while collected() < max_results and scroll_attempts < max_scroll_attempts:
+            # Only cards past the watermark cross the wire, with their
+            # fields when the loop needs them, plus the end-of-list marker
+            with profile.timer('scrape.cards'):
+                cards, feed_count, end_of_list = harvest_cards(
+                    driver, watermark, with_fields=mode == 'listing' or bool(card_filter)
+                )
+            if cards:
+                watermark = max(card['index'] for card in cards)
+            business_links = [card['el'] for card in cards]
+            card_keys = [(card['href'], card['label']) for card in cards]
+            if mode != 'listing' and not card_filter:
+                cards = [None] * len(business_links)
             
-            if not business_links:
-                # Try alternative selectors
-                business_links = driver.find_elements(By.CSS_SELECTOR, '.hfpxzc')
+            logger.info(f"Found {len(business_links)} new business links ({feed_count} in the feed)")
             
-            logger.info(f"Found {len(business_links)} business links on page")
+            # Start loading the next page while this batch is processed
+            if not end_of_list:
+                if rate_controller:
+                    rate_controller.acquire()
+                driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", results_panel)
             
             # Process new businesses
-            for i, link in enumerate(business_links):
-                if len(businesses) >= max_results:
+            for i, (link, (href, label), card) in enumerate(zip(business_links, card_keys, cards)):
+                if collected() >= max_results:
                     break
                 
                 try:
-                    # Skip if we've already processed this business
-                    if i < len(businesses):
+                    # Skip cards already handled, before paying for a click
+                    key = card_key(href, label)
+                    if not place_index.check(key):
+                        continue
+                    profile.count('cards.new')
+                    
+                    # Skip cards whose visible fields already fail the filters
+                    if card_filter and not card_filter.check_card(card):
+                        profile.count('filter.cards_rejected')
+                        card_filter.cards_rejected += 1
+                        if mode != 'listing':
+                            card_filter.clicks_saved += 1
                         continue
                     
-                    business_data = extract_business_data_from_link(link, driver, wait)
-                    if business_data and business_data not in businesses:
-                        businesses.append(business_data)
-                        logger.debug(f"Extracted business {len(businesses)}: {business_data.get('name', 'Unknown')}")
+                    if mode == 'listing':
+                        business_data = parse_card(card)
+                        if enrich and passes_card_filters(business_data, MIN_RATING, MIN_REVIEWS):
+                            # The card itself has just refreshed the review fields
+                            details = place_cache.lookup(key, refreshed=CARD_GROUPS) if place_cache is not None else None
+                            if details:
+                                details = {k: v for k, v in details.items() if business_data.get(k) is None}
+                            else:
+                                details = extract_business_data_from_link(
+                                    link, driver, previous_name, rate_controller, card_filter
+                                )
+                                politeness_delay('business')
+                                if details:
+                                    previous_name = details.get('name')
+                                    if place_cache is not None:
+                                        place_cache.put(key, details)
+                            if details:
+                                business_data.update({
+                                    k: v for k, v in details.items()
+                                    if v is not None and v != FIELD_DEFAULTS.get(k)
+                                })
+                            if place_cache is not None:
+                                place_cache.put(key, business_data, groups=CARD_GROUPS)
+                    else:
+                        cached = place_cache.lookup(key) if place_cache is not None else None
+                        if cached:
+                            profile.count('place_cache.hits')
+                            if card_filter and not card_filter.check(cached):
+                                card_filter.details_rejected += 1
+                            else:
+                                emit(cached)
+                            continue
+                        if parser_pool:
+                            business_data = capture_snapshot_from_link(
+                                link, driver, previous_name, rate_controller, card_filter
+                            )
+                        else:
+                            business_data = extract_business_data_from_link(
+                                link, driver, previous_name, rate_controller, card_filter
+                            )
+                        politeness_delay('business')
+                        if not business_data:
+                            continue
+                        previous_name = business_data.get('name')
+                    
+                    # The pane URL can identify a place the card could not
+                    place_id = business_data.get('place_id')
+                    if place_id and place_id != key:
+                        if place_id in place_index:
+                            place_index.duplicates_skipped += 1
+                            continue
+                        place_index.add(place_id)
+                    business_data['place_id'] = place_id or key
                     
-                    # Small delay between extractions
-                    time.sleep(random.uniform(0.5, 1.5))
+                    if parser_pool:
+                        business_data.update(search_term=search_term, search_location=location)
+                        parser_pool.submit(business_data)
+                        emit_parsed()
+                    else:
+                        # Listing mode has already cached its record
+                        if place_cache is not None and mode != 'listing':
+                            place_cache.put(key, business_data)
+                        emit(business_data)
                     
+                except FilteredOut as e:
+                    previous_name = e.name or previous_name
+                    profile.count('filter.details_rejected')
+                    card_filter.details_rejected += 1
+                    politeness_delay('business')
+                    continue
                 except Exception as e:
                     logger.warning(f"Error extracting business {i}: {str(e)}")
                     continue
             
-            # Scroll down to load more results
-            driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", results_panel)
-            time.sleep(random.uniform(2, 4))
+            if end_of_list:
+                logger.info("Reached end of results")
+                break
+            if collected() >= max_results:
+                break
             
-            # Check if we've reached the bottom
-            new_height = driver.execute_script("return arguments[0].scrollHeight", results_panel)
-            if new_height == last_height:
+            # Wait for the prefetched page (usually already there)
+            # Only the wait is the feed's latency; the batch processed since
+            # the scroll would count every click as a slow response
+            waited = time.time()
+            new_count = wait_for_feed_growth(driver, results_panel, feed_count, FEED_GROWTH_TIMEOUT)
+            wait_time = time.time() - waited
+            profile.observe('scrape.scroll', wait_time)
+            if rate_controller and new_count > feed_count:
+                rate_controller.record(OK, wait_time)
+            scroll_depth += 1
+            if on_scroll:
+                on_scroll(scroll_depth)
+            politeness_delay('scroll')
+            
+            # No end-of-list marker and nothing new: scroll again a few times
+            if new_count <= feed_count:
                 scroll_attempts += 1
-                if scroll_attempts >= 3:  # If no new content for 3 attempts, stop
-                    logger.info("Reached end of results")
+                if scroll_attempts >= 3:
+                    logger.info("Feed stopped growing before the end of the list")
                     break
             else:
                 scroll_attempts = 0
-                last_height = new_height
         
+        emit_parsed(wait=True)
         logger.info(f"Successfully scraped {len(businesses)} businesses")
         return businesses
         
     except Exception as e:
         logger.error(f"Error during scraping: {str(e)}")
+        emit_parsed(wait=True)
         return businesses
+    
+    finally:
+        profile.observe('scrape.search', time.perf_counter() - search_started)
+        businesses.cards_seen = place_index.cards_seen - cards_before
+        metrics = place_index.metrics()
+        logger.info(
+            f"Dedup for {search_term} in {location}: {metrics['cards_seen']} cards seen, "
+            f"{metrics['duplicates_skipped']} duplicates skipped, "
+            f"{metrics['cards_without_id']} without place ID"
+        )
+        if card_filter:
+            filter_metrics = card_filter.metrics()
+            logger.info(
+                f"Filter pushdown for {search_term} in {location}: {filter_metrics['cards_rejected']} cards "
+                f"rejected ({filter_metrics['clicks_saved']} clicks saved), "
+                f"{filter_metrics['details_rejected']} rejected in the detail pane"
+            )
+        if place_cache is not None:
+            cache_metrics = place_cache.metrics()
+            logger.info(
+                f"Place cache so far: {cache_metrics['hits']} hits, {cache_metrics['misses']} misses, "
+                f"{cache_metrics['stale']} stale"
+            )
+
+class FilteredOut(Exception):
+    """An opened business failed the card filter; carries the name now in the pane"""
+    
+    def __init__(self, name=None):
+        super().__init__(name)
+        self.name = name
 
-def extract_business_data_from_link(link_element, driver, wait):
+def extract_business_data_from_link(link_element, driver, previous_name=None, rate_controller=None,
+                                    card_filter=None):
     """
     Extract business data by clicking on a business link
     
     Args:
         link_element: Selenium WebElement for the business link
         driver: WebDriver instance
-        wait: WebDriverWait instance
+        previous_name: Name shown in the detail pane before this click, used
+            to detect when the pane has switched to the new business
+        rate_controller: Optional RateController for pacing the click
+        card_filter: Optional CardFilter; its fields are read first and a
+            failing business raises FilteredOut without reading the rest
     
     Returns:
         Dictionary with business data or None if extraction fails
     """
     business_data = {}
+    profile = get_profile()
+    started = time.perf_counter()
     
     try:
-        # Scroll element into view
-        driver.execute_script("arguments[0].scrollIntoView(true);", link_element)
-        time.sleep(1)
+        open_business(link_element, driver, previous_name, rate_controller)
         
-        # Click on the business link
+        # Extract every field in one round-trip, falling back to
+        # per-selector lookups if the script cannot run
+        registry = get_registry()
         try:
-            link_element.click()
-        except ElementClickInterceptedException:
-            # Try clicking with JavaScript if normal click fails
-            driver.execute_script("arguments[0].click();", link_element)
-        
-        # Wait for business details to load
-        time.sleep(random.uniform(2, 4))
-        
-        # Extract business name
-        business_data['name'] = extract_business_name(driver)
-        
-        # Extract rating
-        business_data['rating'] = extract_rating(driver)
-        
-        # Extract reviews count
-        business_data['reviews_count'] = extract_reviews_count(driver)
-        
-        # Extract address
-        business_data['address'] = extract_address(driver)
-        
-        # Extract phone number
-        business_data['phone'] = extract_phone(driver)
-        
-        # Extract website
-        business_data['website'] = extract_website(driver)
-        
-        # Extract category
-        business_data['category'] = extract_category(driver)
-        
-        # Extract hours
-        business_data['hours'] = extract_hours(driver)
-        
-        # Extract price level
-        business_data['price_level'] = extract_price_level(driver)
+            with profile.timer('extract.batched'):
+                business_data.update(extract_fields(driver, registry=registry))
+        except WebDriverException as e:
+            profile.count('extract.batched_failures')
+            logger.debug(f"Batched extraction failed, using per-field lookups: {str(e)}")
+            if card_filter:
+                # Filtered fields first, so a failing business costs few lookups
+                business_data.update(extract_fields_individually(driver, registry, ['name'] + card_filter.fields))
+                if card_filter.check(business_data):
+                    business_data.update(extract_fields_individually(driver, registry, [
+                        field for field in FIELD_SELECTORS if field not in business_data
+                    ]))
+            else:
+                business_data.update(extract_fields_individually(driver, registry))
+        if card_filter and not card_filter.check(business_data):
+            raise FilteredOut(business_data.get('name'))
         
         # Add location context
         business_data['location'] = driver.current_url
+        business_data['place_id'] = place_id_from_href(business_data['location'])
         
         return business_data if business_data.get('name') else None
         
+    except FilteredOut:
+        raise
     except Exception as e:
         logger.warning(f"Error extracting business data: {str(e)}")
+        profile.count('extract.errors')
         return None
+    finally:
+        profile.observe('scrape.business', time.perf_counter() - started)
 
-def extract_business_name(driver):
-    """Extract business name with multiple fallback selectors"""
-    selectors = [
-        'h1[data-attrid="title"]',
-        '.DUwDvf.fontHeadlineSmall',
-        '.qrShPb .fontHeadlineSmall',
-        'h1.DUwDvf',
-        '.x3AX1-LfntMc-header-title-title'
-    ]
+def open_business(link_element, driver, previous_name=None, rate_controller=None):
+    """
+    Click a feed card and wait until the detail pane shows that business
     
-    for selector in selectors:
-        try:
-            element = driver.find_element(By.CSS_SELECTOR, selector)
-            name = element.text.strip()
-            if name:
-                return name
-        except NoSuchElementException:
-            continue
+    Returns:
+        The business name from the card's aria-label, if it has one
+    """
+    if rate_controller:
+        rate_controller.acquire()
+    started = time.time()
+    
+    # Scroll element into view and read the name the pane should show
+    expected_name = driver.execute_script(
+        "arguments[0].scrollIntoView({block: 'center'}); return arguments[0].getAttribute('aria-label');",
+        link_element
+    )
+    
+    # Click on the business link
+    try:
+        link_element.click()
+    except ElementClickInterceptedException:
+        # Try clicking with JavaScript if normal click fails
+        driver.execute_script("arguments[0].click();", link_element)
+    
+    # Wait for business details to load
+    pane_ready = wait_for_detail_pane(driver, expected_name, previous_name, DETAIL_PANE_TIMEOUT)
+    get_profile().observe('scrape.open', time.time() - started)
+    if pane_ready:
+        ready_time = time.time() - started
+        record_page_load(driver, 'detail', ready_time)
+        if rate_controller:
+            rate_controller.record(OK, ready_time)
+    else:
+        logger.debug(f"Detail pane did not update for {expected_name or 'business'}")
+        get_profile().count('detail_pane.timeouts')
+        if rate_controller:
+            rate_controller.record(BLOCKED if detect_block(driver) else TIMEOUT)
     
-    return "Unknown"
+    return expected_name
 
-def extract_rating(driver):
-    """Extract rating with multiple fallback selectors"""
-    selectors = [
-        '.MW4etd',
-        '.ceNzKf',
-        '[data-value]',
-        '.gm2-body-2'
-    ]
+def capture_snapshot_from_link(link_element, driver, previous_name=None, rate_controller=None, card_filter=None):
+    """
+    Open a business and capture the page HTML for off-browser parsing
     
-    for selector in selectors:
-        try:
-            element = driver.find_element(By.CSS_SELECTOR, selector)
-            rating_text = element.text.strip()
-            # Extract numeric rating
-            rating_match = re.search(r'(\d+\.?\d*)', rating_text)
-            if rating_match:
-                return float(rating_match.group(1))
-        except (NoSuchElementException, ValueError):
-            continue
+    With card_filter, the filtered fields are read from the pane first and
+    a failing business raises FilteredOut before the page is transferred.
+    
+    Returns:
+        Snapshot dictionary (html, url, name, place_id, captured_at) or
+        None if the capture fails
+    """
+    try:
+        name = open_business(link_element, driver, previous_name, rate_controller)
+        if card_filter and not card_filter.check(extract_fields(driver, fields=card_filter.fields)):
+            raise FilteredOut(name)
+        with get_profile().timer('extract.snapshot'):
+            url, html = driver.execute_script(SNAPSHOT_JS)
+        return {
+            'html': html,
+            'url': url,
+            'name': name,
+            'place_id': place_id_from_href(url),
+            'captured_at': time.time(),
+        }
+    except FilteredOut:
+        raise
+    except Exception as e:
+        logger.warning(f"Error capturing business snapshot: {str(e)}")
+        return None
+
+def _extract_field(driver, field, registry=None):
+    """Try the fallback selectors for one field with a find_element call each"""
+    attribute = FIELD_ATTRIBUTES.get(field)
+    selectors = FIELD_SELECTORS[field]
+    if registry:
+        selectors = registry.ordered(field, selectors)
+    profile = get_profile()
     
-    return None
+    with profile.timer(f'extract.{field}'):
+        for selector in selectors:
+            started = time.perf_counter()
+            try:
+                element = driver.find_element(By.CSS_SELECTOR, selector)
+                value = parse_field(field, element.get_attribute(attribute) if attribute else element.text)
+            except NoSuchElementException:
+                # Each miss costs the driver's implicit wait
+                profile.observe('extract.selector_miss', time.perf_counter() - started)
+                value = None
+            if registry:
+                registry.record(field, selector, value is not None)
+            if value is not None:
+                return value
+    
+    return FIELD_DEFAULTS.get(field)
+
+def extract_fields_individually(driver, registry=None, fields=None):
+    """Extract every field (or the given ones) with per-selector WebDriver lookups (slow path)"""
+    return {field: _extract_field(driver, field, registry) for field in (fields or FIELD_SELECTORS)}
+
+def extract_business_name(driver):
+    """Extract business name with multiple fallback selectors"""
+    return _extract_field(driver, 'name')
+
+def extract_rating(driver):
+    """Extract rating with multiple fallback selectors"""
+    return _extract_field(driver, 'rating')
 
 def extract_reviews_count(driver):
     """Extract reviews count with multiple fallback selectors"""
-    selectors = [
-        '.UY7F9',
-        '.ceNzKf',
-        '[data-value] + span',
-        '.gm2-body-2'
-    ]
-    
-    for selector in selectors:
-        try:
-            element = driver.find_element(By.CSS_SELECTOR, selector)
-            reviews_text = element.text.strip()
-            # Extract number from text like "(123)" or "123 reviews"
-            reviews_match = re.search(r'(\d+)', reviews_text.replace(',', ''))
-            if reviews_match:
-                return int(reviews_match.group(1))
-        except (NoSuchElementException, ValueError):
-            continue
-    
-    return 0
+    return _extract_field(driver, 'reviews_count')
 
 def extract_address(driver):
     """Extract address with multiple fallback selectors"""
-    selectors = [
-        '.Io6YTe',
-        '[data-item-id*="address"]',
-        '.rogA2c .Io6YTe',
-        '.LrzXr'
-    ]
-    
-    for selector in selectors:
-        try:
-            element = driver.find_element(By.CSS_SELECTOR, selector)
-            address = element.text.strip()
-            if address and len(address) > 5:  # Basic validation
-                return address
-        except NoSuchElementException:
-            continue
-    
-    return None
+    return _extract_field(driver, 'address')
 
 def extract_phone(driver):
     """Extract phone number with multiple fallback selectors"""
-    selectors = [
-        '[data-item-id*="phone"]',
-        '.rogA2c .Io6YTe',
-        'span[data-dtype="d3ph"]'
-    ]
-    
-    for selector in selectors:
-        try:
-            element = driver.find_element(By.CSS_SELECTOR, selector)
-            phone = element.text.strip()
-            # Basic phone validation
-            if phone and ('+' in phone or len(re.findall(r'\d', phone)) >= 7):
-                return phone
-        except NoSuchElementException:
-            continue
-    
-    return None
+    return _extract_field(driver, 'phone')
 
 def extract_website(driver):
     """Extract website URL with multiple fallback selectors"""
-    selectors = [
-        'a[data-item-id*="authority"]',
-        'a[href*="http"]:not([href*="google"])',
-        '.CsEnBe a[href*="http"]'
-    ]
-    
-    for selector in selectors:
-        try:
-            element = driver.find_element(By.CSS_SELECTOR, selector)
-            href = element.get_attribute('href')
-            if href and 'google' not in href.lower():
-                return href
-        except NoSuchElementException:
-            continue
-    
-    return None
+    return _extract_field(driver, 'website')
 
 def extract_category(driver):
     """Extract business category with multiple fallback selectors"""
-    selectors = [
-        '.DkEaL',
-        '.mgr77e .DkEaL',
-        '.LBgpqf .DkEaL'
-    ]
-    
-    for selector in selectors:
-        try:
-            element = driver.find_element(By.CSS_SELECTOR, selector)
-            category = element.text.strip()
-            if category:
-                return category
-        except NoSuchElementException:
-            continue
-    
-    return None
+    return _extract_field(driver, 'category')
 
 def extract_hours(driver):
     """Extract business hours with multiple fallback selectors"""
-    selectors = [
-        '.t39EBf',
-        '.OqCZI .t39EBf',
-        '[data-dtype="d3oh"]'
-    ]
-    
-    for selector in selectors:
-        try:
-            element = driver.find_element(By.CSS_SELECTOR, selector)
-            hours = element.text.strip()
-            if hours:
-                return hours
-        except NoSuchElementException:
-            continue
-    
-    return None
+    return _extract_field(driver, 'hours')
 
 def extract_price_level(driver):
     """Extract price level (number of $ symbols)"""
-    selectors = [
-        '.mgr77e',
-        '.priceRange',
-        '[data-dtype="d3pr"]'
-    ]
-    
-    for selector in selectors:
-        try:
-            element = driver.find_element(By.CSS_SELECTOR, selector)
-            price_text = element.text.strip()
-            if '$' in price_text:
-                return price_text.count('$')
-        except NoSuchElementException:
-            continue
-    
-    return None
+    return _extract_field(driver, 'price_level')
 
 def filter_businesses(businesses, min_rating=None, require_no_website=False, min_reviews=0):
     """
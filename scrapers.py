@@ -1,17 +1,161 @@
-# filepath: c:\Users\LENOVO\Desktop\scrape\maps_scraper\scrapers.py
+import logging
+from urllib.parse import quote
+
 import scrapy
+from scrapy.exceptions import DropItem
+
+from config import (
+    SEARCH_TERMS, LOCATIONS, MAX_RESULTS, OUTPUT_FILE,
+    SCRAPY_CONCURRENT_REQUESTS, SCRAPY_CONCURRENT_REQUESTS_PER_DOMAIN,
+    SCRAPY_DOWNLOAD_DELAY, SCRAPY_HTTPCACHE_ENABLED, SCRAPY_HTTPCACHE_DIR,
+    SCRAPY_HTTPCACHE_EXPIRATION_SECS
+)
+from listing import (
+    CARD_CONTAINER_SELECTOR, CARD_LINK_SELECTOR, CARD_SELECTORS,
+    CARD_LINK_ATTRIBUTES, CARD_INFO_SELECTOR, parse_card
+)
+from sinks import OUTPUT_COLUMNS, make_sink
+
+logger = logging.getLogger(__name__)
+
+SEARCH_URL = "https://www.google.com/maps/search/"
+
+
+def _text(selector):
+    return ' '.join(' '.join(selector.css('::text').getall()).split())
+
+
+def card_from_selector(container):
+    """Read the raw card fields from a result container (same layout as READ_CARDS_JS)"""
+    link = container.css(CARD_LINK_SELECTOR)
+    link = link[0] if link else container
+    card = {
+        'href': link.attrib.get('href'),
+        'label': link.attrib.get('aria-label'),
+    }
+    for field, selectors in CARD_SELECTORS.items():
+        card[field] = None
+        for css in selectors:
+            match = container.css(css)
+            if match:
+                card[field] = _text(match[0])
+                break
+    for field, (css, attribute) in CARD_LINK_ATTRIBUTES.items():
+        match = container.css(css)
+        card[field] = match[0].attrib.get(attribute) if match else None
+    card['info'] = [
+        _text(info) for info in container.css(CARD_INFO_SELECTOR)
+        if not info.css(CARD_INFO_SELECTOR)[1:]  # innermost lines only
+    ]
+    return card
+
 
 class MySpider(scrapy.Spider):
+    """
+    Browserless engine for the SEARCH_TERMS x LOCATIONS matrix
+
+    Fetches result pages with Scrapy's concurrent downloader and parses the
+    result cards with the same selectors and parsers as listing mode, so
+    items share the scrape_google_maps record schema. Only works where the
+    pages are served without JavaScript (or from a local fixture server).
+
+    Spider arguments (all optional, -a name=value):
+        base_url: Search URL prefix the "<term> in <location>" query is appended to
+        terms / locations: "|"-separated overrides for SEARCH_TERMS / LOCATIONS
+        max_results: Cards to keep per query (default MAX_RESULTS)
+        output: Also stream items to this CSV/JSONL file through the sink
+    """
     name = "myspider"
-    start_urls = [
-        "https://www.google.com/maps/search/restaurants+in+Nairobi",
-        "https://www.google.com/maps/search/hotels+in+Mombasa",
-        "https://www.google.com/maps/search/cafes+in+Kisumu"
-    ]
+    custom_settings = {
+        'CONCURRENT_REQUESTS': SCRAPY_CONCURRENT_REQUESTS,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': SCRAPY_CONCURRENT_REQUESTS_PER_DOMAIN,
+        'DOWNLOAD_DELAY': SCRAPY_DOWNLOAD_DELAY,
+        'HTTPCACHE_ENABLED': SCRAPY_HTTPCACHE_ENABLED,
+        'HTTPCACHE_DIR': SCRAPY_HTTPCACHE_DIR,
+        'HTTPCACHE_EXPIRATION_SECS': SCRAPY_HTTPCACHE_EXPIRATION_SECS,
+        'ITEM_PIPELINES': {'scrapers.BusinessRecordPipeline': 300},
+        'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36',
+    }
+
+    def __init__(self, base_url=SEARCH_URL, terms=None, locations=None, max_results=MAX_RESULTS,
+                 output=None, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url
+        self.terms = terms.split('|') if terms else SEARCH_TERMS
+        self.locations = locations.split('|') if locations else LOCATIONS
+        self.max_results = int(max_results)
+        self.output = output
+
+    async def start(self):
+        # Scrapy >= 2.13 entry point
+        for request in self.start_requests():
+            yield request
+
+    def start_requests(self):
+        for location in self.locations:
+            for term in self.terms:
+                url = self.base_url + quote(f"{term} in {location}")
+                yield scrapy.Request(url, cb_kwargs={'term': term, 'location': location, 'count': 0})
+
+    def parse(self, response, term, location, count):
+        for container in response.css(CARD_CONTAINER_SELECTOR):
+            if count >= self.max_results:
+                return
+            record = parse_card(card_from_selector(container))
+            if record.get('location'):
+                record['location'] = response.urljoin(record['location'])
+            record['search_term'] = term
+            record['search_location'] = location
+            count += 1
+            yield record
+
+        # Follow paginated result pages where the server provides them
+        next_page = response.css('a[rel="next"]::attr(href)').get()
+        if next_page and count < self.max_results:
+            yield response.follow(
+                next_page, cb_kwargs={'term': term, 'location': location, 'count': count}
+            )
+
+
+class BusinessRecordPipeline:
+    """Normalize items to the output schema, drop incomplete/duplicate ones and stream them to the sink"""
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        pipeline = cls()
+        pipeline.crawler = crawler
+        return pipeline
+
+    def open_spider(self, spider=None):
+        spider = spider or self.crawler.spider
+        self.seen = set()
+        self.sink = make_sink(spider.output) if getattr(spider, 'output', None) else None
+
+    def process_item(self, item, spider=None):
+        record = {column: item.get(column) for column in OUTPUT_COLUMNS}
+        if not record['name']:
+            raise DropItem("Missing business name")
+        # Cards without a place ID cannot be told apart here; the sink dedups them
+        if record['place_id']:
+            if record['place_id'] in self.seen:
+                raise DropItem(f"Duplicate place {record['place_id']}")
+            self.seen.add(record['place_id'])
+        if self.sink:
+            self.sink.write(record)
+        return record
+
+    def close_spider(self, spider=None):
+        if self.sink:
+            if self.sink.rows_written:
+                self.sink.close()
+            else:
+                self.sink.discard()
+
+
+def run_spider(output_file=OUTPUT_FILE, **spider_args):
+    """Run the Scrapy engine in-process and stream its items to output_file"""
+    from scrapy.crawler import CrawlerProcess
 
-    def parse(self, response):
-        for business in response.css(".hfpxzc"):  # Replace with the correct CSS selector
-            yield {
-                "title": business.css(".dbg0pd::text").get(),  # Replace with the correct CSS selector
-                "url": business.css(".aogddb::attr(href)").get()  # Replace with the correct CSS selector
-            }
\ No newline at end of file
+    process = CrawlerProcess(install_root_handler=False)
+    process.crawl(MySpider, output=output_file, **spider_args)
+    process.start()
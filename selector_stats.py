@@ -0,0 +1,130 @@
+import json
+import logging
+import os
+from pathlib import Path
+
+from config import SELECTOR_STATS_FILE, DEAD_SELECTOR_MIN_ATTEMPTS
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves are not serialized between processes
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class SelectorRegistry:
+    """
+    Hit/miss statistics per (field, selector) used to order fallback selectors
+
+    A hit means the selector matched an element whose value passed the field
+    validation. Selectors are tried by smoothed hit rate, so stale class names
+    sink to the end of the list instead of costing a lookup on every business.
+    Counts are persisted as JSON and merged on save under a lock file, so
+    several processes can share one stats file.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.stats = {}    # field -> selector -> [hits, misses]
+        self._delta = {}   # changes not yet written to disk
+
+    @classmethod
+    def load(cls, path):
+        registry = cls(path)
+        registry.stats = registry._read()
+        return registry
+
+    def _read(self):
+        if not self.path or not self.path.exists():
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read selector stats from {self.path}: {str(e)}")
+            return {}
+
+    def record(self, field, selector, hit):
+        index = 0 if hit else 1
+        for counts in (self.stats, self._delta):
+            entry = counts.setdefault(field, {}).setdefault(selector, [0, 0])
+            entry[index] += 1
+
+    def hit_rate(self, field, selector):
+        """Laplace-smoothed hit rate; unseen selectors score 0.5"""
+        hits, misses = self.stats.get(field, {}).get(selector, (0, 0))
+        return (hits + 1) / (hits + misses + 2)
+
+    def ordered(self, field, selectors):
+        """Return selectors sorted by hit rate, keeping the given order on ties"""
+        return sorted(selectors, key=lambda selector: -self.hit_rate(field, selector))
+
+    def dead_selectors(self, min_attempts=DEAD_SELECTOR_MIN_ATTEMPTS):
+        """List (field, selector, attempts) for selectors that never hit"""
+        dead = []
+        for field, selectors in self.stats.items():
+            for selector, (hits, misses) in selectors.items():
+                if hits == 0 and misses >= min_attempts:
+                    dead.append((field, selector, misses))
+        return sorted(dead)
+
+    def report(self):
+        """Per-field selector statistics in the order they will be tried"""
+        report = {}
+        for field, selectors in self.stats.items():
+            report[field] = [
+                {
+                    'selector': selector,
+                    'hits': selectors[selector][0],
+                    'misses': selectors[selector][1],
+                    'hit_rate': round(self.hit_rate(field, selector), 3),
+                }
+                for selector in self.ordered(field, selectors)
+            ]
+        return report
+
+    def save(self):
+        """Merge unsaved counts into the stats file and write it atomically"""
+        if not self.path or not self._delta:
+            return
+
+        # Read, merge and replace under one lock, or a concurrent save loses its counts
+        with open(self.path.with_name(f"{self.path.name}.lock"), 'w') as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            merged = self._read()
+            for field, selectors in self._delta.items():
+                for selector, (hits, misses) in selectors.items():
+                    entry = merged.setdefault(field, {}).setdefault(selector, [0, 0])
+                    entry[0] += hits
+                    entry[1] += misses
+
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(merged, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+        self.stats = merged
+        self._delta = {}
+
+
+_registry = None
+
+
+def get_registry():
+    """Process-wide registry backed by config.SELECTOR_STATS_FILE"""
+    global _registry
+    if _registry is None:
+        _registry = SelectorRegistry.load(SELECTOR_STATS_FILE)
+    return _registry
+
+
+if __name__ == "__main__":
+    registry = SelectorRegistry.load(SELECTOR_STATS_FILE)
+    print(json.dumps(registry.report(), indent=2))
+    dead = registry.dead_selectors()
+    if dead:
+        print(f"\n{len(dead)} dead selectors (no hits in {DEAD_SELECTOR_MIN_ATTEMPTS}+ attempts):")
+        for field, selector, attempts in dead:
+            print(f"  {field}: {selector} ({attempts} misses)")
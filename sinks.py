@@ -0,0 +1,201 @@
+import csv
+import json
+import logging
+import os
+from pathlib import Path
+
+from config import SINK_FLUSH_EVERY, ELASTICSEARCH_INDEX
+
+logger = logging.getLogger(__name__)
+
+# Output column order
+OUTPUT_COLUMNS = [
+    'name', 'category', 'rating', 'reviews_count',
+    'address', 'phone', 'website', 'location',
+    'price_level', 'hours', 'place_id',
+    'search_term', 'search_location'
+]
+
+# Rows missing any of these are dropped
+REQUIRED_COLUMNS = ['name', 'address']
+
+
+class StreamingSink:
+    """
+    Append records to the output as they are scraped
+
+    Rows are written to "<output>.partial" and flushed every flush_every
+    rows, so a crash keeps everything written so far. close() backs up the
+    previous output to "<output>.backup" and atomically moves the partial
+    file into place. Only the keys of written rows are kept in memory.
+
+    With resume=True an existing partial file from an interrupted run is
+    appended to, and its rows count towards deduplication. on_flush is
+    called after every flush to disk.
+
+    Rows already on disk cannot be updated, so by default a place found again
+    by another search keeps only its first search_term. With per_search=True
+    it is written once per search_term instead, and entity resolution
+    (--resolve) merges the rows and their search terms afterwards.
+    """
+
+    def __init__(self, output_file, flush_every=SINK_FLUSH_EVERY, resume=False, on_flush=None,
+                 per_search=False):
+        self.output_file = Path(output_file)
+        self.per_search = per_search
+        self.partial_file = self.output_file.with_name(f"{self.output_file.name}.partial")
+        self.flush_every = max(1, flush_every)
+        self.on_flush = on_flush
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self._keys = set()
+        self._pending = 0
+
+        appending = resume and self.partial_file.exists()
+        if appending:
+            for row in self._read_rows(self.partial_file):
+                self._keys.add(self._row_key(row))
+                self.rows_written += 1
+            logger.info(f"Resuming {self.partial_file} with {self.rows_written} existing records")
+        self._file = open(self.partial_file, 'a' if appending else 'w', encoding='utf-8', newline='')
+        self._open(appending)
+
+    def _open(self, appending):
+        pass
+
+    def _read_rows(self, path):
+        raise NotImplementedError
+
+    def _write_row(self, row):
+        raise NotImplementedError
+
+    def _row_key(self, row):
+        if row.get('place_id'):
+            key = row['place_id']
+        else:
+            # Compared as text: rows read back from a CSV partial file are all strings
+            key = (str(row['name']).strip(), str(row['address']).strip())
+        return (key, row.get('search_term')) if self.per_search else key
+
+    def write(self, record):
+        """
+        Clean and append one record
+
+        Returns:
+            True if the row was written, False if it was dropped as
+            incomplete or duplicate
+        """
+        if any(record.get(column) in (None, '') for column in REQUIRED_COLUMNS):
+            self.rows_dropped += 1
+            return False
+
+        row = {column: record.get(column) for column in OUTPUT_COLUMNS}
+        key = self._row_key(row)
+        if key in self._keys:
+            self.rows_dropped += 1
+            return False
+        self._keys.add(key)
+
+        self._write_row(row)
+        self.rows_written += 1
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+        return True
+
+    def flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        if self.on_flush:
+            self.on_flush()
+
+    def close(self):
+        """Finalize the output: flush, back up the old file and swap in the new one"""
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+        if self.output_file.exists():
+            os.replace(self.output_file, f"{self.output_file}.backup")
+        os.replace(self.partial_file, self.output_file)
+        logger.info(
+            f"Successfully saved {self.rows_written} records to {self.output_file} "
+            f"({self.rows_dropped} incomplete or duplicate rows dropped)"
+        )
+
+    def discard(self):
+        """Drop the partial file and leave any existing output untouched"""
+        if not self._file.closed:
+            self._file.close()
+        self.partial_file.unlink(missing_ok=True)
+
+    def abort(self):
+        """Stop writing but leave the partial file for inspection or recovery"""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+            logger.warning(f"Output left unfinalized in {self.partial_file} ({self.rows_written} records)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class CsvSink(StreamingSink):
+    def _open(self, appending):
+        fieldnames = OUTPUT_COLUMNS
+        if appending:
+            # Keep the header of a partial file written with other columns
+            with open(self.partial_file, encoding='utf-8', newline='') as f:
+                fieldnames = next(csv.reader(f), None) or OUTPUT_COLUMNS
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames, extrasaction='ignore')
+        if not appending:
+            self._writer.writeheader()
+
+    def _read_rows(self, path):
+        with open(path, encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                yield {column: row.get(column) or None for column in OUTPUT_COLUMNS}
+
+    def _write_row(self, row):
+        self._writer.writerow(row)
+
+
+class JsonlSink(StreamingSink):
+    def _read_rows(self, path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def _write_row(self, row):
+        self._file.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+def make_sink(output_file, flush_every=SINK_FLUSH_EVERY, resume=False, on_flush=None, per_search=False):
+    """
+    Pick the sink from the output file extension: .jsonl, .csv, or the
+    accumulating stores in storage.py (.db/.sqlite, .parquet). "es:<index>"
+    streams into Elasticsearch. per_search applies to .jsonl and .csv.
+    """
+    if str(output_file).startswith('es:'):
+        from elasticsearch_sink import ElasticsearchSink
+        return ElasticsearchSink(str(output_file)[3:] or ELASTICSEARCH_INDEX, on_flush=on_flush)
+    suffix = Path(output_file).suffix.lower()
+    if suffix in ('.db', '.sqlite', '.sqlite3'):
+        from storage import SqliteStore
+        return SqliteStore(output_file, flush_every, on_flush)
+    if suffix == '.parquet':
+        from storage import ParquetStore
+        return ParquetStore(output_file, flush_every, on_flush)
+    if suffix in ('.jsonl', '.ndjson'):
+        return JsonlSink(output_file, flush_every, resume, on_flush, per_search)
+    return CsvSink(output_file, flush_every, resume, on_flush, per_search)
@@ -0,0 +1,197 @@
+"""
+Detail-pane HTML snapshots parsed off the browser's critical path
+
+In snapshot mode the browser only clicks a business, waits for the pane and
+fetches the page HTML once. Parsing runs in a ProcessPoolExecutor of lxml
+parsers that apply the same registry-ordered selector table and value
+picking as extraction.py. Snapshots can
+be saved to SNAPSHOT_DIR and re-parsed offline when selectors change:
+
+    python snapshots.py snapshots/ --output reparsed.csv
+"""
+import argparse
+import json
+import logging
+import multiprocessing as mp
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from pathlib import Path
+from urllib.parse import urljoin
+
+from config import PARSER_WORKERS, SNAPSHOT_DIR, SAVE_HTML
+from extraction import build_selector_table, pick_field_value, selector_hits
+from place_identity import place_id_from_href
+from selector_stats import get_registry
+
+logger = logging.getLogger(__name__)
+
+# Page URL and HTML in one round-trip; the whole document is captured because
+# the live extraction queries the whole document too
+SNAPSHOT_JS = "return [location.href, document.documentElement.outerHTML];"
+
+_compiled = {}
+
+
+def _selector(css):
+    from lxml.cssselect import CSSSelector
+    if css not in _compiled:
+        _compiled[css] = CSSSelector(css)
+    return _compiled[css]
+
+
+def parse_snapshot(html, url=None, table=None):
+    """
+    Extract business fields from a page snapshot
+
+    Args:
+        html: Page HTML
+        url: Page URL, used for the place ID and to resolve relative links
+        table: Selector table from extraction.build_selector_table (built
+            in the parent, in registry order); defaults to the static order
+
+    Returns:
+        (record, hits) where hits lists (field, selector, hit) for
+        SelectorRegistry.record
+    """
+    import lxml.html
+
+    tree = lxml.html.fromstring(html)
+    table = table or build_selector_table()
+    record = {}
+    hits = []
+
+    for field, spec in table.items():
+        selectors, attribute = spec['selectors'], spec['attribute']
+        raw_values = {}
+        for css in selectors:
+            matches = _selector(css)(tree)
+            if not matches:
+                raw_values[css] = None
+            elif attribute:
+                value = matches[0].get(attribute)
+                raw_values[css] = urljoin(url or '', value) if value is not None else None
+            else:
+                raw_values[css] = matches[0].text_content()
+        hits.extend(selector_hits(field, selectors, raw_values))
+        record[field] = pick_field_value(field, selectors, raw_values)
+
+    record['location'] = url
+    record['place_id'] = place_id_from_href(url)
+    return record, hits
+
+
+def _snapshot_path(save_dir, snapshot):
+    key = snapshot.get('place_id') or f"snapshot-{int(time.time() * 1000)}"
+    filename = re.sub(r'[^\w.-]', '_', key)
+    return Path(save_dir) / f"{filename}.html"
+
+
+def save_snapshot(save_dir, snapshot):
+    """Write a snapshot with its metadata on the first line as an HTML comment"""
+    Path(save_dir).mkdir(parents=True, exist_ok=True)
+    meta = {key: value for key, value in snapshot.items() if key != 'html'}
+    path = _snapshot_path(save_dir, snapshot)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"<!-- {json.dumps(meta)} -->\n")
+        f.write(snapshot['html'])
+    return path
+
+
+def load_snapshot(path):
+    with open(path, encoding='utf-8') as f:
+        first_line = f.readline()
+        html = f.read()
+    match = re.match(r'<!-- (.*) -->$', first_line.strip())
+    if not match:
+        return {'html': first_line + html}
+    snapshot = json.loads(match.group(1))
+    snapshot['html'] = html
+    return snapshot
+
+
+def parse_snapshot_job(snapshot, save_dir=None, table=None):
+    """Process-pool entry point: optionally save the snapshot, then parse it"""
+    if save_dir:
+        save_snapshot(save_dir, snapshot)
+    record, hits = parse_snapshot(snapshot['html'], snapshot.get('url'), table)
+    if not record.get('place_id'):
+        record['place_id'] = snapshot.get('place_id')
+    return record, hits
+
+
+class SnapshotParserPool:
+    """
+    Process pool that turns captured snapshots into business records
+
+    submit() returns immediately; drain() hands back finished records in the
+    calling thread, so sinks and checkpoints never see another thread. With a
+    registry, each snapshot is parsed in the selector order it had at submit.
+    """
+
+    def __init__(self, workers=PARSER_WORKERS, save_dir=None, registry=None):
+        self.save_dir = save_dir
+        self.registry = registry
+        self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn'))
+        self._futures = set()
+
+    @property
+    def pending(self):
+        return len(self._futures)
+
+    def submit(self, snapshot):
+        table = build_selector_table(registry=self.registry)
+        self._futures.add(self._executor.submit(parse_snapshot_job, snapshot, self.save_dir, table))
+
+    def drain(self, wait=False):
+        """
+        Yield (record, selector_hits) for finished parses
+
+        Args:
+            wait: Block until every submitted snapshot has been parsed
+        """
+        done = list(as_completed(self._futures)) if wait else [f for f in self._futures if f.done()]
+        for future in done:
+            self._futures.discard(future)
+            try:
+                yield future.result()
+            except Exception as e:
+                logger.warning(f"Error parsing snapshot: {str(e)}")
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+_pool = None
+
+
+def get_parser_pool():
+    """Process-wide parser pool, created on first use"""
+    global _pool
+    if _pool is None:
+        _pool = SnapshotParserPool(save_dir=SNAPSHOT_DIR if SAVE_HTML else None, registry=get_registry())
+    return _pool
+
+
+def reparse(snapshot_dir, output_file, workers=PARSER_WORKERS):
+    """Re-parse saved snapshots with the current selector table"""
+    from sinks import make_sink
+
+    paths = sorted(Path(snapshot_dir).glob('*.html'))
+    job = partial(parse_snapshot_job, table=build_selector_table(registry=get_registry()))
+    with ProcessPoolExecutor(max_workers=workers) as executor, make_sink(output_file) as sink:
+        snapshots = (load_snapshot(path) for path in paths)
+        for record, _ in executor.map(job, snapshots, chunksize=16):
+            sink.write(record)
+    logger.info(f"Re-parsed {len(paths)} snapshots from {snapshot_dir}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Re-parse saved detail-pane snapshots")
+    parser.add_argument('snapshot_dir', nargs='?', default=SNAPSHOT_DIR)
+    parser.add_argument('--output', default="reparsed_businesses.csv")
+    parser.add_argument('--workers', type=int, default=PARSER_WORKERS)
+    args = parser.parse_args()
+    reparse(args.snapshot_dir, args.output, args.workers)
@@ -0,0 +1,287 @@
+"""
+Accumulating storage backends for scraped businesses
+
+Unlike the CSV/JSONL sinks, which rewrite one output file per run, these
+backends keep data across runs:
+
+    SqliteStore   upserts by place ID into an indexed table, so repeat runs
+                  update rows in place and filtered queries use indexes
+    ParquetStore  appends batches to a Hive-partitioned Parquet dataset
+                  (search_location=.../scrape_date=...) for analytics
+
+Both implement the sink interface (write/flush/close/discard/abort) and are
+picked by make_sink from the output path: .db/.sqlite for SQLite, .parquet
+for a Parquet dataset directory.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from config import SINK_FLUSH_EVERY
+from sinks import OUTPUT_COLUMNS, REQUIRED_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Columns stored next to OUTPUT_COLUMNS: when the record was seen
+STORE_COLUMNS = OUTPUT_COLUMNS + ['scraped_at']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS businesses (
+    place_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT,
+    rating REAL,
+    reviews_count INTEGER,
+    address TEXT,
+    phone TEXT,
+    website TEXT,
+    location TEXT,
+    price_level INTEGER,
+    hours TEXT,
+    search_term TEXT,
+    search_location TEXT,
+    first_seen REAL NOT NULL,
+    scraped_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS businesses_category ON businesses (category);
+CREATE INDEX IF NOT EXISTS businesses_rating ON businesses (rating);
+CREATE INDEX IF NOT EXISTS businesses_search_location ON businesses (search_location, rating);
+"""
+
+# Columns refreshed on upsert; a value missing from the new record keeps the stored one
+_UPDATE_COLUMNS = [column for column in STORE_COLUMNS if column != 'place_id']
+
+
+def _place_key(row):
+    """Place ID, or a stable stand-in for records without one"""
+    if row.get('place_id'):
+        return row['place_id']
+    digest = hashlib.sha1(f"{row.get('name')}|{row.get('address')}".encode('utf-8')).hexdigest()
+    return f"row:{digest[:16]}"
+
+
+class BatchedStore:
+    """
+    Base for storage backends: validates records and writes them in batches
+
+    Subclasses implement _write_batch(rows). Batches are written every
+    flush_every records and on flush()/close(); on_flush runs after each one.
+    """
+
+    def __init__(self, path, flush_every=SINK_FLUSH_EVERY, on_flush=None):
+        self.path = Path(path)
+        self.flush_every = max(1, flush_every)
+        self.on_flush = on_flush
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self._batch = []
+        self._keys = set()
+        self._closed = False
+
+    def _write_batch(self, rows):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+    def write(self, record):
+        """
+        Queue one record for the next batch
+
+        Returns:
+            True if the row was accepted, False if it was dropped as
+            incomplete or already written in this run
+        """
+        if any(record.get(column) in (None, '') for column in REQUIRED_COLUMNS):
+            self.rows_dropped += 1
+            return False
+
+        row = {column: record.get(column) for column in STORE_COLUMNS}
+        row['place_id'] = _place_key(row)
+        if row['place_id'] in self._keys:
+            self.rows_dropped += 1
+            return False
+        self._keys.add(row['place_id'])
+        row['scraped_at'] = row['scraped_at'] or time.time()
+
+        self._queue(row)
+        self.rows_written += 1
+        if self._batch_full():
+            self.flush()
+        return True
+
+    def _queue(self, row):
+        self._batch.append(row)
+
+    def _batch_full(self):
+        return len(self._batch) >= self.flush_every
+
+    def flush(self):
+        if self._batch:
+            self._write_batch(self._batch)
+            self._batch = []
+        if self.on_flush:
+            self.on_flush()
+
+    def close(self):
+        if self._closed:
+            return
+        self.flush()
+        self._close()
+        self._closed = True
+        logger.info(
+            f"Successfully stored {self.rows_written} records in {self.path} "
+            f"({self.rows_dropped} incomplete or duplicate rows dropped)"
+        )
+
+    def discard(self):
+        """Drop records not yet written; earlier batches stay stored"""
+        self._batch = []
+        if not self._closed:
+            self._close()
+            self._closed = True
+
+    def abort(self):
+        """Store what has been queued so far and stop"""
+        if not self._closed:
+            self.flush()
+            self._close()
+            self._closed = True
+            logger.warning(f"Storage to {self.path} stopped early ({self.rows_written} records)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class SqliteStore(BatchedStore):
+    """Upsert records into an indexed SQLite table keyed by place ID"""
+
+    def __init__(self, path, flush_every=SINK_FLUSH_EVERY, on_flush=None):
+        super().__init__(path, flush_every, on_flush)
+        self._conn = sqlite3.connect(str(self.path), timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = ', '.join(STORE_COLUMNS + ['first_seen'])
+        placeholders = ', '.join(f":{column}" for column in STORE_COLUMNS + ['first_seen'])
+        updates = ', '.join(
+            f"{column} = COALESCE(excluded.{column}, {column})" for column in _UPDATE_COLUMNS
+        )
+        self._upsert = (
+            f"INSERT INTO businesses ({columns}) VALUES ({placeholders}) "
+            f"ON CONFLICT (place_id) DO UPDATE SET {updates}"
+        )
+
+    def _write_batch(self, rows):
+        with self._conn:
+            self._conn.executemany(self._upsert, [dict(row, first_seen=row['scraped_at']) for row in rows])
+
+    def _close(self):
+        self._conn.close()
+
+
+def query_businesses(path, search_location=None, category=None, min_rating=None, without_website=False):
+    """
+    Filter a SQLite store; search_location, category and min_rating are
+    answered from indexes
+
+    Returns:
+        List of row dicts, best rated first
+    """
+    clauses, params = [], []
+    if search_location is not None:
+        clauses.append("search_location = ?")
+        params.append(search_location)
+    if category is not None:
+        clauses.append("category = ?")
+        params.append(category)
+    if min_rating is not None:
+        clauses.append("rating >= ?")
+        params.append(min_rating)
+    if without_website:
+        clauses.append("website IS NULL")
+    sql = "SELECT * FROM businesses"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY rating DESC"
+
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        return [dict(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+# Parquet column types; fixed so every part file has the same schema
+_PARQUET_TYPES = {
+    'rating': 'float64',
+    'reviews_count': 'int64',
+    'price_level': 'int64',
+    'scraped_at': 'float64',
+}
+
+
+def _parquet_schema():
+    import pyarrow as pa
+    return pa.schema([
+        (column, getattr(pa, _PARQUET_TYPES.get(column, 'string'))())
+        for column in STORE_COLUMNS if column != 'search_location'
+    ])
+
+
+def _partition_value(value):
+    text = str(value or 'unknown').strip()
+    return ''.join(c if c.isalnum() or c in '-_' else '_' for c in text) or 'unknown'
+
+
+class ParquetStore(BatchedStore):
+    """
+    Append batches to a partitioned Parquet dataset
+
+    Every flush writes one new file per partition, so accumulating runs
+    never rewrites existing data. Readers such as pandas.read_parquet or
+    pyarrow.dataset see search_location and scrape_date as columns. Needs
+    pyarrow.
+    """
+
+    def __init__(self, path, flush_every=SINK_FLUSH_EVERY, on_flush=None):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("The Parquet backend needs pyarrow: pip install pyarrow")
+        super().__init__(path, flush_every, on_flush)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._schema = _parquet_schema()
+        self._parts = 0
+
+    def _write_batch(self, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        partitions = {}
+        for row in rows:
+            scrape_date = datetime.fromtimestamp(row['scraped_at'], timezone.utc).strftime('%Y-%m-%d')
+            key = (_partition_value(row['search_location']), scrape_date)
+            partitions.setdefault(key, []).append(
+                {column: row[column] for column in STORE_COLUMNS if column != 'search_location'}
+            )
+
+        for (search_location, scrape_date), partition_rows in partitions.items():
+            directory = self.path / f"search_location={search_location}" / f"scrape_date={scrape_date}"
+            directory.mkdir(parents=True, exist_ok=True)
+            self._parts += 1
+            filename = f"part-{int(time.time() * 1000)}-{os.getpid()}-{self._parts}.parquet"
+            tmp_path = directory / f".{filename}.tmp"
+            pq.write_table(pa.Table.from_pylist(partition_rows, schema=self._schema), tmp_path)
+            os.replace(tmp_path, directory / filename)
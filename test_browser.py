@@ -5,7 +5,8 @@ def test_browser():
     driver = None
     try:
         print("Creating browser...")
-        driver = create_driver()
+        # No persistent profile, so the test leaves nothing behind
+        driver = create_driver(user_data_root=None)
         print("Browser created successfully")
         
         print("Testing navigation...")
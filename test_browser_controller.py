@@ -0,0 +1,74 @@
+import json
+import os
+
+import webdriver_manager.chrome
+
+from browser_controller import PageStats, claim_user_data_dir, record_page_load, resolve_driver_path
+
+
+class LogDriver:
+    def __init__(self, sizes):
+        self.entries = [
+            {'message': json.dumps({'message': {'method': 'Network.loadingFinished',
+                                                'params': {'encodedDataLength': size}}})}
+            for size in sizes
+        ]
+        self.entries.append({'message': json.dumps({'message': {'method': 'Network.requestWillBeSent',
+                                                                'params': {}}})})
+        self.page_stats = PageStats()
+
+    def get_log(self, log_type):
+        entries, self.entries = self.entries, []
+        return entries
+
+
+def test_page_stats_counts_bytes_per_page():
+    driver = LogDriver([1000, 2048])
+    record_page_load(driver, 'search', 1.5)
+    driver.entries = LogDriver([512]).entries
+    record_page_load(driver, 'detail', 0.5)
+
+    stats = driver.page_stats
+    assert stats.pages == 2 and stats.total_bytes == 3560
+    assert stats.by_kind['search'] == (1, 3048, 1.5)
+    assert stats.by_kind['detail'] == (1, 512, 0.5)
+
+    # Drivers without stats (fakes, other browsers) are ignored
+    record_page_load(object(), 'detail', 1.0)
+
+
+def test_driver_path_is_cached_per_version_pin(tmp_path, monkeypatch):
+    binary = tmp_path / "chromedriver"
+    binary.write_text("")
+    os.chmod(binary, 0o755)
+    lookups = []
+
+    class Manager:
+        def __init__(self, driver_version=None):
+            lookups.append(driver_version)
+
+        def install(self):
+            return str(binary)
+
+    monkeypatch.setattr(webdriver_manager.chrome, 'ChromeDriverManager', Manager)
+    cache_file = str(tmp_path / "chromedriver_path.json")
+    assert resolve_driver_path(None, cache_file) == str(binary)
+    assert resolve_driver_path(None, cache_file) == str(binary)
+    assert lookups == [None]
+    # A new pin or a refresh looks the driver up again
+    resolve_driver_path("120.0.6099.109", cache_file)
+    resolve_driver_path("120.0.6099.109", cache_file, refresh=True)
+    assert lookups == [None, "120.0.6099.109", "120.0.6099.109"]
+
+
+def test_user_data_dirs_are_not_shared(tmp_path):
+    first, first_lock = claim_user_data_dir(tmp_path)
+    second, second_lock = claim_user_data_dir(tmp_path)
+    assert first.endswith("slot-1") and second.endswith("slot-2")
+    first_lock.close()
+    # A released slot is reused, keeping its cache
+    third, third_lock = claim_user_data_dir(tmp_path)
+    assert third == first
+    second_lock.close()
+    third_lock.close()
+    assert claim_user_data_dir(None) == (None, None)
@@ -0,0 +1,31 @@
+from checkpoint import Checkpoint, load_job_state
+from sinks import make_sink
+
+
+def test_checkpoint_resume(tmp_path):
+    path = tmp_path / "checkpoint.db"
+    output = tmp_path / "out.csv"
+    job = ("Nairobi, Kenya", "cafes")
+
+    checkpoint = Checkpoint(path)
+    sink = make_sink(output, flush_every=2, on_flush=checkpoint.flush)
+    for place_id in ("a", "b", "c"):
+        sink.write({'name': place_id, 'address': "Moi Avenue", 'place_id': place_id})
+        checkpoint.add_place(job, place_id)
+    checkpoint.set_scroll_depth(job, 3)
+
+    # Simulated crash: only places flushed to the output are in the checkpoint
+    seen, depth = load_job_state(path, job)
+    assert seen == {"a"} and depth == 3
+    sink.abort()
+    checkpoint.close()
+
+    checkpoint = Checkpoint(path)
+    assert checkpoint.completed_jobs() == set()
+    sink = make_sink(output, resume=True, on_flush=checkpoint.flush)
+    assert sink.rows_written == 3
+    assert not sink.write({'name': "c", 'address': "Moi Avenue", 'place_id': "c"})
+    checkpoint.mark_done(job)
+    sink.close()
+    assert checkpoint.completed_jobs() == {job}
+    assert len(output.read_text().splitlines()) == 4
@@ -0,0 +1,46 @@
+from browser_controller import PageStats
+from driver_manager import DriverManager, process_tree_rss
+
+
+class FakeDriver:
+    created = 0
+
+    def __init__(self):
+        FakeDriver.created += 1
+        self.alive = True
+        self.quit_called = False
+        self.page_stats = PageStats()
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("invalid session id")
+        return 1
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_dead_and_worn_out_sessions_are_replaced():
+    manager = DriverManager(FakeDriver, max_pages=10, max_rss_mb=None)
+    first = manager.start()
+    assert manager.check() is first
+    # Attribute access goes to the current session
+    assert manager.execute_script("return 1") == 1
+
+    first.alive = False
+    manager.recover()
+    second = manager.driver
+    assert second is not first and first.quit_called
+
+    second.page_stats.pages = 10
+    third = manager.check()
+    assert third is not second
+    assert dict(manager.restarts) == {'dead': 1, 'pages': 1}
+    manager.quit()
+    assert third.quit_called and manager.driver is None
+
+
+def test_process_tree_rss_of_current_process():
+    import os
+    rss = process_tree_rss(os.getpid())
+    assert rss is None or rss > 0
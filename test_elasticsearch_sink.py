@@ -0,0 +1,114 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from elasticsearch_sink import BulkRequestError, ElasticsearchSink
+from storage import STORE_COLUMNS
+
+
+class BulkStub(BaseHTTPRequestHandler):
+    """Minimal _bulk endpoint: rejects each document with 429 the first time it is seen"""
+    requests = []
+    documents = {}
+    rejected = set()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8')
+        lines = body.splitlines()
+        self.requests.append((self.path, len(lines) // 2))
+        items = []
+        for action, source in zip(lines[::2], lines[1::2]):
+            meta = json.loads(action)['index']
+            if meta['_id'] not in self.rejected:
+                self.rejected.add(meta['_id'])
+                items.append({'index': {'_id': meta['_id'], 'status': 429, 'error': 'es_rejected_execution_exception'}})
+            else:
+                self.documents[meta['_id']] = json.loads(source)
+                items.append({'index': {'_id': meta['_id'], 'status': 201}})
+        payload = json.dumps({'errors': True, 'items': items}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class FailingBulkStub(BaseHTTPRequestHandler):
+    """A cluster that answers every _bulk request with HTTP 500"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(500)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def test_bulk_sink_batches_and_retries(monkeypatch):
+    monkeypatch.setattr('elasticsearch_sink.time.sleep', lambda seconds: None)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), BulkStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    flushes = []
+    try:
+        sink = ElasticsearchSink(
+            "businesses", hosts=[f"http://127.0.0.1:{server.server_port}"], max_docs=3,
+            max_in_flight=1, on_flush=lambda: flushes.append(1)
+        )
+        for n in range(5):
+            sink.write({'name': f"Cafe {n}", 'address': "Moi Avenue", 'place_id': f"0x{n}:0x{n}"})
+        sink.write({'name': "Cafe 0", 'address': "Moi Avenue", 'place_id': "0x0:0x0"})
+        sink.close()
+    finally:
+        server.shutdown()
+
+    # Two batches (3 + 2 documents), each retried once for its rejected documents
+    assert [path for path, _ in BulkStub.requests] == ["/_bulk"] * 4
+    assert sorted(count for _, count in BulkStub.requests) == [2, 2, 3, 3]
+    assert sorted(BulkStub.documents) == [f"0x{n}:0x{n}" for n in range(5)]
+    assert BulkStub.documents["0x1:0x1"]['name'] == "Cafe 1"
+    assert sink.docs_indexed == 5 and sink.docs_failed == 0
+    assert flushes == [1]
+
+
+def test_batches_split_by_bytes():
+    sink = ElasticsearchSink("businesses", hosts=["http://127.0.0.1:9"])
+    sent = []
+    sink._in_flight.put = sent.append
+    records = [{'name': f"Cafe {n}", 'address': "Moi Avenue " * 10, 'place_id': f"p{n}"} for n in range(4)]
+    # Room for two documents per request
+    row = {column: dict(records[0], scraped_at=1e9).get(column) for column in STORE_COLUMNS}
+    sink.max_bytes = 2 * len(sink._encode(row)) + 10
+    for record in records:
+        sink.write(dict(record, scraped_at=1e9))
+    sink._send()
+    assert [len(batch) for batch in sent] == [2, 2]
+    assert all(sum(map(len, batch)) <= sink.max_bytes for batch in sent)
+
+
+def test_failed_batches_skip_on_flush(monkeypatch):
+    monkeypatch.setattr('elasticsearch_sink.time.sleep', lambda seconds: None)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FailingBulkStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    flushes = []
+    try:
+        sink = ElasticsearchSink(
+            "businesses", hosts=[f"http://127.0.0.1:{server.server_port}"], max_docs=2,
+            on_flush=lambda: flushes.append(1)
+        )
+        for n in range(3):
+            sink.write({'name': f"Cafe {n}", 'address': "Moi Avenue", 'place_id': f"0x{n}:0x{n}"})
+        with pytest.raises(BulkRequestError):
+            sink.flush()
+        sink.discard()
+    finally:
+        server.shutdown()
+
+    assert sink.docs_failed == 3 and sink.docs_indexed == 0
+    assert flushes == []
@@ -0,0 +1,61 @@
+from entity_resolution import (
+    cluster, coordinates, geohash, normalize_address, normalize_phone, resolve, resolve_output
+)
+from sinks import CsvSink
+
+URL = "https://www.google.com/maps/place/{name}/@-1.2630,36.8030,17z/data=!3d{lat}!4d36.80310?q={term}"
+
+
+def test_normalization():
+    assert normalize_phone("0712 345 678") == normalize_phone("+254 712 345678") == "254712345678"
+    assert normalize_phone("n/a") == ""
+    assert normalize_address("Sarit Centre, Karuna Rd.") == "sarit centre karuna road"
+    assert coordinates(URL.format(name="X", lat="-1.26301", term="bars")) == (-1.26301, 36.8031)
+    assert geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+
+def test_resolve_merges_across_search_terms():
+    records = [
+        {'name': "Java House - Sarit Centre", 'phone': "0709 123456", 'address': "Karuna Rd",
+         'rating': 4.3, 'reviews_count': 1204, 'website': None, 'search_term': "cafes",
+         'location': URL.format(name="Java+House", lat="-1.26301", term="cafes")},
+        {'name': "JAVA HOUSE", 'phone': "+254 709 123456", 'address': "Karuna Road",
+         'rating': 4.2, 'reviews_count': 900, 'website': "https://javahouseafrica.com/",
+         'search_term': "restaurants", 'location': URL.format(name="Java+House", lat="-1.26302", term="restaurants")},
+        # No phone: matched on location and name
+        {'name': "Java House", 'phone': None, 'address': None, 'rating': None, 'reviews_count': 0,
+         'search_term': "bars", 'location': URL.format(name="Java+House", lat="-1.26303", term="bars")},
+        # Same building, different business and phone
+        {'name': "Java Hut", 'phone': "0722 000000", 'address': "Karuna Rd", 'search_term': "cafes",
+         'location': URL.format(name="Java+Hut", lat="-1.26301", term="cafes")},
+    ]
+    clusters, stats = cluster(records)
+    assert sorted(map(sorted, clusters)) == [[0, 1, 2], [3]]
+    assert stats['merges'] == 2
+
+    merged = resolve(records)[0]
+    assert merged['duplicates'] == 2
+    assert merged['website'] == "https://javahouseafrica.com/"
+    assert (merged['rating'], merged['reviews_count']) == (4.3, 1204)
+    assert merged['search_term'] == "bars|cafes|restaurants"
+
+
+def test_label_keys_need_a_second_signal():
+    records = [
+        {'name': "KFC", 'place_id': "label:kfc", 'phone': "0711 111111", 'address': "Moi Avenue"},
+        {'name': "KFC", 'place_id': "label:kfc", 'phone': "0722 222222", 'address': "Ngong Road"},
+        {'name': "KFC", 'place_id': "label:kfc", 'phone': "+254 711 111111", 'address': None},
+    ]
+    clusters, _ = cluster(records)
+    assert sorted(map(sorted, clusters)) == [[0, 2], [1]]
+
+
+def test_resolve_output_joins_search_terms(tmp_path):
+    output = tmp_path / "businesses.csv"
+    with CsvSink(output) as sink:
+        for term in ("cafes", "restaurants"):
+            sink.write({'name': "Java House", 'address': "Karuna Rd", 'place_id': f"0x1:0x{len(term)}",
+                        'phone': "0709 123456", 'search_term': term, 'search_location': "Nairobi, Kenya"})
+    resolved = resolve_output(output, tmp_path / "resolved.csv")
+    assert len(resolved) == 1 and resolved[0]['search_term'] == "cafes|restaurants"
+    assert resolved[0]['search_location'] == "Nairobi, Kenya"
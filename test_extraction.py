@@ -0,0 +1,68 @@
+from extraction import FIELD_SELECTORS, build_selector_table, extract_fields, pick_field_value
+from fake_maps import FakeMapsDriver
+from scraper import extract_fields_individually
+from selector_stats import SelectorRegistry
+
+PLACE = {
+    'name': "Java House Westlands", 'rating': 4.3, 'reviews_count': 1204, 'category': "Coffee shop",
+    'price_level': 2, 'address': "Sarit Centre, Karuna Rd, Nairobi", 'phone': "+254 709 123456",
+    'website': "https://javahouseafrica.com/", 'hours': "Open · Closes 10 pm",
+    'feature_id': "0x182f1:0x1", 'lat': -1.26, 'lng': 36.80,
+}
+
+
+def open_pane(place):
+    driver = FakeMapsDriver([place])
+    driver.get("https://www.google.com/maps/search/cafes")
+    driver.find_elements(None, 'a.hfpxzc')[0].click()
+    return driver
+
+
+def test_batched_extraction_uses_fallback_selectors():
+    driver = open_pane(PLACE)
+    registry = SelectorRegistry()
+    business = extract_fields(driver, registry=registry)
+
+    assert business == {field: PLACE[field] for field in FIELD_SELECTORS}
+    assert driver.calls['extract_fields'] == 1 and driver.calls['find_element'] == 0
+    # The pane has no h1[data-attrid="title"], so the name comes from the next selector
+    assert registry.stats['name']['h1[data-attrid="title"]'] == [0, 1]
+    assert registry.stats['name']['.DUwDvf.fontHeadlineSmall'] == [1, 0]
+    assert extract_fields_individually(open_pane(PLACE)) == business
+
+
+def test_missing_fields_get_defaults():
+    place = dict(PLACE, reviews_count=None, phone=None, website=None)
+    business = extract_fields(open_pane(place))
+
+    assert business['reviews_count'] == 0 and business['phone'] is None and business['website'] is None
+    assert business['name'] == PLACE['name']
+    assert extract_fields_individually(open_pane(place)) == business
+
+
+def test_pick_field_value_follows_the_table_order():
+    registry = SelectorRegistry()
+    for _ in range(5):
+        registry.record('rating', '.ceNzKf', True)
+        registry.record('rating', '.MW4etd', False)
+    selectors = build_selector_table(['rating'], registry)['rating']['selectors']
+    assert selectors[0] == '.ceNzKf'
+    raw_values = {'.MW4etd': "4.5", '.ceNzKf': "no rating"}
+    assert pick_field_value('rating', selectors, raw_values) == 4.5
+    assert pick_field_value('reviews_count', FIELD_SELECTORS['reviews_count'], {}) == 0
+
+
+def test_generic_fallback_cannot_overtake_the_specific_selector():
+    registry = SelectorRegistry()
+    # The generic link selector matches on every pane, the authority link on all but one
+    bare_link = dict(PLACE, website="https://bare.example/", detail_html=(
+        '<html><body><div role="main" aria-label="Bare"><h1 class="DUwDvf fontHeadlineSmall">Bare</h1>'
+        '<a href="https://bare.example/">bare.example</a></div></body></html>'
+    ))
+    for place in [PLACE] * 9 + [bare_link]:
+        assert extract_fields(open_pane(place), registry=registry)['website'] == place['website']
+
+    specific, generic = FIELD_SELECTORS['website'][:2]
+    assert registry.stats['website'][specific] == [9, 1]
+    assert registry.stats['website'][generic] == [1, 0]
+    assert registry.ordered('website', FIELD_SELECTORS['website'])[0] == specific
@@ -0,0 +1,109 @@
+import time
+
+import scraper
+from extraction import extract_fields
+from fake_maps import FakeMapsDriver, make_places
+from listing import CardFilter
+from place_cache import PlaceCache
+from rate_control import RateController
+from scraper import scrape_google_maps
+from waits import wait_for_detail_pane
+
+
+def test_detail_mode_against_fake_driver():
+    places = make_places(45, missing_rate=0.3)
+    driver = FakeMapsDriver(places)
+    businesses = scrape_google_maps(driver, "restaurants", "Nairobi", max_results=30)
+
+    assert len(businesses) == 30
+    assert driver.calls['extract_fields'] == 30 and driver.calls['click'] == 30
+    for business, place in zip(businesses, places):
+        assert business['name'] == place['name']
+        assert business['rating'] == place['rating']
+        assert business['website'] == place['website']
+        assert business['place_id'] == place['feature_id']
+    driver.finish()
+    assert len(driver.spans['open']) == 30
+
+
+def test_listing_mode_and_end_of_feed():
+    places = make_places(25)
+    driver = FakeMapsDriver(places, page_size=10)
+    started = time.time()
+    businesses = scrape_google_maps(driver, "restaurants", "Nairobi", max_results=100, mode='listing')
+
+    assert [business['name'] for business in businesses] == [place['name'] for place in places]
+    assert driver.calls['click'] == 0
+    # Each card is read once and the end-of-list marker stops the loop without a timeout
+    assert driver.calls['read_cards'] == 3 and driver.calls['scroll'] == 2
+    assert time.time() - started < scraper.FEED_GROWTH_TIMEOUT
+
+
+def test_pushdown_skips_clicks(monkeypatch):
+    monkeypatch.setattr(scraper, 'FEED_GROWTH_TIMEOUT', 0.01)
+    places = make_places(20, missing_rate=0.0)
+    driver = FakeMapsDriver(places)
+    card_filter = CardFilter(min_rating=4.0)
+    businesses = scrape_google_maps(driver, "restaurants", "Nairobi", max_results=100, card_filter=card_filter)
+
+    expected = [place['name'] for place in places if place['rating'] >= 4.0]
+    assert [business['name'] for business in businesses] == expected
+    assert driver.calls['click'] == len(expected)
+    assert card_filter.clicks_saved == len(places) - len(expected)
+    # Tile splitting looks at every card the search returned, not the records kept
+    assert businesses.cards_seen == len(places)
+
+
+def test_pushdown_results_are_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(scraper, 'FEED_GROWTH_TIMEOUT', 0.01)
+    places = make_places(20, missing_rate=0.0)
+    cache = PlaceCache(tmp_path / "cache.db")
+    first = scrape_google_maps(FakeMapsDriver(places), "restaurants", "Nairobi", max_results=100,
+                               card_filter=CardFilter(min_rating=4.0), place_cache=cache)
+
+    driver = FakeMapsDriver(places)
+    second = scrape_google_maps(driver, "restaurants", "Nairobi", max_results=100,
+                                card_filter=CardFilter(min_rating=4.0), place_cache=cache)
+    assert second == first and len(first) > 0
+    assert driver.calls['click'] == 0 and cache.metrics()['hits'] == len(first)
+    cache.close()
+
+
+def test_scroll_latency_excludes_the_batch():
+    places = make_places(40)
+    driver = FakeMapsDriver(places, pane_delay=0.02, page_size=10)
+    controller = RateController(initial_rate=100.0, max_rate=100.0, latency_target=0.1, burst=100)
+    businesses = scrape_google_maps(driver, "restaurants", "Nairobi", max_results=40, rate_controller=controller)
+
+    # Each batch of 10 clicks takes about 0.2s, but only the feed wait is a scroll's latency
+    assert len(businesses) == 40 and driver.calls['scroll'] == 3
+    assert controller.stats['slow'] == 0 and controller.rate == 100.0
+
+
+def test_stale_pane_with_a_similar_name_is_not_ready():
+    places = [dict(place, name=name) for place, name in zip(make_places(2), ["Java House", "Java House Westlands"])]
+    driver = FakeMapsDriver(places, pane_delay=0.05)
+    driver.get("https://www.google.com/maps/search/cafes")
+    first, second = driver.find_elements(None, 'a.hfpxzc')
+    first.click()
+    assert wait_for_detail_pane(driver, "Java House", None, 1)
+
+    second.click()
+    started = time.perf_counter()
+    # The pane still shows "Java House", which is a substring of the expected name
+    assert wait_for_detail_pane(driver, " java house  WESTLANDS", "Java House", 1)
+    assert 0.04 < time.perf_counter() - started < 0.5
+    assert extract_fields(driver)['name'] == "Java House Westlands"
+
+
+def test_detail_pane_wait_times_out():
+    places = make_places(2)
+    driver = FakeMapsDriver(places, pane_delay=0.5)
+    driver.get("https://www.google.com/maps/search/cafes")
+    started = time.perf_counter()
+    driver.find_elements(None, 'a.hfpxzc')[0].click()
+    assert not wait_for_detail_pane(driver, places[0]['name'], None, 0.1)
+    # A pane for a different business never satisfies the expected name
+    assert not wait_for_detail_pane(driver, places[1]['name'], None, 0.5)
+    assert 0.6 <= time.perf_counter() - started < 1.0
+    assert wait_for_detail_pane(driver, places[0]['name'], None, 0.1)
@@ -0,0 +1,60 @@
+from filtering import filter_frame, normalize_names
+from scraper import filter_businesses
+
+import pandas as pd
+
+
+def business(place_id, name, **fields):
+    record = {'name': name, 'place_id': place_id, 'category': "Restaurant", 'rating': 4.0,
+              'reviews_count': 10, 'website': None, 'price_level': 2}
+    record.update(fields)
+    return record
+
+
+RECORDS = [
+    business("a", "Java House - Sarit Centre", rating=4.6),
+    business("b", "Java House (Moi Avenue)"),
+    business("c", "JAVA HOUSE"),
+    business("d", "Mama Oliech Restaurant", rating=4.2, reviews_count=87),
+    business("e", "Café Deli", rating=None, reviews_count=500),
+    business("f", "Kilele Barbers", category="Barber shop"),
+    business("g", "Carnivore", price_level=4, reviews_count=900),
+    business("h", "Talisman", website="https://talisman.example"),
+    business("i", "Nyama Choma Spot", rating=3.0),
+    business("j", "Tiny Kiosk", reviews_count=1),
+]
+
+
+def test_matches_filter_businesses_loop():
+    looped = filter_businesses(RECORDS, min_rating=3.5, require_no_website=True, min_reviews=3)
+    framed = filter_frame(RECORDS, min_rating=3.5, require_no_website=True, min_reviews=3,
+                          business_types=None, max_price_level=None, exclude_chains=False, sort_by=None)
+    assert list(framed['place_id']) == [record['place_id'] for record in looped]
+
+
+def test_all_config_filters_and_sort():
+    result = filter_frame(RECORDS, min_rating=3.5, require_no_website=True, min_reviews=3,
+                          business_types=["restaurant", "hotel", "bar"], max_price_level=3,
+                          exclude_chains=True, sort_by="reviews")
+    # Chain branches, barber shop ("bar" is a whole word only), price 4,
+    # website, low rating and low reviews are all dropped
+    assert list(result['place_id']) == ["e", "d"]
+    by_rating = filter_frame(RECORDS, business_types=None, exclude_chains=False, sort_by="rating",
+                             min_reviews=0, max_price_level=None, require_no_website=False)
+    assert list(by_rating['place_id'])[:2] == ["a", "d"]
+
+
+def test_normalize_names():
+    names = pd.Series(["Java House - Sarit", "  JÄVA   house ", None, "KFC @ Moi Ave"])
+    assert list(normalize_names(names)) == ["java house", "java house", "", "kfc"]
+
+
+def test_matches_entity_resolution_and_leaves_the_input_frame_alone():
+    from entity_resolution import normalize_name
+
+    frame = pd.DataFrame(RECORDS).astype({'reviews_count': str})
+    before = frame.copy()
+    names = ["Java at Home", "Cat House", "Naivas | Westlands", "Dr. Ngugi's Clinic", "Ñandú  Grill", ""]
+    assert list(normalize_names(pd.Series(names))) == [normalize_name(name) for name in names]
+    filter_frame(frame, exclude_chains=True)
+    pd.testing.assert_frame_equal(frame, before)
@@ -0,0 +1,49 @@
+from geo_grid import GridPlanner, Tile, cover, parse_tile
+from worker_pool import run_worker_pool
+from test_worker_pool import fake_job, make_driver
+
+
+def test_cover_and_tile_urls():
+    tiles = cover("Nairobi, Kenya", -1.28638, 36.81724, radius_km=30, tile_km=8)
+    assert 40 < len(tiles) < 64  # 8 x 8 grid without the corners outside the circle
+    tile = parse_tile(str(tiles[0]))
+    assert tile.location == "Nairobi, Kenya" and tile.size_km == 8
+    assert abs(tile.lat - tiles[0].lat) < 1e-5
+    assert parse_tile("Nairobi, Kenya") is None
+
+    centre = Tile("Nairobi, Kenya", -1.28638, 36.81724, 8)
+    assert centre.zoom == 14
+    assert centre.search_url("coffee shops") == \
+        "https://www.google.com/maps/search/coffee%20shops/@-1.28638,36.81724,14z"
+
+
+def test_planner_splits_dense_tiles_and_resumes():
+    planner = GridPlanner(centers={"Town": (0.0, 36.0)}, radius_km=4, tile_km=8, min_tile_km=2,
+                          split_threshold=100)
+    jobs = planner.plan([("Town", "cafes"), ("Elsewhere", "cafes")])
+    assert len(jobs) == 2 and jobs[1] == ("Elsewhere", "cafes")
+
+    assert planner.split(jobs[0], 40) == []
+    children = planner.split(jobs[0], 100)
+    assert len(children) == 4 and {parse_tile(location).size_km for location, _ in children} == {4}
+    grandchildren = planner.split(children[0], 100)
+    assert len(grandchildren) == 4
+    assert planner.split(grandchildren[0], 100) == []  # 1 km would be below min_tile_km
+
+    pending = planner.resume(jobs, done={jobs[0], children[0]}, counts={jobs[0]: 100, children[0]: 12})
+    assert pending == [jobs[1]] + children[1:]
+
+
+def test_worker_pool_runs_expanded_jobs():
+    collected = []
+
+    def expand(job, count):
+        location, term = job
+        return [(location + "/child", term)] if location.count("/") < 2 else []
+
+    failures = run_worker_pool(
+        [("A", "cafes")], 2, fake_job, lambda job, business: collected.append(job), lambda job, count: None,
+        on_progress=lambda job, depth: None, driver_factory=make_driver, expand=expand
+    )
+    assert failures == []
+    assert collected == [("A", "cafes"), ("A/child", "cafes"), ("A/child/child", "cafes")]
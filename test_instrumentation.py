@@ -0,0 +1,49 @@
+import json
+
+from fake_maps import FakeMapsDriver, make_places
+from instrumentation import Profile, instrument_driver, reset_profile
+from scraper import scrape_google_maps
+
+
+def test_profile_percentiles_merge_and_exports(tmp_path):
+    profile = Profile()
+    for seconds in [0.002] * 90 + [0.4] * 10:
+        profile.observe('scrape.open', seconds)
+    profile.count('businesses.extracted', 3)
+    assert profile.percentile('scrape.open', 50) == 0.0025
+    assert profile.percentile('scrape.open', 99) == 0.4
+
+    other = Profile()
+    other.observe('scrape.open', 2.0)
+    other.count('businesses.extracted')
+    profile.merge(other.snapshot())
+    assert profile.timers['scrape.open'][0] == 101 and profile.timers['scrape.open'][2] == 2.0
+    assert profile.counters['businesses.extracted'] == 4
+
+    profile.write_json(tmp_path / "profile.json")
+    report = json.loads((tmp_path / "profile.json").read_text())
+    assert report['timers'][0]['name'] == 'scrape.open' and report['timers'][0]['count'] == 101
+
+    profile.write_prometheus(tmp_path / "scraper.prom")
+    text = (tmp_path / "scraper.prom").read_text()
+    assert 'scraper_stage_seconds_bucket{stage="scrape.open",le="+Inf"} 101' in text
+    assert 'scraper_events_total{event="businesses.extracted"} 4' in text
+
+
+def test_instrumented_driver_and_scraper_stages():
+    class Driver:
+        def execute(self, driver_command, params=None):
+            return {'value': driver_command}
+
+    profile = Profile()
+    driver = instrument_driver(Driver(), profile)
+    driver.execute('findElement', {})
+    driver.execute('findElement', {})
+    assert profile.timers['webdriver.findElement'][0] == 2
+
+    profile = reset_profile()
+    scrape_google_maps(FakeMapsDriver(make_places(30)), "restaurants", "Nairobi", max_results=10)
+    assert profile.timers['scrape.open'][0] == 10
+    assert profile.timers['scrape.business'][0] == 10
+    assert profile.timers['scrape.search'][0] == 1
+    assert profile.counters['businesses.extracted'] == 10
@@ -0,0 +1,68 @@
+import threading
+
+from job_queue import SqliteJobQueue, HttpJobQueue, JobQueueServer, QueueFeeder
+from worker_pool import run_worker_pool
+from test_worker_pool import fake_job, make_driver
+
+
+def test_claims_are_exclusive_and_expired_leases_requeue(tmp_path):
+    path = tmp_path / "queue.db"
+    producer = SqliteJobQueue(path)
+    assert producer.enqueue([("A", "cafes"), ("B", "cafes"), ("A", "cafes")]) == 2
+    assert producer.enqueue([("A", "cafes")]) == 0
+
+    node_1 = SqliteJobQueue(path, lease_seconds=-1)  # Every lease it takes has already expired
+    node_2 = SqliteJobQueue(path)
+    assert node_1.claim("node-1") == [("A", "cafes")]
+    # The next claim returns node-1's expired lease to the queue first
+    assert node_2.claim("node-2", limit=5) == [("A", "cafes"), ("B", "cafes")]
+    assert node_1.heartbeat("node-1", [("A", "cafes")]) == []
+    assert node_2.heartbeat("node-2", [("A", "cafes")]) == [("A", "cafes")]
+
+    # node-1 lost its lease, so only node-2 can finish the job
+    assert not node_1.complete("node-1", ("A", "cafes"), 3)
+    assert node_2.complete("node-2", ("A", "cafes"), 12)
+    node_2.fail("node-2", ("B", "cafes"), "boom")
+    assert producer.stats() == {'pending': 1, 'leased': 0, 'done': 1, 'failed': 0}
+    for attempt in range(2):
+        assert node_2.claim("node-2") == [("B", "cafes")]
+        node_2.fail("node-2", ("B", "cafes"), "boom")
+    assert producer.stats()['failed'] == 1 and node_2.claim("node-2") == []
+
+
+def test_http_backend_against_local_server(tmp_path):
+    server = JobQueueServer(SqliteJobQueue(tmp_path / "queue.db"), '127.0.0.1', 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = HttpJobQueue(f"http://127.0.0.1:{server.server_address[1]}")
+        assert client.enqueue([("A", "cafes"), ("B", "bars")]) == 2
+        assert client.claim("node-1") == [("A", "cafes")]
+        assert client.heartbeat("node-1", [("A", "cafes")]) == [("A", "cafes")]
+        client.complete("node-1", ("A", "cafes"), 3)
+        assert client.stats() == {'pending': 1, 'leased': 0, 'done': 1, 'failed': 0}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_two_nodes_drain_a_shared_queue(tmp_path):
+    path = tmp_path / "queue.db"
+    jobs = [(location, term) for location in ("A", "B", "C") for term in ("cafes", "bars", "broken")]
+    SqliteJobQueue(path).enqueue(jobs)
+
+    collected = []
+    for owner in ("node-1", "node-2"):
+        feeder = QueueFeeder(SqliteJobQueue(path, max_attempts=1), owner=owner)
+        try:
+            run_worker_pool(
+                feeder.claim(2), 2, fake_job, lambda job, business: collected.append(job),
+                lambda job, count: None, on_progress=lambda job, depth: None, driver_factory=make_driver,
+                expand=feeder.finished, on_error=feeder.failed
+            )
+        finally:
+            feeder.close()
+
+    # The first node drains the queue; the second finds nothing left to claim
+    assert sorted(collected) == sorted(job for job in jobs if job[1] != "broken")
+    assert SqliteJobQueue(path).stats() == {'pending': 0, 'leased': 0, 'done': 6, 'failed': 3}
@@ -0,0 +1,49 @@
+from listing import CardFilter, parse_card, passes_card_filters
+
+
+def test_parse_card():
+    card = {
+        'href': "https://www.google.com/maps/place/Mama+Oliech/data=!4m2!3m1!1s0xa:0xb",
+        'label': "Mama Oliech Restaurant",
+        'name': "Mama Oliech Restaurant",
+        'rating': "4.1",
+        'reviews_count': "(2,087)",
+        'phone': None,
+        'website': None,
+        'info': ["Restaurant · $$ · Marcus Garvey Rd", "Open ⋅ Closes 10 pm"],
+    }
+    record = parse_card(card)
+    assert record == {
+        'name': "Mama Oliech Restaurant",
+        'rating': 4.1,
+        'reviews_count': 2087,
+        'phone': None,
+        'website': None,
+        'category': "Restaurant",
+        'price_level': 2,
+        'address': "Marcus Garvey Rd",
+        'hours': "Open ⋅ Closes 10 pm",
+        'location': card['href'],
+        'place_id': "0xa:0xb",
+    }
+    assert passes_card_filters(record, min_rating=3.5, min_reviews=3)
+    assert not passes_card_filters(record, min_rating=4.5)
+
+
+def test_card_filter_only_rejects_on_known_fields():
+    card_filter = CardFilter(min_rating=3.5, min_reviews=3, require_no_website=True,
+                             business_types=["restaurant", "bar"], max_price_level=3)
+    card = {'name': "Kilele", 'rating': "4.4", 'reviews_count': "(12)", 'website': None,
+            'info': ["Restaurant · $$ · Ngong Rd"]}
+    assert card_filter.check_card(card)
+    # Cards that do not show a field can still pass
+    assert card_filter.check_card({'name': "Kilele", 'info': []})
+
+    assert not card_filter.check_card(dict(card, rating="3.1"))
+    assert not card_filter.check_card(dict(card, reviews_count="(2)"))
+    assert not card_filter.check_card(dict(card, website="https://kilele.example/"))
+    assert not card_filter.check_card(dict(card, info=["Barber shop · Ngong Rd"]))
+    assert not card_filter.check_card(dict(card, info=["Bar · $$$$ · Ngong Rd"]))
+
+    assert card_filter.fields == ['rating', 'reviews_count', 'website', 'category', 'price_level']
+    assert not card_filter.check({'name': "Kilele", 'website': "https://kilele.example/"})
@@ -0,0 +1,41 @@
+import time
+
+from place_cache import PlaceCache
+
+PLACE = "0x182f10:0x1a2b"
+
+
+def test_group_ttls(tmp_path):
+    cache = PlaceCache(tmp_path / "cache.db", ttls={'identity': 60, 'hours': 60, 'reviews': 60})
+    assert cache.lookup(PLACE) is None
+    cache.put(PLACE, {'name': "Java House", 'rating': 4.2, 'hours': "Open 24 hours"})
+    assert cache.lookup(PLACE)['name'] == "Java House"
+    # Label fallbacks are never cached
+    cache.put("label:java house", {'name': "Java House"})
+    assert len(cache) == 1
+
+    # Age the reviews group only
+    cache.ttls['reviews'] = 0
+    time.sleep(0.01)
+    assert cache.lookup(PLACE) is None
+    assert cache.lookup(PLACE, refreshed=('reviews',))['hours'] == "Open 24 hours"
+
+    # A card refresh updates the review fields and their timestamp only
+    cache.ttls['reviews'] = 60
+    cache.put(PLACE, {'name': "Ignored", 'rating': 4.5}, groups=('reviews',))
+    record = cache.lookup(PLACE)
+    assert record['rating'] == 4.5 and record['name'] == "Java House"
+    assert cache.metrics() == {'hits': 3, 'misses': 1, 'stale': 1}
+    cache.close()
+
+
+def test_lru_eviction(tmp_path):
+    cache = PlaceCache(tmp_path / "cache.db", max_entries=2)
+    for place_id in ("a", "b", "c"):
+        cache.put(place_id, {'name': place_id})
+        time.sleep(0.01)
+    cache.lookup("a")
+    assert cache.evict() == 1
+    assert cache.lookup("b") is None
+    assert cache.lookup("a") and cache.lookup("c")
+    cache.close()
@@ -0,0 +1,19 @@
+from place_identity import PlaceIndex, card_key, place_id_from_href
+
+
+def test_place_id_from_href():
+    href = ("https://www.google.com/maps/place/Java+House/data=!4m7!3m6"
+            "!1s0x182f10D5B0B5D7B5:0x3c5b6b0e6d1b2c0f!8m2!3d-1.26!4d36.80!19sChIJtdew")
+    assert place_id_from_href(href) == "0x182f10d5b0b5d7b5:0x3c5b6b0e6d1b2c0f"
+    assert place_id_from_href("https://maps.google.com/?q=place_id:ChIJabc-123") == "ChIJabc-123"
+    assert place_id_from_href("https://www.google.com/maps/place/Cafe+X/@-1.2921,36.8219,17z") == "cafe x@-1.29210,36.82190"
+    assert place_id_from_href("https://www.google.com/maps/search/cafes") is None
+    assert card_key(None, "Cafe X ") == "label:cafe x"
+
+
+def test_place_index_skips_duplicates():
+    index = PlaceIndex(seen={"a"})
+    assert [index.check(key) for key in ("a", "b", "b", None)] == [False, True, False, True]
+    assert index.metrics() == {
+        'cards_seen': 4, 'unique_places': 2, 'duplicates_skipped': 2, 'cards_without_id': 1,
+    }
@@ -0,0 +1,34 @@
+import time
+
+from rate_control import RateController, OK, TIMEOUT, BLOCKED
+
+
+def test_aimd_adjustments():
+    controller = RateController(initial_rate=1.0, min_rate=0.25, max_rate=1.2, increase=0.1,
+                                decrease_factor=0.5, latency_target=2.0)
+    controller.record(OK, 0.5)
+    assert abs(controller.rate - 1.1) < 1e-9
+    controller.record(OK, 0.5)
+    controller.record(OK, 0.5)
+    assert controller.rate == 1.2
+
+    # Slow responses count as congestion
+    controller.record(OK, 3.0)
+    assert abs(controller.rate - 0.6) < 1e-9
+    controller.record(TIMEOUT)
+    controller.record(TIMEOUT)
+    assert controller.rate == 0.25
+    assert controller.stats['slow'] == 1 and controller.stats['timeout'] == 2
+
+
+def test_token_pacing_and_block_cooldown():
+    controller = RateController(initial_rate=20.0, burst=1, block_cooldown=0.2)
+    assert controller.acquire() == 0.0
+    # The bucket is empty, so the next request waits about 1 / rate
+    assert 0.02 < controller.acquire() < 0.2
+
+    controller.record(BLOCKED)
+    started = time.time()
+    controller.acquire()
+    assert time.time() - started >= 0.15
+    assert controller.rate == 10.0
@@ -14,10 +14,10 @@ def test_scraper():
         setup_logging()
         logging.info("Starting test scrape...")
         
-        driver = create_driver()
+        driver = create_driver(user_data_root=None)
         results = scrape_google_maps(
             driver=driver,
-            query="restaurants",
+            search_term="restaurants",
             location="Westlands Nairobi",
             max_results=5
         )
@@ -0,0 +1,68 @@
+import json
+import subprocess
+import sys
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from scrapy.exceptions import DropItem
+
+from scrapers import BusinessRecordPipeline
+
+CARD = """
+<div class="Nv2PK">
+  <a class="hfpxzc" aria-label="{name}" href="/maps/place/{slug}/data=!4m2!3m1!1s0x{n}:0x{n}"></a>
+  <div class="qBF1Pd">{name}</div>
+  <span class="MW4etd">4.{n}</span><span class="UY7F9">({n}0)</span>
+  <div class="W4Efsd"><div class="W4Efsd">Cafe · $ · {n} Moi Avenue</div></div>
+</div>
+"""
+
+
+def write_fixtures(root):
+    search = root / "maps" / "search"
+    search.mkdir(parents=True)
+    page1 = "".join(CARD.format(name=f"Cafe {n}", slug=f"Cafe+{n}", n=n) for n in (1, 2))
+    page2 = CARD.format(name="Cafe 3", slug="Cafe+3", n=3) + CARD.format(name="Cafe 1", slug="Cafe+1", n=1)
+    (search / "cafes in Nairobi").write_text(f'<html><body>{page1}<a rel="next" href="/page2.html">next</a></body></html>')
+    (root / "page2.html").write_text(f"<html><body>{page2}</body></html>")
+
+
+def test_spider_against_fixture_server(tmp_path):
+    write_fixtures(tmp_path)
+    handler = partial(SimpleHTTPRequestHandler, directory=str(tmp_path))
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    output = tmp_path / "out.jsonl"
+    try:
+        subprocess.run(
+            [
+                sys.executable, "-m", "scrapy", "runspider", "scrapers.py",
+                "-a", f"base_url=http://127.0.0.1:{server.server_port}/maps/search/",
+                "-a", "terms=cafes", "-a", "locations=Nairobi",
+                "-a", f"output={output}", "-s", "HTTPCACHE_ENABLED=False",
+            ],
+            cwd=Path(__file__).parent, check=True, capture_output=True, timeout=60
+        )
+    finally:
+        server.shutdown()
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [record['name'] for record in records] == ["Cafe 1", "Cafe 2", "Cafe 3"]
+    assert records[0]['place_id'] == "0x1:0x1"
+    assert records[0]['address'] == "1 Moi Avenue" and records[0]['price_level'] == 1
+    assert records[2]['rating'] == 4.3 and records[2]['reviews_count'] == 30
+    assert records[2]['search_term'] == "cafes" and records[2]['search_location'] == "Nairobi"
+
+
+def test_pipeline_only_dedups_items_with_a_place_id():
+    pipeline = BusinessRecordPipeline()
+    pipeline.open_spider(SimpleNamespace(output=None))
+    pipeline.process_item({'name': "Cafe 1", 'place_id': None})
+    assert pipeline.process_item({'name': "Cafe 2", 'place_id': None})['name'] == "Cafe 2"
+    pipeline.process_item({'name': "Cafe 3", 'place_id': "0x3:0x3"})
+    with pytest.raises(DropItem):
+        pipeline.process_item({'name': "Cafe 3", 'place_id': "0x3:0x3"})
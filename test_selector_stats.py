@@ -0,0 +1,42 @@
+import multiprocessing as mp
+
+from selector_stats import SelectorRegistry
+
+
+def test_selector_ordering_and_persistence(tmp_path):
+    path = tmp_path / "stats.json"
+    registry = SelectorRegistry.load(path)
+    for _ in range(60):
+        registry.record('name', 'h1[data-attrid="title"]', False)
+        registry.record('name', 'h1.DUwDvf', True)
+    registry.save()
+
+    ordered = registry.ordered('name', ['h1[data-attrid="title"]', '.unseen', 'h1.DUwDvf'])
+    assert ordered == ['h1.DUwDvf', '.unseen', 'h1[data-attrid="title"]']
+    assert registry.dead_selectors() == [('name', 'h1[data-attrid="title"]', 60)]
+
+    # A second process saving to the same file adds to the counts
+    other = SelectorRegistry.load(path)
+    other.record('name', 'h1.DUwDvf', True)
+    other.save()
+    assert SelectorRegistry.load(path).stats['name']['h1.DUwDvf'] == [61, 0]
+
+
+def save_many(path, selector, rounds):
+    registry = SelectorRegistry.load(path)
+    for _ in range(rounds):
+        registry.record('name', selector, True)
+        registry.save()
+
+
+def test_concurrent_saves_keep_every_count(tmp_path):
+    path = tmp_path / "stats.json"
+    ctx = mp.get_context('spawn')
+    processes = [ctx.Process(target=save_many, args=(path, selector, 50)) for selector in ('h1.DUwDvf', '.DkEaL')]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    stats = SelectorRegistry.load(path).stats['name']
+    assert stats == {'h1.DUwDvf': [50, 0], '.DkEaL': [50, 0]}
@@ -0,0 +1,63 @@
+import csv
+import json
+
+from entity_resolution import resolve_output
+from sinks import make_sink
+
+
+def test_csv_sink_streams_and_finalizes(tmp_path):
+    output = tmp_path / "out.csv"
+    output.write_text("old\n")
+
+    sink = make_sink(output, flush_every=1)
+    assert sink.write({'name': "Cafe A", 'address': "Moi Avenue", 'place_id': "a", 'extra': 1})
+    assert not sink.write({'name': "Cafe A", 'address': "Moi Avenue", 'place_id': "a"})
+    assert not sink.write({'name': "No address", 'address': None})
+
+    # Rows are on disk before the run is finalized
+    partial_rows = list(csv.DictReader(open(sink.partial_file, encoding='utf-8')))
+    assert [row['name'] for row in partial_rows] == ["Cafe A"]
+
+    sink.close()
+    rows = list(csv.DictReader(open(output, encoding='utf-8')))
+    assert len(rows) == 1 and rows[0]['place_id'] == "a" and 'extra' not in rows[0]
+    assert (tmp_path / "out.csv.backup").read_text() == "old\n"
+    assert not sink.partial_file.exists()
+
+
+def test_jsonl_sink(tmp_path):
+    output = tmp_path / "out.jsonl"
+    with make_sink(output) as sink:
+        sink.write({'name': "Bar B", 'address': "Kenyatta Ave", 'rating': 4.5})
+    row = json.loads(output.read_text().splitlines()[0])
+    assert row['rating'] == 4.5 and list(row)[0] == 'name'
+
+
+def test_resumed_csv_dedups_rows_without_place_id(tmp_path):
+    output = tmp_path / "out.csv"
+    record = {'name': "Bar B", 'address': "Kenyatta Ave", 'rating': 4.5, 'reviews_count': 12}
+    sink = make_sink(output)
+    assert sink.write(record)
+    sink.abort()
+
+    # The partial file gives back "4.5" and "12" as text; the row must still match
+    sink = make_sink(output, resume=True)
+    assert not sink.write(record)
+    sink.close()
+    assert len(list(csv.DictReader(open(output, encoding='utf-8')))) == 1
+
+
+def test_same_place_under_two_search_terms(tmp_path):
+    output = tmp_path / "out.csv"
+    cafe = {'name': "Java House", 'address': "Moi Avenue", 'place_id': "a"}
+    with make_sink(output) as sink:
+        assert sink.write(dict(cafe, search_term="cafes"))
+        assert not sink.write(dict(cafe, search_term="restaurants"))
+
+    # Left to the resolver, both terms survive on the merged row
+    with make_sink(output, per_search=True) as sink:
+        assert sink.write(dict(cafe, search_term="cafes"))
+        assert sink.write(dict(cafe, search_term="restaurants"))
+        assert not sink.write(dict(cafe, search_term="cafes"))
+    resolved = resolve_output(output, tmp_path / "resolved.csv")
+    assert len(resolved) == 1 and resolved[0]['search_term'] == "cafes|restaurants"
@@ -0,0 +1,53 @@
+from extraction import build_selector_table
+from selector_stats import SelectorRegistry
+from snapshots import SnapshotParserPool, load_snapshot, parse_snapshot, save_snapshot
+
+DETAIL_HTML = """
+<html><body><div role="main">
+  <h1 class="DUwDvf fontHeadlineSmall">Java House</h1>
+  <span class="MW4etd">4.3</span><span class="UY7F9">(1,204)</span>
+  <button data-item-id="address"><div class="Io6YTe">Sarit Centre, Nairobi</div></button>
+  <a data-item-id="authority" href="https://javahouse.com/">javahouse.com</a>
+  <button class="DkEaL">Coffee shop</button>
+</div></body></html>
+"""
+URL = "https://www.google.com/maps/place/Java+House/data=!4m2!3m1!1s0x1:0x2"
+
+
+def test_parse_snapshot():
+    record, selector_hits = parse_snapshot(DETAIL_HTML, URL)
+    assert record['name'] == "Java House"
+    assert record['rating'] == 4.3 and record['reviews_count'] == 1204
+    assert record['address'] == "Sarit Centre, Nairobi"
+    assert record["website"] == "https://javahouse.com/"
+    assert record['phone'] is None and record['place_id'] == "0x1:0x2"
+    assert ('name', 'h1[data-attrid="title"]', False) in selector_hits
+
+
+def test_parse_snapshot_follows_the_registry_order():
+    registry = SelectorRegistry()
+    for _ in range(5):
+        registry.record('rating', '.ceNzKf', True)
+        registry.record('rating', '.MW4etd', False)
+    html = DETAIL_HTML.replace('<span class="MW4etd">4.3</span>', '<span class="MW4etd">4.3</span><div class="ceNzKf">4.8</div>')
+
+    record, selector_hits = parse_snapshot(html, URL, build_selector_table(registry=registry))
+    assert record['rating'] == 4.8
+    # Only the selector that produced the value is scored
+    assert [hit for hit in selector_hits if hit[0] == 'rating'] == [('rating', '.ceNzKf', True)]
+    assert parse_snapshot(html, URL)[0]['rating'] == 4.3
+
+
+def test_snapshot_roundtrip_and_pool(tmp_path):
+    snapshot = {'html': DETAIL_HTML, 'url': URL, 'place_id': "0x1:0x2"}
+    path = save_snapshot(tmp_path, snapshot)
+    assert load_snapshot(path) == {**snapshot, 'html': DETAIL_HTML}
+
+    pool = SnapshotParserPool(workers=1, registry=SelectorRegistry())
+    try:
+        pool.submit(snapshot)
+        results = list(pool.drain(wait=True))
+    finally:
+        pool.close()
+    assert results[0][0]['category'] == "Coffee shop"
+    assert pool.pending == 0
@@ -0,0 +1,57 @@
+import sqlite3
+
+import pytest
+
+from sinks import make_sink
+from storage import query_businesses
+
+
+def record(place_id, **fields):
+    base = {'name': f"Place {place_id}", 'address': "Moi Avenue", 'place_id': place_id,
+            'search_term': "cafes", 'search_location': "Mombasa, Kenya"}
+    base.update(fields)
+    return base
+
+
+def test_sqlite_store_upserts_across_runs(tmp_path):
+    path = tmp_path / "businesses.db"
+    flushes = []
+    with make_sink(path, flush_every=2, on_flush=lambda: flushes.append(1)) as store:
+        store.write(record("a", rating=4.5))
+        store.write(record("b", rating=3.9))
+        assert not store.write(record("a"))
+        store.write(record("c", rating=4.1, website="https://c.example"))
+    assert len(flushes) == 2
+
+    # Second run updates "a" in place and keeps fields it did not see
+    with make_sink(path) as store:
+        store.write(record("a", rating=4.6, phone="+254 700 000000"))
+        store.write(record("d", rating=4.0, search_location="Nairobi, Kenya"))
+
+    rows = query_businesses(path, search_location="Mombasa, Kenya", min_rating=4.0, without_website=True)
+    assert [(row['place_id'], row['rating'], row['phone']) for row in rows] == [("a", 4.6, "+254 700 000000")]
+    assert rows[0]['first_seen'] < rows[0]['scraped_at']
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM businesses").fetchone()[0] == 4
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM businesses WHERE search_location = ? AND rating >= ?",
+        ("Mombasa, Kenya", 4.0)
+    ).fetchall()
+    assert any('businesses_search_location' in row[-1] for row in plan)
+    conn.close()
+
+
+def test_parquet_store_partitions(tmp_path):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "businesses.parquet"
+    for run in range(2):
+        with make_sink(path, flush_every=10) as store:
+            store.write(record(f"a{run}", rating=4.5))
+            store.write(record(f"b{run}", search_location="Nairobi, Kenya"))
+
+    assert {p.name for p in path.iterdir()} == {"search_location=Mombasa__Kenya", "search_location=Nairobi__Kenya"}
+    df = pd.read_parquet(path)
+    assert len(df) == 4
+    assert sorted(df['place_id']) == ["a0", "a1", "b0", "b1"]
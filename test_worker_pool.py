@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+
+from scraper import SearchResults
+from worker_pool import run_worker_pool
+
+
+class DummyDriver:
+    def quit(self):
+        pass
+
+
+def make_driver():
+    return DummyDriver()
+
+
+def fake_job(driver, term, location, on_business=None, on_scroll=None):
+    if term == "broken":
+        raise RuntimeError("boom")
+    businesses = [{'name': f"{term} place", 'location': location}]
+    for business in businesses:
+        on_business(business)
+    on_scroll(1)
+    return businesses
+
+
+def test_worker_pool():
+    jobs = [(location, term) for location in ("A", "B") for term in ("cafes", "bars", "broken")]
+    collected = []
+    counts = []
+    progress = []
+
+    failures = run_worker_pool(
+        jobs, 3, fake_job,
+        lambda job, business: collected.append(business),
+        lambda job, count: counts.append(count),
+        on_progress=lambda job, depth: progress.append(job),
+        driver_factory=make_driver
+    )
+
+    assert len(collected) == 4
+    assert counts == [1, 1, 1, 1]
+    assert len(progress) == 4
+    assert sorted(job for job, _ in failures) == [("A", "broken"), ("B", "broken")]
+
+
+def exit_soon():
+    time.sleep(0.3)
+    os._exit(1)
+
+
+def crash_when_idle_job(driver, term, location, on_business=None, on_scroll=None):
+    if term == "slow":
+        time.sleep(2.5)
+    elif term == "crash-later":
+        # Die after reporting the result, during the politeness delay (a
+        # worker killed inside job_queue.get() would take the queue lock too)
+        threading.Thread(target=exit_soon, daemon=True).start()
+    on_business({'name': term, 'location': location})
+    return [term]
+
+
+def test_idle_worker_crash_keeps_expanded_jobs():
+    collected = []
+
+    def expand(job, count):
+        return [("A", "child")] if job[1] == "slow" else []
+
+    failures = run_worker_pool(
+        [("A", "slow"), ("A", "crash-later")], 2, crash_when_idle_job,
+        lambda job, business: collected.append(job), lambda job, count: None,
+        delay_range=(1.0, 1.0), driver_factory=make_driver, expand=expand
+    )
+    assert failures == []
+    assert sorted(collected) == [("A", "child"), ("A", "crash-later"), ("A", "slow")]
+
+
+def filtered_search_job(driver, term, location, on_business=None, on_scroll=None):
+    results = SearchResults([{'name': f"{term} place", 'location': location}])
+    results.cards_seen = 120  # Most cards were filtered out
+    on_business(results[0])
+    return results
+
+
+def test_expand_gets_the_cards_seen():
+    counts = []
+    expanded = []
+
+    def expand(job, cards):
+        expanded.append(cards)
+        return []
+
+    run_worker_pool(
+        [("A", "cafes")], 1, filtered_search_job, lambda job, business: None,
+        lambda job, count: counts.append(count), driver_factory=make_driver, expand=expand
+    )
+    assert counts == [1] and expanded == [120]
+
+
+if __name__ == "__main__":
+    test_worker_pool()
@@ -0,0 +1,214 @@
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+import logging
+import random
+import time
+
+from config import POLITENESS_DELAYS
+from extraction import FIELD_SELECTORS
+from instrumentation import get_profile
+
+logger = logging.getLogger(__name__)
+
+# Cards in the results feed
+FEED_CARD_SELECTOR = 'a[data-result-index], .hfpxzc'
+# "You've reached the end of the list." at the bottom of a complete feed
+FEED_END_SELECTOR = '.HlvSq'
+
+# Resolves true once the detail pane heading shows the expected business
+# (or, if no name is known, any business other than the previous one).
+# Names are compared whole after collapsing whitespace and case, so a stale
+# pane for "Java House" never passes for a click on "Java House Westlands".
+# A MutationObserver re-checks on every DOM change, so the script returns
+# as soon as the pane renders instead of after a fixed sleep.
+DETAIL_PANE_READY_JS = """
+var expected = arguments[0], previous = arguments[1], selectors = arguments[2];
+var timeoutMs = arguments[3], done = arguments[arguments.length - 1];
+
+function heading() {
+    for (var i = 0; i < selectors.length; i++) {
+        var el = document.querySelector(selectors[i]);
+        var text = el && (el.innerText || el.textContent || '').trim();
+        if (text) {
+            return text;
+        }
+    }
+    return null;
+}
+
+function normalize(text) {
+    return text.replace(/\\s+/g, ' ').trim().toLowerCase();
+}
+
+function ready() {
+    var name = heading();
+    if (!name) {
+        return false;
+    }
+    if (expected) {
+        return normalize(name) === normalize(expected);
+    }
+    return name !== previous;
+}
+
+if (ready()) {
+    done(true);
+    return;
+}
+var timer;
+var observer = new MutationObserver(function () {
+    if (ready()) {
+        observer.disconnect();
+        clearTimeout(timer);
+        done(true);
+    }
+});
+observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+timer = setTimeout(function () {
+    observer.disconnect();
+    done(false);
+}, timeoutMs);
+"""
+
+# Resolves with the feed card count once it exceeds the previous count or the
+# end-of-list marker shows up, or with the unchanged count when the timeout expires
+FEED_GROWTH_JS = """
+var panel = arguments[0], previous = arguments[1], cardSelector = arguments[2];
+var endSelector = arguments[3], timeoutMs = arguments[4], done = arguments[arguments.length - 1];
+
+function count() {
+    return panel.querySelectorAll(cardSelector).length;
+}
+
+function settled() {
+    return count() > previous || document.querySelector(endSelector) !== null;
+}
+
+if (settled()) {
+    done(count());
+    return;
+}
+var timer;
+var observer = new MutationObserver(function () {
+    if (settled()) {
+        observer.disconnect();
+        clearTimeout(timer);
+        done(count());
+    }
+});
+observer.observe(panel, {childList: true, subtree: true});
+timer = setTimeout(function () {
+    observer.disconnect();
+    done(count());
+}, timeoutMs);
+"""
+
+# Clicks a cookie/consent button if one is shown; returns whether it clicked
+DISMISS_CONSENT_JS = """
+var result = document.evaluate(
+    "//button[contains(text(), 'Accept') or contains(text(), 'I agree')]",
+    document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+);
+var button = result.singleNodeValue;
+if (button) {
+    button.click();
+    return true;
+}
+return false;
+"""
+
+
+def _run_async(driver, script, timeout, *args):
+    """
+    Run an async wait script that resolves itself after timeout seconds
+
+    The driver's script timeout (30s in create_driver) must stay above
+    every wait timeout passed here.
+    """
+    return driver.execute_async_script(script, *args, int(timeout * 1000))
+
+
+def wait_for_results(driver, timeout):
+    """
+    Wait until the search results (or a single place page) have rendered
+
+    Returns:
+        True if the results panel appeared before the timeout
+    """
+    try:
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, '[role="main"]'))
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
+def dismiss_consent(driver, timeout):
+    """Accept the cookie consent screen if present, without paying an implicit wait"""
+    try:
+        if driver.execute_script(DISMISS_CONSENT_JS):
+            logger.info("Accepted consent dialog")
+            WebDriverWait(driver, timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, '[role="main"]'))
+            )
+            return True
+    except (TimeoutException, WebDriverException) as e:
+        logger.debug(f"Consent dismissal failed: {str(e)}")
+    return False
+
+
+def wait_for_detail_pane(driver, expected_name, previous_name, timeout):
+    """
+    Wait until the detail pane shows the business that was just clicked
+
+    Args:
+        driver: Selenium WebDriver instance
+        expected_name: Name from the clicked card's aria-label, if known
+        previous_name: Name shown in the pane before the click
+        timeout: Maximum seconds to wait
+
+    Returns:
+        True if the pane was updated before the timeout
+    """
+    try:
+        return bool(_run_async(
+            driver, DETAIL_PANE_READY_JS, timeout,
+            expected_name, previous_name, FIELD_SELECTORS['name']
+        ))
+    except WebDriverException as e:
+        logger.debug(f"Detail pane observer failed: {str(e)}")
+        return False
+
+
+def wait_for_feed_growth(driver, panel, previous_count, timeout):
+    """
+    Wait until the results feed holds more cards than previous_count, or
+    until the end-of-list marker shows there is nothing more to load
+
+    Returns:
+        Number of cards in the feed (unchanged if nothing loaded in time)
+    """
+    try:
+        return int(_run_async(
+            driver, FEED_GROWTH_JS, timeout, panel, previous_count, FEED_CARD_SELECTOR, FEED_END_SELECTOR
+        ))
+    except WebDriverException as e:
+        logger.debug(f"Feed observer failed: {str(e)}")
+        return previous_count
+
+
+def politeness_delay(kind):
+    """
+    Sleep for the configured randomized politeness delay
+
+    This is deliberate pacing towards the site and is kept separate from
+    load waiting; set the range to (0, 0) in POLITENESS_DELAYS to disable it.
+    """
+    low, high = POLITENESS_DELAYS.get(kind, (0.0, 0.0))
+    if high > 0:
+        delay = random.uniform(low, high)
+        time.sleep(delay)
+        get_profile().observe(f'sleep.politeness_{kind}', delay)
@@ -0,0 +1,245 @@
+import logging
+import logging.handlers
+import multiprocessing as mp
+import queue
+import random
+import time
+
+from instrumentation import get_profile
+
+logger = logging.getLogger(__name__)
+
+
+def _worker_loop(worker_id, job_queue, result_queue, log_queue, job_fn, job_kwargs, delay_range, driver_factory):
+    """
+    Worker process body: own one driver and run jobs until a sentinel arrives
+
+    Every message sent back to the parent is a tuple of
+    (kind, worker_id, job, payload) where kind is one of 'start' (the
+    worker took the job), 'business'
+    (payload is one record, streamed as soon as it is extracted), 'progress'
+    (payload is the feed scroll depth reached), 'result' (payload is the
+    job's (record count, result cards seen)), 'error', 'worker_failed' or 'done' (payload is the
+    worker's run profile snapshot).
+    """
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(logging.INFO)
+
+    # Imported here so the parent process never needs a browser
+    from driver_manager import DriverManager
+
+    driver = DriverManager(driver_factory)
+    try:
+        try:
+            driver.start()
+        except Exception as e:
+            result_queue.put(('worker_failed', worker_id, None, str(e)))
+            return
+
+        while True:
+            job = job_queue.get()
+            if job is None:
+                break
+            result_queue.put(('start', worker_id, job, None))
+
+            location, term = job
+            try:
+                driver.check()
+            except Exception as e:
+                result_queue.put(('error', worker_id, job, f"Could not restart browser: {str(e)}"))
+                continue
+            logging.info(f"[worker-{worker_id}] Scraping: {term} in {location}")
+
+            def emit(business, job=job):
+                result_queue.put(('business', worker_id, job, business))
+
+            def progress(depth, job=job):
+                result_queue.put(('progress', worker_id, job, depth))
+
+            try:
+                businesses = job_fn(
+                    driver, term, location, on_business=emit, on_scroll=progress, **job_kwargs
+                )
+                count = len(businesses or [])
+                cards = getattr(businesses, 'cards_seen', count)
+                result_queue.put(('result', worker_id, job, (count, cards)))
+            except Exception as e:
+                result_queue.put(('error', worker_id, job, str(e)))
+
+            time.sleep(random.uniform(*delay_range))
+    finally:
+        driver.quit()
+        driver.report()
+        result_queue.put(('done', worker_id, None, get_profile().snapshot()))
+
+
+def run_worker_pool(jobs, workers, job_fn, on_business, on_result, on_progress=None,
+                    job_kwargs=None, delay_range=(0.0, 0.0), driver_factory=None, expand=None,
+                    on_error=None):
+    """
+    Run (location, term) jobs on N isolated browser processes
+
+    Args:
+        jobs: List of (location, term) tuples
+        workers: Number of worker processes (each owns one driver)
+        job_fn: Picklable callable
+            job_fn(driver, term, location, on_business=..., on_scroll=..., **job_kwargs)
+            returning the list of businesses; it must call on_business with
+            each business as it is extracted and on_scroll with each scroll depth
+        on_business: Called in the parent as on_business(job, business) for
+            every streamed business; this is the single aggregation point
+        on_result: Called in the parent as on_result(job, count) when a job
+            completes successfully
+        on_progress: Optional, called in the parent as on_progress(job, depth)
+        job_kwargs: Extra picklable keyword arguments passed to every job_fn call
+        delay_range: (min, max) politeness delay each worker sleeps between jobs
+        driver_factory: Picklable zero-argument callable returning a driver
+            (defaults to browser_controller.create_driver)
+        expand: Optional, called in the parent as expand(job, cards) when a
+            job completes, where cards is the cards_seen attribute of job_fn's
+            result (the record count if it has none); the jobs it returns
+            are queued as well
+        on_error: Optional, called in the parent as on_error(job, message)
+            when a job fails; the jobs it returns are queued as well
+
+    Returns:
+        List of (job, error message) tuples for jobs that failed or never ran
+    """
+    if not jobs:
+        return []
+
+    ctx = mp.get_context('spawn')
+    job_queue = ctx.Queue()
+    result_queue = ctx.Queue()
+    log_queue = ctx.Queue()
+
+    jobs = list(jobs)
+    workers = max(1, min(workers, len(jobs)))
+    for job in jobs:
+        job_queue.put(job)
+    outstanding = [len(jobs)]
+
+    def queue_jobs(new_jobs):
+        for new_job in new_jobs or []:
+            jobs.append(new_job)
+            job_queue.put(new_job)
+            outstanding[0] += 1
+
+    def finish_job():
+        # Workers stop once no job is left that could queue more
+        outstanding[0] -= 1
+        if outstanding[0] == 0:
+            for _ in range(workers):
+                job_queue.put(None)
+
+    # Forward worker log records to the handlers configured in this process
+    listener = logging.handlers.QueueListener(
+        log_queue, *logging.getLogger().handlers, respect_handler_level=True
+    )
+    listener.start()
+
+    processes = [
+        ctx.Process(
+            target=_worker_loop,
+            args=(
+                worker_id, job_queue, result_queue, log_queue,
+                job_fn, job_kwargs or {}, delay_range, driver_factory
+            ),
+            name=f"worker-{worker_id}",
+            # Not daemonic, so workers may run their own parser pools
+            daemon=False,
+        )
+        for worker_id in range(1, workers + 1)
+    ]
+    for process in processes:
+        process.start()
+    logger.info(f"Started {workers} browser workers for {len(jobs)} jobs")
+
+    completed = set()
+    failures = []
+    finished_workers = []
+    crashed_workers = []
+    in_flight = {}  # worker_id -> job it is running
+
+    def job_failed(job, message):
+        completed.add(job)
+        failures.append((job, message))
+        if on_error:
+            try:
+                queue_jobs(on_error(job, message))
+            except Exception as e:
+                logger.error(f"Aggregator failed on {job[1]} in {job[0]}: {str(e)}")
+        finish_job()
+
+    def handle(message):
+        kind, worker_id, job, payload = message
+        if kind in ('start', 'business', 'progress'):
+            in_flight[worker_id] = job
+        elif kind in ('result', 'error'):
+            in_flight.pop(worker_id, None)
+        if kind == 'business':
+            try:
+                on_business(job, payload)
+            except Exception as e:
+                logger.error(f"Aggregator failed on {job[1]} in {job[0]}: {str(e)}")
+        elif kind == 'progress':
+            if on_progress:
+                on_progress(job, payload)
+        elif kind == 'result':
+            completed.add(job)
+            count, cards = payload
+            try:
+                on_result(job, count)
+                if expand:
+                    queue_jobs(expand(job, cards))
+            except Exception as e:
+                logger.error(f"Aggregator failed on {job[1]} in {job[0]}: {str(e)}")
+            finish_job()
+        elif kind == 'error':
+            logger.error(f"[worker-{worker_id}] Error processing {job[1]} in {job[0]}: {payload}")
+            job_failed(job, payload)
+        elif kind == 'worker_failed':
+            logger.error(f"[worker-{worker_id}] Could not start browser: {payload}")
+        elif kind == 'done':
+            finished_workers.append(worker_id)
+            if payload:
+                get_profile().merge(payload)
+            logger.info(f"[worker-{worker_id}] Finished")
+
+    try:
+        while len(finished_workers) < len(processes):
+            try:
+                handle(result_queue.get(timeout=1))
+            except queue.Empty:
+                if not any(p.is_alive() for p in processes):
+                    break
+                # A worker that died without saying 'done' took its job, if
+                # it held one, with it; an idle worker leaves the count alone
+                for worker_id, process in enumerate(processes, 1):
+                    if not process.is_alive() and worker_id not in finished_workers + crashed_workers:
+                        logger.error(f"[worker-{worker_id}] Exited unexpectedly")
+                        crashed_workers.append(worker_id)
+                        job = in_flight.pop(worker_id, None)
+                        if job is not None:
+                            job_failed(job, "worker crashed")
+
+        # Collect anything flushed by workers just before they exited
+        while True:
+            try:
+                handle(result_queue.get_nowait())
+            except queue.Empty:
+                break
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        listener.stop()
+
+    for job in jobs:
+        if job not in completed:
+            failures.append((job, "job was not run (worker crashed or no workers available)"))
+            logger.error(f"Job not completed: {job[1]} in {job[0]}")
+
+    return failures